@@ -0,0 +1,137 @@
+"""
+LangGraph chat workflow behind the OpenAI-compatible chat endpoint.
+
+The graph is compiled once and shared by every request; the chat model is
+passed in per run through the config, so each request can use its own model
+and sampling settings. stream_chat() yields text deltas as the model produces
+them, using astream_events, and run_chat() returns the whole reply.
+
+With ANTHROPIC_API_KEY set and langchain-anthropic installed, replies come
+from Claude. Otherwise a canned test reply is streamed, so the endpoint can
+be exercised without an API key.
+
+The model ids advertised to LibreChat are mapped to Anthropic model names.
+BRAID_CHAT_MODELS replaces the default mapping with comma-separated
+id=anthropic-model pairs, e.g. "braid-sonnet=claude-sonnet-4-20250514".
+"""
+import os
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, TypedDict
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AnyMessage, convert_to_messages
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+
+try:
+    from langchain_anthropic import ChatAnthropic
+except ImportError:
+    ChatAnthropic = None
+
+
+DEFAULT_CHAT_MODELS = {
+    "claude-4-sonnet-20250101": "claude-sonnet-4-20250514",
+    "claude-4-opus-20250101": "claude-opus-4-20250514",
+    "claude-4-haiku-20250101": "claude-3-5-haiku-20241022",
+}
+
+
+def _load_models(spec: str) -> Dict[str, str]:
+    """Parse "id=anthropic-model,..."; an empty spec keeps the defaults."""
+    models = {}
+    for entry in filter(None, (item.strip() for item in spec.split(","))):
+        model_id, sep, name = entry.partition("=")
+        if not sep or not model_id.strip() or not name.strip():
+            raise ValueError(f"Invalid BRAID_CHAT_MODELS entry {entry!r}; expected id=anthropic-model")
+        models[model_id.strip()] = name.strip()
+    return models or dict(DEFAULT_CHAT_MODELS)
+
+
+# Advertised model id -> Anthropic model name
+CHAT_MODELS = _load_models(os.getenv("BRAID_CHAT_MODELS", ""))
+
+
+class ChatState(TypedDict):
+    messages: Annotated[List[AnyMessage], add_messages]
+
+
+async def _chat_node(state: ChatState, config: RunnableConfig) -> Dict[str, Any]:
+    model = config["configurable"]["chat_model"]
+    response = await model.ainvoke(state["messages"], config)
+    return {"messages": [response]}
+
+
+def _build_graph() -> Any:
+    builder = StateGraph(ChatState)
+    builder.add_node("chat", _chat_node)
+    builder.add_edge(START, "chat")
+    builder.add_edge("chat", END)
+    return builder.compile()
+
+
+# Compiled once per process
+chat_graph = _build_graph()
+
+
+def _test_reply(model: str, messages: List[Dict[str, str]]) -> str:
+    user_messages = [msg["content"] for msg in messages if msg["role"] == "user"]
+    last_message = user_messages[-1] if user_messages else ""
+    return f"Hello! I'm a Braid AI agent using {model}. I received your message: '{last_message}'. This is a test response from the LibreChat integration. Once you add your Anthropic API key, I'll provide real AI responses!"
+
+
+def chat_model(model: str, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+               max_tokens: Optional[int] = None) -> Any:
+    """
+    Return the chat model for one request.
+
+    Raises:
+        KeyError: if `model` is not one of the advertised CHAT_MODELS ids
+    """
+    anthropic_model = CHAT_MODELS[model]
+    if ChatAnthropic is not None and os.getenv("ANTHROPIC_API_KEY"):
+        return ChatAnthropic(model=anthropic_model, temperature=temperature, max_tokens=max_tokens, streaming=True)
+    return GenericFakeChatModel(messages=iter([AIMessage(content=_test_reply(model, messages))]))
+
+
+def _config(messages: List[Dict[str, str]], model: str, temperature: Optional[float],
+            max_tokens: Optional[int], metadata: Optional[Dict[str, Any]]) -> RunnableConfig:
+    return {
+        "configurable": {"chat_model": chat_model(model, messages, temperature, max_tokens)},
+        "metadata": metadata or {},
+        "run_name": "librechat_chat"
+    }
+
+
+def _text(content: Any) -> str:
+    """Text of a message or chunk whose content is a string or a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+async def stream_chat(messages: List[Dict[str, str]], model: str, temperature: Optional[float] = None,
+                      max_tokens: Optional[int] = None,
+                      metadata: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """
+    Run the chat graph, yielding text deltas as the model streams them.
+
+    Closing the iterator (e.g. when the client disconnects) cancels the run.
+    """
+    config = _config(messages, model, temperature, max_tokens, metadata)
+    events = chat_graph.astream_events({"messages": convert_to_messages(messages)}, config, version="v2")
+    try:
+        async for event in events:
+            if event["event"] == "on_chat_model_stream":
+                text = _text(event["data"]["chunk"].content)
+                if text:
+                    yield text
+    finally:
+        await events.aclose()
+
+
+async def run_chat(messages: List[Dict[str, str]], model: str, temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Run the chat graph and return the full reply."""
+    config = _config(messages, model, temperature, max_tokens, metadata)
+    result = await chat_graph.ainvoke({"messages": convert_to_messages(messages)}, config)
+    return _text(result["messages"][-1].content)
@@ -0,0 +1,115 @@
+"""
+Conversation-scoped agent and session resolution for the chat endpoints.
+
+Each (user, model) pair gets one agent row and one active agent_sessions row,
+which are reused for every turn instead of being created per message. The ids
+are cached in memory, so after the first turn resolving them costs no database
+round-trips. Concurrent first turns for the same pair share a single lookup.
+
+Configuration:
+- BRAID_CHAT_CACHE_MAX_ENTRIES: (user, model) pairs kept in memory (default 10000)
+- BRAID_CHAT_CACHE_TTL_SECONDS: how long a cached pair is trusted (default 3600)
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+ChatKey = Tuple[str, str]
+
+
+class ChatSessionCache:
+    """LRU cache of (user, model) -> {"agent_id", "session_id"}, backed by the agents and agent_sessions tables."""
+
+    def __init__(self, db: Any, max_entries: int = 10000, ttl: float = 3600):
+        self.db = db
+        self.max_entries = max(max_entries, 1)
+        self.ttl = ttl
+        self._entries: "OrderedDict[ChatKey, Tuple[float, Dict[str, str]]]" = OrderedDict()
+        self._locks: Dict[ChatKey, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def agent_name(user: str, model: str) -> str:
+        return f"librechat:{user}:{model}"
+
+    def _get(self, key: ChatKey) -> Optional[Dict[str, str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, ids = entry
+        if time.monotonic() > expires:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return ids
+
+    async def resolve(self, user: str, model: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """
+        Return {"agent_id", "session_id"} for this user and model, creating the
+        rows on first use. `config` is stored on a newly created agent only.
+        """
+        key = (user, model)
+        ids = self._get(key)
+        if ids is not None:
+            self.hits += 1
+            return ids
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have resolved the pair while we waited
+                ids = self._get(key)
+                if ids is not None:
+                    self.hits += 1
+                    return ids
+                self.misses += 1
+                ids = await self._load(user, model, config or {})
+                self._entries[key] = (time.monotonic() + self.ttl, ids)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                return ids
+        finally:
+            if not lock.locked():
+                self._locks.pop(key, None)
+
+    async def _load(self, user: str, model: str, config: Dict[str, Any]) -> Dict[str, str]:
+        name = self.agent_name(user, model)
+        agent = await self.db.find_agent(name)
+        if agent is None:
+            agent = await self.db.create_agent({
+                "name": name,
+                "description": f"LibreChat conversation agent for {user} on {model}",
+                "config": {"model": model, **config},
+                "tools": []
+            })
+        agent_id = str(agent["id"])
+        session = await self.db.find_agent_session(agent_id)
+        if session is not None:
+            session_id = str(session["id"])
+        else:
+            session_id = str(await self.db.create_agent_session(agent_id, {
+                "user_id": user,
+                "model": model,
+                "source": "librechat"
+            }))
+        return {"agent_id": agent_id, "session_id": session_id}
+
+    def invalidate(self, user: str, model: str) -> None:
+        """Forget a cached pair, e.g. after its agent or session was closed."""
+        self._entries.pop((user, model), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit counters."""
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses}
+
+
+def create_chat_sessions(db: Any) -> ChatSessionCache:
+    """Build the cache from BRAID_CHAT_CACHE_* settings."""
+    return ChatSessionCache(
+        db,
+        max_entries=int(os.getenv("BRAID_CHAT_CACHE_MAX_ENTRIES", "10000")),
+        ttl=float(os.getenv("BRAID_CHAT_CACHE_TTL_SECONDS", "3600"))
+    )
@@ -0,0 +1,256 @@
+"""
+Buffered, batched writer for append-only tables such as agent_logs.
+
+Logging an action only appends a row to an in-memory buffer. A background task
+on the server's event loop writes the buffer with one bulk insert whenever it
+reaches `batch_size` rows or every `flush_interval` seconds, whichever comes
+first. Rows carry client-generated ids and are inserted with ON CONFLICT DO
+NOTHING, so retrying a batch after an ambiguous failure never duplicates it.
+
+When more than `max_pending` rows are waiting (e.g. the database is down) the
+overflow policy decides what happens to new rows:
+
+- "block": put() waits until a flush makes room (backpressure on the caller)
+- "drop": new rows are discarded and counted
+- "spill": new rows are appended to a JSON-lines file, which is replayed once
+  the database accepts writes again
+
+spill_path may be shared by several worker processes. Each process adds its
+pid to the file name (agent_logs.jsonl -> agent_logs.<pid>.jsonl) and only
+replays its own file, or one left by a process that is no longer running.
+
+close() stops the background task and flushes whatever is left; with the
+"spill" policy, rows that still cannot be written are spilled to disk.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+
+# How long close() lets an in-flight write finish before cancelling it
+CLOSE_TIMEOUT_SECONDS = 10
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to another user
+        return True
+    return True
+
+
+class LogBuffer:
+    """In-memory buffer that writes rows in bulk through an async `write(rows)` callable."""
+
+    def __init__(self, write: Callable[[List[Dict[str, Any]]], Awaitable[None]], batch_size: int = 500,
+                 flush_interval: float = 2.0, max_pending: int = 10000, overflow: str = "spill",
+                 spill_path: Optional[Path] = None, name: str = "agent logs"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        if overflow == "spill" and spill_path is None:
+            raise ValueError("overflow='spill' requires a spill_path")
+        self._write = write
+        self.name = name
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, self.batch_size)
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self._rows: Deque[Dict[str, Any]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._closing = False
+        self.stats_counters = {"written": 0, "batches": 0, "failures": 0, "dropped": 0, "spilled": 0,
+                               "replayed": 0}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _ensure_started(self) -> None:
+        """Start the flush task on the running loop, if there is one."""
+        if self._closing or (self._task is not None and not self._task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (e.g. a sync script); rows are written by flush() or close()
+            return
+        self._task = loop.create_task(self._run())
+
+    def add(self, row: Dict[str, Any]) -> bool:
+        """
+        Queue a row without waiting. Returns False if it was dropped.
+
+        With the "block" policy a full buffer still accepts the row; use put()
+        to wait for room instead.
+        """
+        if len(self._rows) >= self.max_pending:
+            if self.overflow == "drop":
+                self.stats_counters["dropped"] += 1
+                return False
+            if self.overflow == "spill":
+                self._spill([row])
+                return True
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._wake.set()
+        self._ensure_started()
+        return True
+
+    async def put(self, row: Dict[str, Any]) -> bool:
+        """Queue a row, waiting for room first if the policy is "block"."""
+        while self.overflow == "block" and len(self._rows) >= self.max_pending:
+            self._space.clear()
+            self._wake.set()
+            self._ensure_started()
+            await self._space.wait()
+        return self.add(row)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything buffered now. Returns the number of rows written."""
+        async with self._flush_lock:
+            written = 0
+            while self._rows:
+                batch = [self._rows.popleft() for _ in range(min(self.batch_size, len(self._rows)))]
+                try:
+                    await self._write(batch)
+                except asyncio.CancelledError:
+                    self._rows.extendleft(reversed(batch))
+                    raise
+                except Exception as e:
+                    self.stats_counters["failures"] += 1
+                    logger.warning(f"Failed to write {len(batch)} {self.name}, will retry: {e}")
+                    self._rows.extendleft(reversed(batch))
+                    self._shed()
+                    break
+                written += len(batch)
+                self.stats_counters["written"] += len(batch)
+                self.stats_counters["batches"] += 1
+                self._space.set()
+            else:
+                # The database is taking writes again; catch up on spilled rows
+                written += await self._replay_spill()
+            return written
+
+    def _shed(self) -> None:
+        """Apply the overflow policy to rows beyond max_pending after a failed flush."""
+        excess = len(self._rows) - self.max_pending
+        if excess <= 0 or self.overflow == "block":
+            return
+        rows = [self._rows.pop() for _ in range(excess)][::-1]
+        if self.overflow == "spill":
+            self._spill(rows)
+        else:
+            self.stats_counters["dropped"] += len(rows)
+
+    def spill_file(self) -> Path:
+        """This process's spill file (looked up on each use, so it stays right after a fork)."""
+        return self.spill_path.with_name(f"{self.spill_path.stem}.{os.getpid()}{self.spill_path.suffix}")
+
+    def _orphaned_spill(self) -> Optional[Path]:
+        """A spill or replay file left by a process that is no longer running, if any."""
+        base = self.spill_path
+        # Written before spill files were per process
+        for legacy in (base, base.with_name(base.name + ".replay")):
+            if legacy.exists():
+                return legacy
+        for path in base.parent.glob(f"{base.stem}.*{base.suffix}*"):
+            pid = path.name[len(base.stem) + 1:].split(".", 1)[0]
+            if (not pid.isdigit() or int(pid) == os.getpid()
+                    or path.name not in (f"{base.stem}.{pid}{base.suffix}", f"{base.stem}.{pid}{base.suffix}.replay")):
+                continue
+            if not _pid_alive(int(pid)):
+                return path
+        return None
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        spill_file = self.spill_file()
+        spill_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(spill_file, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(row, default=str) + "\n" for row in rows)
+        self.stats_counters["spilled"] += len(rows)
+
+    async def _replay_spill(self) -> int:
+        """Write spilled rows back in batches. Caller holds the flush lock."""
+        if self.spill_path is None:
+            return 0
+        # Rows spilled while replaying go to a fresh file
+        spill_file = self.spill_file()
+        replay = spill_file.with_name(spill_file.name + ".replay")
+        if not replay.exists():
+            source = spill_file if spill_file.exists() else self._orphaned_spill()
+            if source is None:
+                return 0
+            try:
+                os.replace(source, replay)
+            except FileNotFoundError:
+                # Another process adopted the orphaned file first
+                return 0
+        rows = []
+        for line in replay.read_text(encoding="utf-8").splitlines():
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                # A line cut short by a crash mid-write
+                continue
+        written = 0
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                await self._write(batch)
+                written += len(batch)
+        except Exception as e:
+            self.stats_counters["failures"] += 1
+            logger.warning(f"Failed to replay spilled {self.name}, will retry: {e}")
+            replay.write_text("".join(json.dumps(row, default=str) + "\n" for row in rows[written:]),
+                              encoding="utf-8")
+        else:
+            replay.unlink()
+        self.stats_counters["written"] += written
+        self.stats_counters["replayed"] += written
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffer size, policy and write counters."""
+        return {"pending": len(self._rows), "batch_size": self.batch_size, "max_pending": self.max_pending,
+                "overflow": self.overflow, **self.stats_counters}
+
+    async def close(self) -> None:
+        """Stop the flush task and write what is left."""
+        self._closing = True
+        self._wake.set()
+        task, self._task = self._task, None
+        if task is not None:
+            done, _ = await asyncio.wait({task}, timeout=CLOSE_TIMEOUT_SECONDS)
+            if not done:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+        if self._rows:
+            if self.overflow == "spill":
+                self._spill(list(self._rows))
+            else:
+                logger.warning(f"Discarding {len(self._rows)} {self.name} that could not be written")
+                self.stats_counters["dropped"] += len(self._rows)
+            self._rows.clear()
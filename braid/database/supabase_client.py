@@ -1,32 +1,165 @@
 """
 Supabase client configuration for Braid AI agents.
+
+All database access goes through the async Supabase client, so queries never
+block the server's event loop. The underlying HTTP connection pool is created
+on first use and shared by every request; call close() on shutdown.
+
+Agent action logs are buffered and written in bulk (see log_buffer.py):
+- BRAID_LOG_BATCH_SIZE: rows per insert (default 500)
+- BRAID_LOG_FLUSH_SECONDS: maximum time a row waits in the buffer (default 2)
+- BRAID_LOG_MAX_PENDING: buffered rows before the overflow policy applies (default 10000)
+- BRAID_LOG_OVERFLOW: "spill" (default), "drop" or "block"
+- BRAID_LOG_SPILL_PATH: spill file (default ~/.cache/braid/agent_logs.jsonl); each
+  process adds its pid to the name
+
+Workflow executions recorded with record_workflow_execution() are batched the
+same way, spilling to workflow_executions.jsonl next to the log spill file.
 """
+import asyncio
 import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+from postgrest.types import ReturnMethod
+from supabase import acreate_client, AsyncClient
 import logging
 
+from braid.database.log_buffer import LogBuffer
+
 logger = logging.getLogger(__name__)
 
 class SupabaseClient:
-    """Supabase client wrapper for Braid agents."""
-    
+    """Async Supabase client wrapper for Braid agents."""
+
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
         self.anon_key = os.getenv("SUPABASE_ANON_KEY")
         self.service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-        
+
         if not self.url or not self.anon_key:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set")
-        
-        # Use service role key for admin operations, anon key for regular operations
-        self.client: Client = create_client(self.url, self.service_role_key or self.anon_key)
-        self.anon_client: Client = create_client(self.url, self.anon_key)
-    
+
+        self._client: Optional[AsyncClient] = None
+        self._anon_client: Optional[AsyncClient] = None
+        self._lock = asyncio.Lock()
+        buffer_options = {
+            "batch_size": int(os.getenv("BRAID_LOG_BATCH_SIZE", "500")),
+            "flush_interval": float(os.getenv("BRAID_LOG_FLUSH_SECONDS", "2")),
+            "max_pending": int(os.getenv("BRAID_LOG_MAX_PENDING", "10000")),
+            "overflow": os.getenv("BRAID_LOG_OVERFLOW", "spill")
+        }
+        spill_path = Path(os.getenv("BRAID_LOG_SPILL_PATH", Path.home() / ".cache" / "braid" / "agent_logs.jsonl"))
+        self.logs = LogBuffer(self._insert_logs, spill_path=spill_path, **buffer_options)
+        self.executions = LogBuffer(self._insert_executions, name="workflow executions",
+                                    spill_path=spill_path.with_name("workflow_executions.jsonl"), **buffer_options)
+
+    async def get_client(self) -> AsyncClient:
+        """Client for admin operations (service role key, or anon key if unset)."""
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    self._client = await acreate_client(self.url, self.service_role_key or self.anon_key)
+        return self._client
+
+    async def get_anon_client(self) -> AsyncClient:
+        """Client for regular operations with the anon key."""
+        if self._anon_client is None:
+            async with self._lock:
+                if self._anon_client is None:
+                    self._anon_client = await acreate_client(self.url, self.anon_key)
+        return self._anon_client
+
+    async def close(self) -> None:
+        """Flush buffered rows and close pooled connections."""
+        await self.executions.close()
+        await self.logs.close()
+        for client in (self._client, self._anon_client):
+            if client is not None:
+                try:
+                    await client.postgrest.aclose()
+                except Exception as e:
+                    logger.warning(f"Failed to close Supabase client: {e}")
+        self._client = None
+        self._anon_client = None
+
+    async def ping(self) -> None:
+        """Run a trivial query; raises if the database is unreachable."""
+        client = await self.get_client()
+        await client.table("agents").select("count").execute()
+
+    async def create_agent(self, agent_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an agent and return its row."""
+        try:
+            client = await self.get_client()
+            result = await client.table("agents").insert(agent_data).execute()
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Failed to create agent: {e}")
+            raise
+
+    async def find_agent(self, name: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the oldest active agent with this name, or None."""
+        client = await self.get_client()
+        result = await client.table("agents").select("*").eq("name", name).eq("is_active", True) \
+            .order("created_at").limit(1).execute()
+        return result.data[0] if result.data else None
+
+    async def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve an agent, or None if it does not exist."""
+        client = await self.get_client()
+        result = await client.table("agents").select("*").eq("id", agent_id).execute()
+        return result.data[0] if result.data else None
+
+    async def create_workflow_execution(self, execution_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a workflow execution record and return its row."""
+        try:
+            client = await self.get_client()
+            result = await client.table("workflow_executions").insert(execution_data).execute()
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Failed to create workflow execution: {e}")
+            raise
+
+    async def record_workflow_execution(self, execution_data: Dict[str, Any]) -> str:
+        """Queue a workflow execution record for the next batch and return its id."""
+        execution_id = execution_data.get("id") or str(uuid.uuid4())
+        # A bulk insert sends every column for every row, so spell out the
+        # table defaults for the columns that are NOT NULL or defaulted.
+        await self.executions.put({"input_data": {}, "status": "running",
+                                   "started_at": datetime.now(timezone.utc).isoformat(),
+                                   **execution_data, "id": execution_id})
+        return execution_id
+
+    async def _insert_executions(self, rows: List[Dict[str, Any]]) -> None:
+        """Bulk-insert workflow execution rows, skipping ids that are already stored."""
+        client = await self.get_client()
+        await client.table("workflow_executions").upsert(rows, returning=ReturnMethod.minimal,
+                                                         ignore_duplicates=True).execute()
+
+    async def update_workflow_execution(self, execution_id: str, updates: Dict[str, Any]) -> bool:
+        """Update a workflow execution record."""
+        try:
+            client = await self.get_client()
+            await client.table("workflow_executions").update(updates).eq("id", execution_id).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update workflow execution {execution_id}: {e}")
+            return False
+
+    async def get_workflow_execution(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a workflow execution, or None if it does not exist."""
+        await self.executions.flush()
+        client = await self.get_client()
+        result = await client.table("workflow_executions").select("*").eq("id", execution_id).execute()
+        return result.data[0] if result.data else None
+
     async def create_agent_session(self, agent_id: str, session_data: Dict[str, Any]) -> str:
         """Create a new agent session."""
         try:
-            result = self.client.table("agent_sessions").insert({
+            client = await self.get_client()
+            result = await client.table("agent_sessions").insert({
                 "agent_id": agent_id,
                 "session_data": session_data,
                 "status": "active"
@@ -35,29 +168,39 @@ class SupabaseClient:
         except Exception as e:
             logger.error(f"Failed to create agent session: {e}")
             raise
-    
+
+    async def find_agent_session(self, agent_id: str, status: str = "active") -> Optional[Dict[str, Any]]:
+        """Retrieve the most recent session of an agent with the given status, or None."""
+        client = await self.get_client()
+        result = await client.table("agent_sessions").select("*").eq("agent_id", agent_id).eq("status", status) \
+            .order("created_at", desc=True).limit(1).execute()
+        return result.data[0] if result.data else None
+
     async def update_agent_session(self, session_id: str, updates: Dict[str, Any]) -> bool:
         """Update an existing agent session."""
         try:
-            self.client.table("agent_sessions").update(updates).eq("id", session_id).execute()
+            client = await self.get_client()
+            await client.table("agent_sessions").update(updates).eq("id", session_id).execute()
             return True
         except Exception as e:
             logger.error(f"Failed to update agent session {session_id}: {e}")
             return False
-    
+
     async def get_agent_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve an agent session."""
         try:
-            result = self.client.table("agent_sessions").select("*").eq("id", session_id).execute()
+            client = await self.get_client()
+            result = await client.table("agent_sessions").select("*").eq("id", session_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to get agent session {session_id}: {e}")
             return None
-    
+
     async def store_agent_memory(self, agent_id: str, memory_type: str, content: Dict[str, Any]) -> str:
         """Store agent memory/state."""
         try:
-            result = self.client.table("agent_memory").insert({
+            client = await self.get_client()
+            result = await client.table("agent_memory").insert({
                 "agent_id": agent_id,
                 "memory_type": memory_type,
                 "content": content
@@ -66,37 +209,51 @@ class SupabaseClient:
         except Exception as e:
             logger.error(f"Failed to store agent memory: {e}")
             raise
-    
+
     async def get_agent_memory(self, agent_id: str, memory_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieve agent memory/state."""
         try:
-            query = self.client.table("agent_memory").select("*").eq("agent_id", agent_id)
+            client = await self.get_client()
+            query = client.table("agent_memory").select("*").eq("agent_id", agent_id)
             if memory_type:
                 query = query.eq("memory_type", memory_type)
-            result = query.execute()
+            result = await query.execute()
             return result.data
         except Exception as e:
             logger.error(f"Failed to get agent memory for {agent_id}: {e}")
             return []
-    
+
     async def log_agent_action(self, agent_id: str, action: str, details: Dict[str, Any]) -> str:
-        """Log agent actions for observability."""
-        try:
-            result = self.client.table("agent_logs").insert({
-                "agent_id": agent_id,
-                "action": action,
-                "details": details,
-                "timestamp": "now()"
-            }).execute()
-            return result.data[0]["id"]
-        except Exception as e:
-            logger.error(f"Failed to log agent action: {e}")
-            raise
-    
+        """Log agent actions for observability. The row is queued and written in the next batch."""
+        log_id = str(uuid.uuid4())
+        await self.logs.put({
+            "id": log_id,
+            "agent_id": agent_id,
+            "action": action,
+            "details": details,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        })
+        return log_id
+
+    async def _insert_logs(self, rows: List[Dict[str, Any]]) -> None:
+        """Bulk-insert log rows, skipping ids that are already stored."""
+        client = await self.get_client()
+        await client.table("agent_logs").upsert(rows, returning=ReturnMethod.minimal,
+                                                ignore_duplicates=True).execute()
+
+    async def get_agent_logs(self, agent_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Retrieve an agent's most recent action logs."""
+        await self.logs.flush()
+        client = await self.get_client()
+        result = await client.table("agent_logs").select("*").eq("agent_id", agent_id) \
+            .order("timestamp", desc=True).limit(limit).execute()
+        return result.data
+
     async def get_integration_config(self, integration_name: str) -> Optional[Dict[str, Any]]:
         """Get integration configuration."""
         try:
-            result = self.client.table("integrations").select("*").eq("name", integration_name).execute()
+            client = await self.get_client()
+            result = await client.table("integrations").select("*").eq("name", integration_name).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to get integration config for {integration_name}: {e}")
@@ -3,15 +3,29 @@ LibreChat adapter for Braid AI Agent System
 Provides OpenAI-compatible API endpoints for LibreChat integration
 """
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any, AsyncGenerator
+import asyncio
 import json
 import uuid
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+
+from braid.chat_graph import CHAT_MODELS, run_chat, stream_chat
+from braid.database.chat_sessions import ChatSessionCache, create_chat_sessions
 
 router = APIRouter(prefix="/v1", tags=["LibreChat"])
 
+# (user, model) -> agent and session ids, created on first use
+_chat_sessions: Optional[ChatSessionCache] = None
+
+def _get_chat_sessions(db) -> ChatSessionCache:
+    global _chat_sessions
+    if _chat_sessions is None:
+        _chat_sessions = create_chat_sessions(db)
+    return _chat_sessions
+
 # OpenAI-compatible request/response models
 class ChatMessage(BaseModel):
     role: str
@@ -53,31 +67,104 @@ async def list_models():
     """List available Braid AI models in OpenAI format."""
     models = [
         {
-            "id": "claude-4-sonnet-20250101",
-            "object": "model",
-            "created": int(time.time()),
-            "owned_by": "braid-ai"
-        },
-        {
-            "id": "claude-4-opus-20250101", 
+            "id": model_id,
             "object": "model",
             "created": int(time.time()),
             "owned_by": "braid-ai"
-        },
-        {
-            "id": "claude-4-haiku-20250101",
-            "object": "model", 
-            "created": int(time.time()),
-            "owned_by": "braid-ai"
         }
+        for model_id in CHAT_MODELS
     ]
     
     return ModelsResponse(data=models)
 
+async def _record_chat(db, request: ChatCompletionRequest, ids: Dict[str, str], user_id: str,
+                       started_at: str, content: str, status: str, error: Optional[str] = None) -> str:
+    """Queue the execution record and log for one chat turn; both are written in background batches."""
+    execution = {
+        "agent_id": ids["agent_id"],
+        "workflow_name": "librechat_chat",
+        "input_data": {
+            "messages": [msg.dict() for msg in request.messages],
+            "user_id": user_id,
+            "session_id": ids["session_id"]
+        },
+        "output_data": {"content": content},
+        "status": status,
+        "started_at": started_at,
+        "completed_at": datetime.now(timezone.utc).isoformat()
+    }
+    if error is not None:
+        execution["error_message"] = error
+    execution_id = await db.record_workflow_execution(execution)
+    
+    await db.log_agent_action(
+        agent_id=ids["agent_id"],
+        action="librechat_chat",
+        details={
+            "model": request.model,
+            "message_count": len(request.messages),
+            "execution_id": execution_id,
+            "session_id": ids["session_id"],
+            "stream": bool(request.stream),
+            "status": status
+        }
+    )
+    return execution_id
+
+async def _stream_completion(db, request: ChatCompletionRequest, ids: Dict[str, str], user_id: str,
+                             http_request: Request) -> AsyncGenerator[str, None]:
+    """Server-sent events of chat.completion.chunk deltas, ending with [DONE]."""
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
+    created = int(time.time())
+    started_at = datetime.now(timezone.utc).isoformat()
+    parts: List[str] = []
+    status, error = "completed", None
+    
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        return "data: " + json.dumps({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": request.model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }) + "\n\n"
+    
+    deltas = stream_chat(
+        [msg.dict() for msg in request.messages], request.model,
+        temperature=request.temperature, max_tokens=request.max_tokens,
+        metadata={"agent_id": ids["agent_id"], "session_id": ids["session_id"]}
+    )
+    try:
+        yield chunk({"role": "assistant", "content": ""})
+        async for text in deltas:
+            # Stop the graph run as soon as the client goes away
+            if await http_request.is_disconnected():
+                status = "cancelled"
+                break
+            parts.append(text)
+            yield chunk({"content": text})
+        else:
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+    except (asyncio.CancelledError, GeneratorExit):
+        status = "cancelled"
+        raise
+    except Exception as e:
+        status, error = "failed", str(e)
+        yield "data: " + json.dumps({"error": {"message": f"Chat completion failed: {e}", "type": "server_error"}}) + "\n\n"
+    finally:
+        # Recorded before closing the run, since closing may be interrupted by cancellation
+        await _record_chat(db, request, ids, user_id, started_at, "".join(parts), status, error)
+        await deltas.aclose()
+
 @router.post("/chat/completions")
 async def chat_completions(request: ChatCompletionRequest, http_request: Request):
     """OpenAI-compatible chat completions endpoint for LibreChat."""
     try:
+        # Rejected before any rows are created or the stream starts
+        if request.model not in CHAT_MODELS:
+            raise HTTPException(status_code=404, detail=f"Model '{request.model}' not found")
+        
         from braid.database.supabase_client import supabase_client
         
         # Extract the last user message
@@ -85,51 +172,28 @@ async def chat_completions(request: ChatCompletionRequest, http_request: Request
         if not user_messages:
             raise HTTPException(status_code=400, detail="No user message found")
         
-        last_message = user_messages[-1].content
+        # Reuse this user's agent and session for the model (cached after the first turn)
+        user_id = request.user or "librechat_user"
+        ids = await _get_chat_sessions(supabase_client).resolve(user_id, request.model, {
+            "temperature": request.temperature,
+            "max_tokens": request.max_tokens
+        })
         
-        # Create a Braid agent for this conversation
-        agent_data = {
-            "agent_type": "chat",
-            "config": {
-                "model": request.model,
-                "temperature": request.temperature,
-                "max_tokens": request.max_tokens
-            },
-            "tools": []
-        }
-        
-        # Create agent in database
-        agent_result = supabase_client.client.table("agents").insert(agent_data).execute()
-        agent_id = agent_result.data[0]["id"]
-        
-        # Execute chat workflow
-        workflow_data = {
-            "agent_id": str(agent_id),
-            "workflow_name": "librechat_chat",
-            "input_data": {
-                "messages": [msg.dict() for msg in request.messages],
-                "user_id": request.user or "librechat_user",
-                "session_id": str(uuid.uuid4())
-            }
-        }
-        
-        workflow_result = supabase_client.client.table("workflow_executions").insert(workflow_data).execute()
-        execution_id = workflow_result.data[0]["id"]
+        if request.stream:
+            return StreamingResponse(
+                _stream_completion(supabase_client, request, ids, user_id, http_request),
+                media_type="text/event-stream",
+                # Keep proxies from buffering the stream
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
         
-        # For now, return a mock response since we don't have the actual AI integration yet
-        # In production, this would call the actual Claude API through Braid
-        response_content = f"Hello! I'm a Braid AI agent using {request.model}. I received your message: '{last_message}'. This is a test response from the LibreChat integration. Once you add your Anthropic API key, I'll provide real AI responses!"
-        
-        # Log the interaction
-        await supabase_client.log_agent_action(
-            agent_id=str(agent_id),
-            action="librechat_chat",
-            details={
-                "model": request.model,
-                "message_count": len(request.messages),
-                "execution_id": str(execution_id)
-            }
+        started_at = datetime.now(timezone.utc).isoformat()
+        response_content = await run_chat(
+            [msg.dict() for msg in request.messages], request.model,
+            temperature=request.temperature, max_tokens=request.max_tokens,
+            metadata={"agent_id": ids["agent_id"], "session_id": ids["session_id"]}
         )
+        await _record_chat(supabase_client, request, ids, user_id, started_at, response_content, "completed")
         
         # Return OpenAI-compatible response
         response = ChatCompletionResponse(
@@ -152,13 +216,15 @@ async def chat_completions(request: ChatCompletionRequest, http_request: Request
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat completion failed: {str(e)}")
 
 @router.get("/models/{model_id}")
 async def get_model(model_id: str):
     """Get specific model information."""
-    if model_id not in ["claude-4-sonnet-20250101", "claude-4-opus-20250101", "claude-4-haiku-20250101"]:
+    if model_id not in CHAT_MODELS:
         raise HTTPException(status_code=404, detail="Model not found")
     
     return ModelInfo(
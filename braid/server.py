@@ -2,9 +2,8 @@
 Braid AI Agent System - Railway Web Server
 """
 import os
-import asyncio
 from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
@@ -12,6 +11,7 @@ import logging
 
 from braid.database.supabase_client import supabase_client
 from braid.librechat_adapter import router as librechat_router
+from braid.workflow_engine import UnknownWorkflow, WorkflowQueueFull, create_workflow_engine
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +35,21 @@ app.add_middleware(
 # Include LibreChat adapter routes
 app.include_router(librechat_router)
 
+# Runs workflow executions with bounded concurrency
+workflow_engine = create_workflow_engine(supabase_client)
+
+@app.on_event("startup")
+async def load_workflows():
+    """Compile the configured workflow graphs once."""
+    loaded = workflow_engine.registry.load_from_env()
+    logger.info(f"Loaded workflows: {loaded}")
+
+@app.on_event("shutdown")
+async def close_database():
+    """Cancel unfinished workflows and close pooled database connections."""
+    await workflow_engine.close()
+    await supabase_client.close()
+
 # Request/Response Models
 class AgentRequest(BaseModel):
     agent_type: str
@@ -68,11 +83,12 @@ async def root():
 async def health_check():
     """Health check endpoint for Railway."""
     try:
-        # Test database connection (supabase client is synchronous, not async)
-        supabase_client.client.table("agents").select("count").execute()
+        # Test database connection
+        await supabase_client.ping()
         return {
             "status": "healthy",
             "database": "connected",
+            "workflows": workflow_engine.stats(),
             "timestamp": "now()"
         }
     except Exception as e:
@@ -91,14 +107,14 @@ async def create_agent(request: AgentRequest):
         }
         
         # Create agent in database
-        result = supabase_client.client.table("agents").insert({
+        agent = await supabase_client.create_agent({
             "name": f"{request.agent_type}_agent",
             "description": f"AI agent of type {request.agent_type}",
             "config": default_config,
             "tools": request.tools
-        }).execute()
+        })
         
-        agent_id = result.data[0]["id"]
+        agent_id = agent["id"]
         
         # Log agent creation
         await supabase_client.log_agent_action(
@@ -120,10 +136,10 @@ async def create_agent(request: AgentRequest):
 async def get_agent(agent_id: str):
     """Get agent details."""
     try:
-        result = supabase_client.client.table("agents").select("*").eq("id", agent_id).execute()
-        if not result.data:
+        agent = await supabase_client.get_agent(agent_id)
+        if agent is None:
             raise HTTPException(status_code=404, detail="Agent not found")
-        return result.data[0]
+        return agent
     except HTTPException:
         raise
     except Exception as e:
@@ -131,32 +147,19 @@ async def get_agent(agent_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/agents/{agent_id}/workflows", response_model=WorkflowResponse)
-async def execute_workflow(agent_id: str, request: WorkflowRequest, background_tasks: BackgroundTasks):
-    """Execute a workflow for an agent."""
+async def execute_workflow(agent_id: str, request: WorkflowRequest):
+    """Queue a workflow execution for an agent."""
     try:
-        # Create workflow execution record
-        result = supabase_client.client.table("workflow_executions").insert({
-            "agent_id": agent_id,
-            "workflow_name": request.workflow_name,
-            "input_data": request.input_data,
-            "status": "running"
-        }).execute()
-        
-        execution_id = result.data[0]["id"]
-        
-        # Add background task to actually execute the workflow
-        background_tasks.add_task(
-            execute_workflow_background,
-            execution_id,
-            agent_id,
-            request.workflow_name,
-            request.input_data
-        )
+        execution_id = await workflow_engine.submit(agent_id, request.workflow_name, request.input_data)
         
         return WorkflowResponse(
-            execution_id=str(execution_id),
-            status="running"
+            execution_id=execution_id,
+            status="queued"
         )
+    except UnknownWorkflow as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except WorkflowQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.error(f"Failed to start workflow execution: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -165,10 +168,10 @@ async def execute_workflow(agent_id: str, request: WorkflowRequest, background_t
 async def get_workflow_status(execution_id: str):
     """Get workflow execution status."""
     try:
-        result = supabase_client.client.table("workflow_executions").select("*").eq("id", execution_id).execute()
-        if not result.data:
+        execution = await supabase_client.get_workflow_execution(execution_id)
+        if execution is None:
             raise HTTPException(status_code=404, detail="Workflow execution not found")
-        return result.data[0]
+        return execution
     except HTTPException:
         raise
     except Exception as e:
@@ -189,42 +192,12 @@ async def get_agent_memory(agent_id: str, memory_type: Optional[str] = None):
 async def get_agent_logs(agent_id: str, limit: int = 100):
     """Get agent action logs."""
     try:
-        result = supabase_client.client.table("agent_logs").select("*").eq("agent_id", agent_id).order("timestamp", desc=True).limit(limit).execute()
-        return {"agent_id": agent_id, "logs": result.data}
+        logs = await supabase_client.get_agent_logs(agent_id, limit)
+        return {"agent_id": agent_id, "logs": logs}
     except Exception as e:
         logger.error(f"Failed to get agent logs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def execute_workflow_background(execution_id: str, agent_id: str, workflow_name: str, input_data: Dict[str, Any]):
-    """Background task to execute workflow."""
-    try:
-        # This is where you'd integrate with LangGraph to actually execute the workflow
-        # For now, we'll simulate a workflow execution
-        await asyncio.sleep(2)  # Simulate processing time
-        
-        # Update execution status
-        supabase_client.client.table("workflow_executions").update({
-            "status": "completed",
-            "output_data": {"result": "Workflow completed successfully", "input": input_data},
-            "completed_at": "now()"
-        }).eq("id", execution_id).execute()
-        
-        # Log completion
-        await supabase_client.log_agent_action(
-            agent_id=agent_id,
-            action="workflow_completed",
-            details={"workflow_name": workflow_name, "execution_id": execution_id}
-        )
-        
-    except Exception as e:
-        logger.error(f"Workflow execution failed: {e}")
-        # Update execution status to failed
-        supabase_client.client.table("workflow_executions").update({
-            "status": "failed",
-            "error_message": str(e),
-            "completed_at": "now()"
-        }).eq("id", execution_id).execute()
-
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(
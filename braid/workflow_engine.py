@@ -0,0 +1,369 @@
+"""
+Execution engine for the /agents/{agent_id}/workflows endpoint.
+
+Workflows are compiled LangGraph graphs, loaded once at startup and looked up
+by name. Each submitted execution runs as an asyncio task; a semaphore bounds
+how many run at once, and submissions beyond the queue limit are rejected so
+the server can answer 429 instead of fanning out without limit. Progress is
+written back to the workflow_executions row as the graph steps:
+
+    queued -> running (output_data.steps grows) -> completed | failed | cancelled
+                                                -> waiting -> completed | failed
+
+Graphs listed in BRAID_ISOLATED_WORKFLOWS run on the persistent process pool
+from core/tools/workflow/execution/subgraphs.py instead of the event loop,
+which suits CPU-heavy graphs.
+
+In-process graphs are registered with resume_scheduler under their workflow
+name, so a long workflow_wait checkpoints and returns instead of holding the
+run open. The execution is then marked waiting, and the engine records the
+final status and output when resume_scheduler finishes the run. Graphs compiled without a checkpointer get the registry's
+checkpointer (in memory by default, so such waits do not survive a restart;
+compile the graph with a persistent checkpointer for that).
+
+Configuration:
+- BRAID_WORKFLOWS: comma-separated name=graph pairs, where graph is
+  "path/to/file.py:attr" or "package.module:attr", e.g.
+  "research=agents/research/graph.py:graph"
+- BRAID_ISOLATED_WORKFLOWS: names of workflows to run in worker processes
+- BRAID_WORKFLOW_CONCURRENCY: executions running at once (default 4)
+- BRAID_WORKFLOW_QUEUE_SIZE: executions waiting for a slot (default 100)
+- BRAID_WORKFLOW_TIMEOUT_SECONDS: per-execution time limit (default 600)
+- BRAID_WORKFLOW_PROGRESS_SECONDS: minimum time between progress writes (default 1)
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from core.tools.workflow.execution.scheduler import resume_scheduler
+from core.tools.workflow.execution.subgraphs import load_graph, subgraph_pool
+
+try:
+    from langgraph.checkpoint.memory import MemorySaver
+except ImportError:
+    MemorySaver = None
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownWorkflow(LookupError):
+    """Raised when no graph is registered under the requested workflow name."""
+
+
+class WorkflowQueueFull(Exception):
+    """Raised when the engine already holds as many executions as it accepts."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _jsonable(value: Any) -> Any:
+    """Graph state as JSON-compatible data (messages and other objects become strings)."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class WorkflowRegistry:
+    """Compiled graphs by workflow name."""
+
+    def __init__(self, checkpointer: Any = None):
+        self.checkpointer = checkpointer
+        self._graphs: Dict[str, Any] = {}
+        self._specs: Dict[str, str] = {}
+        self.isolated: Set[str] = set()
+
+    def register(self, name: str, graph: Any, spec: Optional[str] = None, isolated: bool = False) -> None:
+        """
+        Register a compiled graph. Isolated workflows need the `spec` they were loaded from.
+
+        In-process graphs with a checkpointer (their own, or the registry's)
+        are also registered with resume_scheduler, as graph_id `name`.
+        """
+        if isolated and spec is None:
+            raise ValueError(f"Isolated workflow {name!r} needs the spec it was loaded from")
+        if not isolated:
+            if getattr(graph, "checkpointer", None) is None and self.checkpointer is not None:
+                graph = graph.copy(update={"checkpointer": self.checkpointer})
+            if getattr(graph, "checkpointer", None) is not None:
+                resume_scheduler.register_graph(graph, name)
+        self._graphs[name] = graph
+        if spec is not None:
+            self._specs[name] = spec
+        if isolated:
+            self.isolated.add(name)
+        else:
+            self.isolated.discard(name)
+
+    def load(self, workflows: str, isolated: str = "") -> List[str]:
+        """
+        Load and register graphs from "name=spec,..." and return the names loaded.
+
+        A graph that fails to load is logged and skipped, so one broken
+        workflow does not stop the server from starting.
+        """
+        isolated_names = {name.strip() for name in isolated.split(",") if name.strip()}
+        loaded = []
+        for entry in filter(None, (item.strip() for item in workflows.split(","))):
+            name, sep, spec = entry.partition("=")
+            if not sep or not name.strip() or not spec.strip():
+                logger.error(f"Invalid workflow entry {entry!r}; expected name=path.py:attr")
+                continue
+            name, spec = name.strip(), spec.strip()
+            try:
+                graph = load_graph(spec)
+            except Exception as e:
+                logger.error(f"Failed to load workflow {name!r} from {spec}: {e}")
+                continue
+            self.register(name, graph, spec=spec, isolated=name in isolated_names)
+            loaded.append(name)
+        return loaded
+
+    def load_from_env(self) -> List[str]:
+        """Load BRAID_WORKFLOWS, running BRAID_ISOLATED_WORKFLOWS in worker processes."""
+        return self.load(os.getenv("BRAID_WORKFLOWS", ""), os.getenv("BRAID_ISOLATED_WORKFLOWS", ""))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._graphs
+
+    def get(self, name: str) -> Any:
+        graph = self._graphs.get(name)
+        if graph is None:
+            raise UnknownWorkflow(f"Unknown workflow: '{name}'. Available workflows are: {self.names()}")
+        return graph
+
+    def spec(self, name: str) -> Optional[str]:
+        return self._specs.get(name)
+
+    def names(self) -> List[str]:
+        return sorted(self._graphs)
+
+
+class WorkflowEngine:
+    """Runs registered workflows with bounded concurrency and a bounded queue."""
+
+    def __init__(self, db: Any, registry: WorkflowRegistry, max_concurrency: int = 4, max_queue: int = 100,
+                 timeout: float = 600, progress_interval: float = 1.0):
+        self.db = db
+        self.registry = registry
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self.timeout = timeout
+        self.progress_interval = progress_interval
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._reserved = 0
+        self._running = 0
+        # Executions stopped at a durable wait: execution_id -> (agent_id, steps before the wait)
+        self._waiting: Dict[str, Tuple[str, List[str]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats_counters = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "waiting": 0,
+                               "rejected": 0}
+        resume_scheduler.add_listener(self._on_resumed)
+
+    @property
+    def capacity(self) -> int:
+        """Executions accepted at once, running plus queued."""
+        return self.max_concurrency + self.max_queue
+
+    async def submit(self, agent_id: str, workflow_name: str, input_data: Dict[str, Any]) -> str:
+        """
+        Create a queued execution record and schedule the run. Returns the execution id.
+
+        Raises:
+            UnknownWorkflow: if no graph is registered as `workflow_name`
+            WorkflowQueueFull: if the engine is at capacity
+        """
+        self.registry.get(workflow_name)
+        # Counted before the insert, so concurrent submissions cannot overshoot the limit
+        if len(self._tasks) + self._reserved >= self.capacity:
+            self.stats_counters["rejected"] += 1
+            raise WorkflowQueueFull(f"Workflow queue is full ({self.capacity} executions)")
+        self._reserved += 1
+        try:
+            execution = await self.db.create_workflow_execution({
+                "agent_id": agent_id,
+                "workflow_name": workflow_name,
+                "input_data": input_data,
+                "status": "queued"
+            })
+        finally:
+            self._reserved -= 1
+        execution_id = str(execution["id"])
+        self._loop = asyncio.get_running_loop()
+        task = self._loop.create_task(
+            self._execute(execution_id, agent_id, workflow_name, input_data)
+        )
+        self._tasks[execution_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(execution_id, None))
+        self.stats_counters["submitted"] += 1
+        return execution_id
+
+    async def _execute(self, execution_id: str, agent_id: str, workflow_name: str,
+                       input_data: Dict[str, Any]) -> None:
+        status, updates = "completed", {}
+        try:
+            async with self._semaphore:
+                self._running += 1
+                try:
+                    await self.db.update_workflow_execution(execution_id, {"status": "running", "started_at": _now()})
+                    output = await asyncio.wait_for(self._run(execution_id, workflow_name, input_data), self.timeout)
+                    updates = {"output_data": output}
+                    if output.get("interrupted"):
+                        status = "waiting"
+                        self._waiting[execution_id] = (agent_id, output["steps"])
+                finally:
+                    self._running -= 1
+        except asyncio.CancelledError:
+            status, updates = "cancelled", {"error_message": "Execution cancelled"}
+            raise
+        except asyncio.TimeoutError:
+            status, updates = "failed", {"error_message": f"Workflow timed out after {self.timeout} seconds"}
+        except Exception as e:
+            logger.error(f"Workflow execution {execution_id} failed: {e}")
+            status, updates = "failed", {"error_message": str(e)}
+        finally:
+            # Runs for queued executions too, so a cancelled queue entry is not left as 'queued'
+            await self._record(execution_id, agent_id, workflow_name, status, updates)
+
+    async def _record(self, execution_id: str, agent_id: Optional[str], workflow_name: str, status: str,
+                      updates: Dict[str, Any]) -> None:
+        """Write the outcome of a run (or of its resume) to the execution row and the agent log."""
+        self.stats_counters[status] += 1
+        if status != "waiting":
+            updates = {"completed_at": _now(), **updates}
+        await self.db.update_workflow_execution(execution_id, {"status": status, **updates})
+        # Unknown after a restart, when the resumed execution was started by another process
+        if agent_id is not None:
+            await self.db.log_agent_action(
+                agent_id=agent_id,
+                action=f"workflow_{status}",
+                details={"workflow_name": workflow_name, "execution_id": execution_id}
+            )
+
+    def _on_resumed(self, entry: Dict[str, Any], result: Any, error: Optional[BaseException]) -> None:
+        """resume_scheduler listener: record how a resumed execution ended. Runs on a resume thread."""
+        if entry["graph_id"] not in self.registry or entry["graph_id"] in self.registry.isolated:
+            return
+        if self._loop is None or self._loop.is_closed():
+            logger.warning(f"Cannot record resumed execution {entry['thread_id']}: the engine is not running")
+            return
+        coro = self._finish_resumed(entry["thread_id"], entry["graph_id"], result, error)
+        try:
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        except RuntimeError:
+            coro.close()
+            logger.warning(f"Cannot record resumed execution {entry['thread_id']}: the engine is not running")
+
+    async def _finish_resumed(self, execution_id: str, workflow_name: str, result: Any,
+                              error: Optional[BaseException]) -> None:
+        agent_id, steps = self._waiting.pop(execution_id, (None, []))
+        if error is not None:
+            status, updates = "failed", {"error_message": f"Resuming after a wait failed: {error}"}
+        else:
+            values = result.get("values") if isinstance(result, dict) else None
+            output: Dict[str, Any] = {"result": _jsonable(values), "steps": steps}
+            status = "completed"
+            if isinstance(result, dict) and result.get("interrupted"):
+                # Another durable wait; the next resume finishes the execution
+                status, output["interrupted"] = "waiting", True
+                if agent_id is not None:
+                    self._waiting[execution_id] = (agent_id, steps)
+            updates = {"output_data": output}
+        try:
+            await self._record(execution_id, agent_id, workflow_name, status, updates)
+        except Exception as e:
+            logger.error(f"Failed to record resumed execution {execution_id}: {e}")
+
+    async def _run(self, execution_id: str, workflow_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the graph, writing the steps taken so far back to the execution row."""
+        # graph_id lets a durable workflow_wait find this graph in resume_scheduler
+        config = {"configurable": {"thread_id": execution_id, "graph_id": workflow_name}, "run_name": workflow_name}
+        output: Any = None
+        steps: List[str] = []
+        interrupted = False
+        last_report = time.monotonic()
+        async for mode, chunk in self._stream(workflow_name, input_data, config):
+            if mode == "values":
+                output = chunk
+                continue
+            if isinstance(chunk, dict):
+                # The graph checkpointed at an interrupt (e.g. a durable wait); resume_scheduler continues it
+                if "__interrupt__" in chunk:
+                    interrupted = True
+                    continue
+                steps.extend(chunk)
+            if steps and time.monotonic() - last_report >= self.progress_interval:
+                last_report = time.monotonic()
+                await self.db.update_workflow_execution(execution_id, {
+                    "output_data": {"steps": steps, "current_step": steps[-1]}
+                })
+        result = {"result": _jsonable(output), "steps": steps}
+        if interrupted:
+            result["interrupted"] = True
+        return result
+
+    def _stream(self, workflow_name: str, input_data: Dict[str, Any],
+                config: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        if workflow_name in self.registry.isolated:
+            return self._stream_isolated(self.registry.spec(workflow_name), input_data, config)
+        graph = self.registry.get(workflow_name)
+        return graph.astream(input_data, config, stream_mode=["updates", "values"])
+
+    async def _stream_isolated(self, spec: str, input_data: Dict[str, Any],
+                               config: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream a run on the subgraph process pool, relaying chunks from a helper thread."""
+        loop = asyncio.get_running_loop()
+        chunks: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+
+        def produce() -> None:
+            try:
+                for item in subgraph_pool.stream(spec, input_data, config, self.timeout):
+                    loop.call_soon_threadsafe(chunks.put_nowait, ("chunk", item))
+                loop.call_soon_threadsafe(chunks.put_nowait, ("end", None))
+            except BaseException as e:
+                loop.call_soon_threadsafe(chunks.put_nowait, ("error", e))
+
+        # A cancelled run keeps its worker busy until the pool's own timeout
+        loop.run_in_executor(None, produce)
+        while True:
+            kind, item = await chunks.get()
+            if kind == "end":
+                return
+            if kind == "error":
+                raise item
+            yield item
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limits, current load and execution counters."""
+        return {
+            "workflows": self.registry.names(),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "queued": len(self._tasks) - self._running,
+            **self.stats_counters
+        }
+
+    async def close(self) -> None:
+        """Cancel unfinished executions; each is marked cancelled in the database."""
+        resume_scheduler.remove_listener(self._on_resumed)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def create_workflow_engine(db: Any) -> WorkflowEngine:
+    """Build an engine with an empty registry from BRAID_WORKFLOW_* settings; load graphs at startup."""
+    return WorkflowEngine(
+        db,
+        WorkflowRegistry(checkpointer=MemorySaver() if MemorySaver is not None else None),
+        max_concurrency=int(os.getenv("BRAID_WORKFLOW_CONCURRENCY", "4")),
+        max_queue=int(os.getenv("BRAID_WORKFLOW_QUEUE_SIZE", "100")),
+        timeout=float(os.getenv("BRAID_WORKFLOW_TIMEOUT_SECONDS", "600")),
+        progress_interval=float(os.getenv("BRAID_WORKFLOW_PROGRESS_SECONDS", "1"))
+    )
@@ -2,12 +2,13 @@
 Public, LLM-callable tools for interacting with Slack.
 """
 import os
-import json
 from typing import Optional, List
 
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from core.tools.utilities.output import to_json
+
 try:
     from slack_sdk import WebClient
     from slack_sdk.errors import SlackApiError
@@ -384,7 +385,7 @@ def slack_get_user_profile(user_id: str) -> str:
             "status_text": profile.get("status_text"),
             "status_emoji": profile.get("status_emoji"),
         }
-        return json.dumps(useful_profile)
+        return to_json(useful_profile, compact=True)
     except SlackApiError as e:
         return f"Error getting user profile: {e.response['error']}"
     except KeyError:
@@ -407,7 +408,7 @@ def slack_get_channel_info(channel_id: str) -> str:
             "purpose": channel_info.get("purpose", {}).get("value"),
             "num_members": channel_info.get("num_members"),
         }
-        return json.dumps(useful_info)
+        return to_json(useful_info, compact=True)
     except SlackApiError as e:
         return f"Error getting channel info: {e.response['error']}"
     except KeyError:
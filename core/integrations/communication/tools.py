@@ -14,6 +14,8 @@ from datetime import datetime
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from core.tools.utilities.output import to_json
+
 try:
     import requests
     from dotenv import load_dotenv
@@ -173,7 +175,7 @@ def send_sms(to: str, body: str, from_: str = None) -> str:
     if not from_:
         from_ = os.getenv("TWILIO_PHONE_NUMBER", "").strip()
         if not from_:
-            return json.dumps({
+            return to_json({
                 "error": True,
                 "message": "No sender phone number provided. Set TWILIO_PHONE_NUMBER or provide from_ parameter"
             })
@@ -187,13 +189,13 @@ def send_sms(to: str, body: str, from_: str = None) -> str:
     result = _make_twilio_request("POST", "Messages.json", data)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "status": "failed"
         })
     
-    return json.dumps({
+    return to_json({
         "sid": result.get("sid"),
         "status": result.get("status"),
         "to": result.get("to"),
@@ -222,7 +224,7 @@ def send_mms(to: str, body: str, media_url: List[str], from_: str = None) -> str
     if not from_:
         from_ = os.getenv("TWILIO_PHONE_NUMBER", "").strip()
         if not from_:
-            return json.dumps({
+            return to_json({
                 "error": True,
                 "message": "No sender phone number provided"
             })
@@ -240,13 +242,13 @@ def send_mms(to: str, body: str, media_url: List[str], from_: str = None) -> str
     result = _make_twilio_request("POST", "Messages.json", data)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "status": "failed"
         })
     
-    return json.dumps({
+    return to_json({
         "sid": result.get("sid"),
         "status": result.get("status"),
         "to": result.get("to"),
@@ -277,7 +279,7 @@ def send_whatsapp(to: str, body: str, from_: str = None) -> str:
     if not from_:
         from_ = os.getenv("TWILIO_WHATSAPP_NUMBER", "").strip()
         if not from_:
-            return json.dumps({
+            return to_json({
                 "error": True,
                 "message": "No WhatsApp sender number provided. Set TWILIO_WHATSAPP_NUMBER or provide from_ parameter"
             })
@@ -294,13 +296,13 @@ def send_whatsapp(to: str, body: str, from_: str = None) -> str:
     result = _make_twilio_request("POST", "Messages.json", data)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "status": "failed"
         })
     
-    return json.dumps({
+    return to_json({
         "sid": result.get("sid"),
         "status": result.get("status"),
         "to": result.get("to"),
@@ -329,7 +331,7 @@ def make_call(to: str, from_: str = None, twiml: str = None, url: str = None) ->
     if not from_:
         from_ = os.getenv("TWILIO_PHONE_NUMBER", "").strip()
         if not from_:
-            return json.dumps({
+            return to_json({
                 "error": True,
                 "message": "No caller phone number provided"
             })
@@ -350,13 +352,13 @@ def make_call(to: str, from_: str = None, twiml: str = None, url: str = None) ->
     result = _make_twilio_request("POST", "Calls.json", data)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "status": "failed"
         })
     
-    return json.dumps({
+    return to_json({
         "sid": result.get("sid"),
         "status": result.get("status"),
         "to": result.get("to"),
@@ -392,7 +394,7 @@ def send_email(
     if not from_:
         from_ = os.getenv("SENDGRID_FROM_EMAIL", "").strip()
         if not from_:
-            return json.dumps({
+            return to_json({
                 "error": True,
                 "message": "No sender email provided. Set SENDGRID_FROM_EMAIL or provide from_ parameter"
             })
@@ -400,7 +402,7 @@ def send_email(
     # SendGrid API requires different authentication
     api_key = os.getenv("SENDGRID_API_KEY", "").strip()
     if not api_key:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": "SENDGRID_API_KEY environment variable not set"
         })
@@ -433,7 +435,7 @@ def send_email(
         })
     
     if not email_data["content"]:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": "Either text_content or html_content must be provided"
         })
@@ -446,7 +448,7 @@ def send_email(
         
         if response.status_code == 202:
             print("✅ SUCCESS! Email sent via SendGrid")
-            return json.dumps({
+            return to_json({
                 "status": "sent",
                 "message_id": response.headers.get("X-Message-Id"),
                 "to": to,
@@ -454,14 +456,14 @@ def send_email(
                 "subject": subject
             })
         else:
-            return json.dumps({
+            return to_json({
                 "error": True,
                 "status_code": response.status_code,
                 "message": response.text
             })
             
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"SendGrid request failed: {str(e)}"
         })
@@ -484,7 +486,7 @@ def verify_phone(phone_number: str, channel: str = "sms", locale: str = "en") ->
     
     verify_sid = os.getenv("TWILIO_VERIFY_SERVICE_SID", "").strip()
     if not verify_sid:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": "TWILIO_VERIFY_SERVICE_SID environment variable not set"
         })
@@ -499,13 +501,13 @@ def verify_phone(phone_number: str, channel: str = "sms", locale: str = "en") ->
     result = _make_twilio_request("POST", "Verifications", data, base_url)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "status": "failed"
         })
     
-    return json.dumps({
+    return to_json({
         "sid": result.get("sid"),
         "status": result.get("status"),
         "to": result.get("to"),
@@ -538,12 +540,12 @@ def lookup_phone(phone_number: str, lookup_type: List[str] = ["carrier"]) -> str
     result = _make_twilio_request("GET", encoded_number, params, base_url)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
     
-    return json.dumps({
+    return to_json({
         "phone_number": result.get("phone_number"),
         "national_format": result.get("national_format"),
         "country_code": result.get("country_code"),
@@ -585,7 +587,7 @@ def upload_function(
     result = _make_twilio_request("POST", "Functions", function_data, base_url)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
@@ -607,12 +609,12 @@ def upload_function(
     )
     
     if version_result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": version_result.get("message")
         })
     
-    return json.dumps({
+    return to_json({
         "function_sid": function_sid,
         "version_sid": version_result.get("sid"),
         "path": function_path,
@@ -651,7 +653,7 @@ def upload_asset(
     result = _make_twilio_request("POST", "Assets", asset_data, base_url)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
@@ -673,12 +675,12 @@ def upload_asset(
     )
     
     if version_result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": version_result.get("message")
         })
     
-    return json.dumps({
+    return to_json({
         "asset_sid": asset_sid,
         "version_sid": version_result.get("sid"),
         "path": asset_path,
@@ -713,12 +715,12 @@ def create_conversation(unique_name: str, friendly_name: str = None) -> str:
     result = _make_twilio_request("POST", "Conversations", data, base_url)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
     
-    return json.dumps({
+    return to_json({
         "sid": result.get("sid"),
         "unique_name": result.get("unique_name"),
         "friendly_name": result.get("friendly_name"),
@@ -755,12 +757,12 @@ def start_video_room(
     result = _make_twilio_request("POST", "Rooms", data, base_url)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
     
-    return json.dumps({
+    return to_json({
         "sid": result.get("sid"),
         "unique_name": result.get("unique_name"),
         "status": result.get("status"),
@@ -793,12 +795,12 @@ def sync_data(service_sid: str, document_unique_name: str, data: Dict[str, Any])
     result = _make_twilio_request("POST", "Documents", sync_data, base_url)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
     
-    return json.dumps({
+    return to_json({
         "sid": result.get("sid"),
         "unique_name": result.get("unique_name"),
         "data": result.get("data"),
@@ -6,7 +6,6 @@ without MCP server dependencies.
 """
 
 import os
-import json
 import base64
 from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
@@ -15,6 +14,8 @@ from urllib.parse import quote_plus
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from core.tools.utilities.output import to_json
+
 try:
     import pymongo
     from pymongo import MongoClient
@@ -228,17 +229,17 @@ def mongo_find(
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection": collection,
             "query": query,
             "count": len(documents),
             "documents": serialized_docs
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"Find operation failed: {str(e)}"
         })
@@ -275,16 +276,16 @@ def mongo_insert(
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection": collection,
             "inserted_count": len(inserted_ids),
             "inserted_ids": inserted_ids
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"Insert operation failed: {str(e)}"
         })
@@ -325,17 +326,17 @@ def mongo_update(
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection": collection,
             "matched_count": result.matched_count,
             "modified_count": result.modified_count,
             "upserted_id": str(result.upserted_id) if result.upserted_id else None
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"Update operation failed: {str(e)}"
         })
@@ -372,15 +373,15 @@ def mongo_delete(
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection": collection,
             "deleted_count": result.deleted_count
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"Delete operation failed: {str(e)}"
         })
@@ -413,17 +414,17 @@ def mongo_aggregate(
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection": collection,
             "pipeline": pipeline,
             "result_count": len(result),
             "results": serialized_result
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"Aggregation operation failed: {str(e)}"
         })
@@ -459,14 +460,14 @@ def mongo_list_databases() -> str:
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database_count": len(databases),
             "databases": databases
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"List databases failed: {str(e)}"
         })
@@ -505,15 +506,15 @@ def mongo_list_collections(database: str) -> str:
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection_count": len(collections),
             "collections": collections
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"List collections failed: {str(e)}"
         })
@@ -551,17 +552,17 @@ def mongo_create_index(
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection": collection,
             "index_name": index_name,
             "keys": keys,
             "options": options
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"Create index failed: {str(e)}"
         })
@@ -588,15 +589,15 @@ def mongo_get_collection_stats(database: str, collection: str) -> str:
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection": collection,
             "stats": serialized_stats
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"Get collection stats failed: {str(e)}"
         })
@@ -622,15 +623,15 @@ def mongo_drop_collection(database: str, collection: str) -> str:
         
         client.close()
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "database": database,
             "collection": collection,
             "message": "Collection dropped successfully"
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": f"Drop collection failed: {str(e)}"
         })
@@ -652,19 +653,19 @@ def mongo_atlas_list_clusters(project_id: str) -> str:
     result = _make_atlas_request("GET", f"groups/{project_id}/clusters")
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
     
     clusters = result.get("results", [])
     
-    return json.dumps({
+    return to_json({
         "success": True,
         "project_id": project_id,
         "cluster_count": len(clusters),
         "clusters": clusters
-    }, indent=2)
+    })
 
 @tool("mongo_atlas_create_cluster")
 def mongo_atlas_create_cluster(
@@ -700,18 +701,18 @@ def mongo_atlas_create_cluster(
     result = _make_atlas_request("POST", f"groups/{project_id}/clusters", cluster_config)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
     
-    return json.dumps({
+    return to_json({
         "success": True,
         "project_id": project_id,
         "cluster_name": cluster_name,
         "cluster_id": result.get("id"),
         "state": result.get("stateName")
-    }, indent=2)
+    })
 
 @tool("mongo_atlas_list_projects")
 def mongo_atlas_list_projects() -> str:
@@ -725,18 +726,18 @@ def mongo_atlas_list_projects() -> str:
     result = _make_atlas_request("GET", "groups")
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message")
         })
     
     projects = result.get("results", [])
     
-    return json.dumps({
+    return to_json({
         "success": True,
         "project_count": len(projects),
         "projects": projects
-    }, indent=2)
+    })
 
 # --- Tool Collections ---
 
@@ -6,13 +6,14 @@ without MCP server dependencies.
 """
 
 import os
-import json
 from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from core.tools.utilities.output import to_json
+
 try:
     import requests
     from dotenv import load_dotenv
@@ -155,13 +156,13 @@ def extract_web_data(
     result = _make_agentql_request(url, data_schema, prompt, timeout)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "url": url
         })
     
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 @tool("extract_product_info", args_schema=ProductExtractionInput)
 def extract_product_info(
@@ -221,13 +222,13 @@ def extract_product_info(
     result = _make_agentql_request(url, schema, prompt)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "url": url
         })
     
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 @tool("extract_contact_info", args_schema=ContactExtractionInput)
 def extract_contact_info(
@@ -277,13 +278,13 @@ def extract_contact_info(
     result = _make_agentql_request(url, schema, prompt)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "url": url
         })
     
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 @tool("extract_pricing_data", args_schema=PricingExtractionInput)
 def extract_pricing_data(
@@ -335,13 +336,13 @@ def extract_pricing_data(
     result = _make_agentql_request(url, schema, prompt)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "url": url
         })
     
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 @tool("extract_news_articles", args_schema=NewsExtractionInput)
 def extract_news_articles(
@@ -390,13 +391,13 @@ def extract_news_articles(
     result = _make_agentql_request(url, schema, prompt)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "url": url
         })
     
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 # --- Advanced Extraction Tools ---
 
@@ -433,11 +434,11 @@ def extract_competitor_analysis(competitor_urls: List[str]) -> str:
                 "data": result.get("extracted_data", {})
             })
     
-    return json.dumps({
+    return to_json({
         "competitor_count": len(results),
         "analysis_date": datetime.now().isoformat(),
         "competitors": results
-    }, indent=2)
+    })
 
 @tool("extract_job_listings")
 def extract_job_listings(job_board_url: str, search_query: str = None) -> str:
@@ -478,13 +479,13 @@ def extract_job_listings(job_board_url: str, search_query: str = None) -> str:
     result = _make_agentql_request(job_board_url, schema, prompt)
     
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "error": True,
             "message": result.get("message"),
             "url": job_board_url
         })
     
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 # --- Tool Collections ---
 
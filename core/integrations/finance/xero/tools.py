@@ -12,7 +12,6 @@ from core.integrations.xero.setup import setup_xero_integration
 setup_xero_integration()
 """
 import os
-import json
 import xml.etree.ElementTree as ET
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
@@ -20,6 +19,8 @@ from datetime import datetime, timedelta
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from core.tools.utilities.output import to_json
+
 try:
     import requests
 except ImportError:
@@ -228,12 +229,12 @@ def _format_report_response(report_data: Dict[str, Any]) -> str:
         # Handle XML response
         if "xml_content" in report_data:
             parsed_data = _parse_xml_report(report_data["xml_content"])
-            return json.dumps(parsed_data, indent=2)
+            return to_json(parsed_data)
         
         # Handle JSON response
         reports = report_data.get("Reports", [])
         if not reports:
-            return json.dumps({"error": "No report data found"}, indent=2)
+            return to_json({"error": "No report data found"})
         
         report = reports[0]
         formatted_report = {
@@ -261,10 +262,10 @@ def _format_report_response(report_data: Dict[str, Any]) -> str:
             
             formatted_report["rows"].append(formatted_row)
         
-        return json.dumps(formatted_report, indent=2)
+        return to_json(formatted_report)
         
     except Exception as e:
-        return json.dumps({"error": f"Failed to format report: {str(e)}"}, indent=2)
+        return to_json({"error": f"Failed to format report: {str(e)}"})
 
 # --- Xero Tools ---
 
@@ -301,7 +302,7 @@ def get_xero_profit_and_loss(
     tenant_id = os.environ.get("XERO_TENANT_ID", "").strip()
     
     if not access_token or not tenant_id:
-        return json.dumps({
+        return to_json({
             "data_source": "Mock Data - Xero not configured",
             "reportName": "Profit and Loss",
             "reportDate": f"{fromDate} to {toDate}",
@@ -313,7 +314,7 @@ def get_xero_profit_and_loss(
                 "net_income": 45000
             },
             "note": "Configure XERO_ACCESS_TOKEN and XERO_TENANT_ID for real data"
-        }, indent=2)
+        })
     
     # Try to get real Xero data
     params = {
@@ -325,7 +326,7 @@ def get_xero_profit_and_loss(
     
     # Check if we got an error
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "data_source": "Mock Data - Xero API Error",
             "reportName": "Profit and Loss", 
             "reportDate": f"{fromDate} to {toDate}",
@@ -338,7 +339,7 @@ def get_xero_profit_and_loss(
             },
             "error_details": result.get("message", "API connection failed"),
             "note": "Using mock data due to API issues. Check Xero authentication."
-        }, indent=2)
+        })
     
     # Parse real Xero data
     return _format_report_response(result)
@@ -367,12 +368,12 @@ def get_xero_balance_sheet(
     tenant_id = os.environ.get("XERO_TENANT_ID", "").strip()
     
     if not access_token or not tenant_id:
-        return json.dumps({
+        return to_json({
             "data_source": "Mock Data - Xero not configured",
             "reportName": "Balance Sheet",
             "reportDate": date,
             "note": "Configure XERO_ACCESS_TOKEN and XERO_TENANT_ID for real data"
-        }, indent=2)
+        })
     
     # Try to get real Xero data
     params = {
@@ -383,13 +384,13 @@ def get_xero_balance_sheet(
     
     # Check if we got an error
     if result.get("error"):
-        return json.dumps({
+        return to_json({
             "data_source": "Mock Data - Xero API Error",
             "reportName": "Balance Sheet",
             "reportDate": date,
             "error_details": result.get("message", "API connection failed"),
             "note": "Using mock data due to API issues. Check Xero authentication."
-        }, indent=2)
+        })
     
     # Parse real Xero data
     return _format_report_response(result)
@@ -2,13 +2,14 @@
 Public, LLM-callable tools for interacting with Notion API directly.
 """
 import os
-import json
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from core.tools.utilities.output import to_json
+
 try:
     import requests
 except ImportError:
@@ -212,7 +213,7 @@ def create_notion_page(
             "status": "success"
         }
         
-        return json.dumps(response, indent=2)
+        return to_json(response)
         
     except ValueError as e:
         return f"Error: {str(e)}"
@@ -239,7 +240,7 @@ def get_notion_page(page_id: str) -> str:
             "status": "success"
         }
         
-        return json.dumps(response, indent=2)
+        return to_json(response)
         
     except ValueError as e:
         return f"Error: {str(e)}"
@@ -290,7 +291,7 @@ def update_notion_page(
             "updated_fields": list(update_data.keys()) if update_data else []
         }
         
-        return json.dumps(response, indent=2)
+        return to_json(response)
         
     except ValueError as e:
         return f"Error: {str(e)}"
@@ -1,97 +1,174 @@
 """
 Dynamically discovers and loads tools registered via entry points.
+
+Entry-point metadata for the 'braid.tools' group is read once per process and
+kept as a name -> "module:attr" index. A tool's module is imported the first
+time that tool is requested, so fetching one tool no longer imports every
+integration's SDK. Loaded tools and missing-dependency errors are both
+memoized.
+
+Startup can skip entry-point scanning entirely with a pre-built JSON index:
+
+    python -m core.tool_loader --write-index tool_index.json
+    export BRAID_TOOL_INDEX=tool_index.json
 """
+import importlib
+import json
+import os
 import sys
-import pkgutil
+import threading
 from importlib import metadata
-from typing import List, Dict, Callable
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ENTRY_POINT_GROUP = "braid.tools"
+
+
+def _extra_name(target: str) -> str:
+    """The pip extra for a tool's module, e.g. core.contrib.slack.slack_tools -> slack."""
+    parts = target.split(":", 1)[0].split(".")
+    return parts[2] if len(parts) > 2 and parts[:2] == ["core", "contrib"] else parts[0]
+
+
+class ToolRegistry:
+    """Lazy, memoizing registry of the tools in one entry-point group."""
+
+    def __init__(self, group: str = ENTRY_POINT_GROUP, index_path: Optional[str] = None):
+        self.group = group
+        self.index_path = index_path
+        self._targets: Optional[Dict[str, str]] = None
+        self._loaded: Dict[str, Callable] = {}
+        self._missing: Dict[str, ImportError] = {}
+        self._lock = threading.RLock()
+
+    def _scan_entry_points(self) -> Dict[str, str]:
+        try:
+            entry_points = metadata.entry_points(group=self.group)
+        except TypeError:
+            # Python < 3.10 returns a dict of groups
+            entry_points = metadata.entry_points().get(self.group, [])
+        return {ep.name: ep.value for ep in entry_points}
+
+    def _read_index(self) -> Optional[Dict[str, str]]:
+        if not self.index_path or not Path(self.index_path).is_file():
+            return None
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("group") != self.group:
+            return None
+        return dict(index["tools"])
+
+    def targets(self) -> Dict[str, str]:
+        """Return tool name -> "module:attr", reading the index or entry points once."""
+        if self._targets is None:
+            with self._lock:
+                if self._targets is None:
+                    # An empty index is still an index; only a missing one means scanning
+                    targets = self._read_index()
+                    self._targets = targets if targets is not None else self._scan_entry_points()
+        return self._targets
+
+    def names(self) -> List[str]:
+        return sorted(self.targets())
 
-# A cache to store loaded tool instances
-_tool_cache: Dict[str, object] = {}
+    def __contains__(self, name: str) -> bool:
+        return name in self.targets()
 
-from core.tool_registry import LlamaIndexTool
+    def get(self, name: str) -> Callable:
+        """
+        Return the tool registered as `name`, importing its module on first use.
 
-def load_tools() -> Dict[str, LlamaIndexTool]:
+        Raises:
+            ValueError: if no tool has that name
+            ImportError: if the tool's dependencies are not installed
+        """
+        tool = self._loaded.get(name)
+        if tool is not None:
+            return tool
+        if name in self._missing:
+            raise self._missing[name]
+        target = self.targets().get(name)
+        if target is None:
+            raise ValueError(f"Tool not found: '{name}'. Available tools are: {self.names()}")
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            module_name, _, attr = target.partition(":")
+            try:
+                obj = importlib.import_module(module_name)
+                for part in filter(None, attr.split(".")):
+                    obj = getattr(obj, part)
+            except ImportError as e:
+                error = ImportError(
+                    f"Tool '{name}' is available but its dependencies are not installed. "
+                    f"Please install them with: pip install '.[{_extra_name(target)}]'\n"
+                    f"Original error: {e}"
+                )
+                self._missing[name] = error
+                raise error from e
+            self._loaded[name] = obj
+            return obj
+
+    def write_index(self, path: str) -> int:
+        """Write the current name -> target index to `path` as JSON. Returns the tool count."""
+        targets = self._scan_entry_points()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"group": self.group, "tools": targets}, f, indent=2, sort_keys=True)
+        return len(targets)
+
+    def refresh(self) -> None:
+        """Forget everything read or loaded, e.g. after installing new packages."""
+        with self._lock:
+            self._targets = None
+            self._loaded.clear()
+            self._missing.clear()
+
+
+# Process-wide registry
+registry = ToolRegistry(index_path=os.getenv("BRAID_TOOL_INDEX"))
+
+
+def load_tools() -> Dict[str, Callable]:
     """
-    Discovers all available tools from the 'braid.tools' entry point.
-    It returns a dictionary of tool names to their respective LlamaIndexTool objects.
-    This function supports both newer (importlib.metadata) and older (pkg_resources)
-    packaging libraries.
+    Loads every tool from the 'braid.tools' entry point group.
+
+    Tools whose dependencies are missing are returned as placeholders that
+    raise the helpful ImportError when called. Prefer get_tool()/get_tools(),
+    which only import the modules they need.
     """
-    tools = {}
-    try:
-        # Newer approach using importlib.metadata (Python 3.8+)
-        entry_points = metadata.entry_points()
-        if "braid.tools" in entry_points:
-            tool_entry_points = entry_points["braid.tools"]
-            for entry_point in tool_entry_points:
-                tool_name = entry_point.name
-                tool_func = entry_point.load()
-                tools[tool_name] = tool_func
-    except (ImportError, Exception):
-        # Fallback for older Python versions or other issues
+    tools: Dict[str, Callable] = {}
+    for name in registry.names():
         try:
-            import pkg_resources
-            tool_entry_points = pkg_resources.iter_entry_points(group="braid.tools")
-            for entry_point in tool_entry_points:
-                tool_name = entry_point.name
-                tool_func = entry_point.load()
-                tools[tool_name] = tool_func
-        except Exception as e:
-            # This makes the tool discoverable but will raise an error if used
-            # without the proper extras installed.
-            def missing_dependency_func(original_error=e, extra_name=tool_name.split('.')[2]):
-                raise ImportError(
-                    f"Tool '{tool_name}' is available but its dependencies are not installed. "
-                    f"Please install them with: pip install '.[{extra_name}]'\n"
-                    f"Original error: {original_error}"
-                )
-            tools[tool_name] = missing_dependency_func
-            
+            tools[name] = registry.get(name)
+        except ImportError as e:
+            def missing_dependency_func(*args, original_error=e, **kwargs):
+                raise original_error
+            tools[name] = missing_dependency_func
     return tools
 
+
 def get_tools(names: List[str]) -> List[Callable]:
     """
     Loads and returns a list of specific tools by their registered names.
     """
-    all_tools = load_tools()
-    
-    selected_tools: List[Callable] = []
-    missing_tools: List[str] = []
-
-    for name in names:
-        if name in all_tools:
-            # Check if it's a "missing dependency" placeholder function
-            tool_func = all_tools[name]
-            if (hasattr(tool_func, "__kwdefaults__") 
-                and tool_func.__kwdefaults__ is not None 
-                and "original_error" in tool_func.__kwdefaults__):
-                 # This will raise the helpful ImportError
-                tool_func()
-            selected_tools.append(tool_func)
-        else:
-            missing_tools.append(name)
-            
+    missing_tools = [name for name in names if name not in registry]
     if missing_tools:
         raise ValueError(f"Tools not found: {', '.join(missing_tools)}. "
-                         f"Available tools are: {list(all_tools.keys())}")
-                         
-    return selected_tools
+                         f"Available tools are: {registry.names()}")
+
+    # Raises the helpful ImportError if a tool's dependencies are missing
+    return [registry.get(name) for name in names]
+
 
 def get_tool(name: str) -> Callable:
     """
     Loads and returns a single tool by its registered name.
     """
-    all_tools = load_tools()
-    if name not in all_tools:
-        raise ValueError(f"Tool not found: '{name}'. "
-                         f"Available tools are: {list(all_tools.keys())}")
-    
-    tool_func = all_tools[name]
-    # Raise the ImportError if dependencies are missing
-    if (hasattr(tool_func, "__kwdefaults__") 
-        and tool_func.__kwdefaults__ is not None 
-        and "original_error" in tool_func.__kwdefaults__):
-        tool_func()
-
-    return tool_func 
\ No newline at end of file
+    return registry.get(name)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "--write-index":
+        sys.exit("Usage: python -m core.tool_loader --write-index PATH")
+    count = registry.write_index(sys.argv[2])
+    print(f"Wrote {count} tools to {sys.argv[2]}")
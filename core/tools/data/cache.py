@@ -0,0 +1,147 @@
+"""
+Shared parsed-file cache for the data tools.
+
+Agents commonly call several data tools on the same file in one run
+(csv_processor 'info', then 'sample', then 'filter'; file_read repeatedly).
+This cache lets those calls reuse earlier parse results instead of re-reading
+the file.
+
+Entries are keyed on the file's (path, mtime, size) signature, so any change
+to the file on disk invalidates them automatically. Total cached size is kept
+under a byte budget with least-recently-used eviction.
+
+These are non-tool helpers. The budget defaults to 64 MB and can be changed
+with the BRAID_DATA_CACHE_MB environment variable (0 disables caching).
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+FileSignature = Tuple[str, int, int]
+
+# Returned by FileCache.get when there is no usable entry
+MISSING = object()
+
+
+def file_signature(path: Path) -> FileSignature:
+    """Return the (path, mtime_ns, size) tuple that identifies one version of a file."""
+    stat = path.stat()
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def approximate_size(value: Any, _depth: int = 0) -> int:
+    """Roughly estimate the memory footprint of a parsed value in bytes."""
+    size = sys.getsizeof(value)
+    if _depth > 8:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += approximate_size(k, _depth + 1) + approximate_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += approximate_size(item, _depth + 1)
+    return size
+
+
+class FileCache:
+    """Thread-safe, byte-budgeted LRU cache of values derived from files."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._by_path: Dict[str, Set[Tuple]] = {}
+        self._signatures: Dict[str, FileSignature] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, signature: FileSignature, namespace: str, key: Hashable = ()) -> Any:
+        """Return the cached value, or MISSING if absent or the file has changed."""
+        entry_key = (namespace, signature, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, signature: FileSignature, namespace: str, key: Hashable, value: Any,
+            size: Optional[int] = None) -> None:
+        """Store a value; entries for older versions of the same file are dropped."""
+        if self.max_bytes <= 0:
+            return
+        size = approximate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        path = signature[0]
+        entry_key = (namespace, signature, key)
+        with self._lock:
+            if self._signatures.get(path) != signature:
+                self._drop_path(path)
+                self._signatures[path] = signature
+            old = self._entries.pop(entry_key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[entry_key] = (value, size)
+            self._by_path.setdefault(path, set()).add(entry_key)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._forget(evicted_key)
+                self.evictions += 1
+
+    def invalidate(self, path: Path) -> None:
+        """Drop every entry derived from `path`."""
+        with self._lock:
+            self._drop_path(str(path))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._by_path.clear()
+            self._signatures.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+    def _drop_path(self, path: str) -> None:
+        for entry_key in self._by_path.pop(path, set()):
+            entry = self._entries.pop(entry_key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+        self._signatures.pop(path, None)
+
+    def _forget(self, entry_key: Tuple) -> None:
+        path = entry_key[1][0]
+        keys = self._by_path.get(path)
+        if keys is not None:
+            keys.discard(entry_key)
+            if not keys:
+                del self._by_path[path]
+                self._signatures.pop(path, None)
+
+
+# Global instance shared by all data tools
+data_cache = FileCache(int(float(os.getenv("BRAID_DATA_CACHE_MB", "64")) * 1024 * 1024))
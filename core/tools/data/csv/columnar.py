@@ -0,0 +1,216 @@
+"""
+Columnar (NumPy) backend for csv_processor summary and filter.
+
+Each chunk of rows is converted once into one array per referenced column,
+numeric columns are parsed in bulk, and statistics and filter masks are then
+computed with vectorised NumPy operations instead of per-cell Python loops.
+
+These are non-tool helper functions. NumPy is optional; install it with:
+pip install ".[financial]"
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from .utils import Predicate, _is_number
+
+# Percentiles reported by the columnar summary
+DEFAULT_PERCENTILES = (25, 50, 75, 95)
+
+# Values sampled per column for approximate percentiles
+PERCENTILE_SAMPLE_SIZE = 10000
+
+
+def is_available() -> bool:
+    """Return True if the columnar backend can be used."""
+    return np is not None
+
+
+def _text_array(chunk: List[Dict[str, Any]], column: str) -> "np.ndarray":
+    """Extract one column of a chunk as a NumPy string array (missing cells become '')."""
+    return np.array([row.get(column) or "" for row in chunk], dtype=str)
+
+
+def _float_array(text: "np.ndarray") -> "np.ndarray":
+    """
+    Parse a string array into float64, with NaN for blank or non-numeric cells.
+
+    Fully numeric columns are converted in a single C-level cast; mixed
+    columns fall back to pandas' coercing parser, or a Python loop if pandas
+    is not installed.
+    """
+    blank = np.char.str_len(np.char.strip(text)) == 0
+    try:
+        return np.where(blank, "nan", text).astype(np.float64)
+    except ValueError:
+        pass
+    if pd is not None:
+        return pd.to_numeric(pd.Series(text), errors="coerce").to_numpy(dtype=np.float64)
+    out = np.full(len(text), np.nan)
+    for i, cell in enumerate(text):
+        try:
+            out[i] = float(cell)
+        except ValueError:
+            continue
+    return out
+
+
+class _ColumnCache:
+    """Per-chunk cache so every column is converted at most once per dtype."""
+
+    def __init__(self, chunk: List[Dict[str, Any]]):
+        self.chunk = chunk
+        self._text: Dict[str, "np.ndarray"] = {}
+        self._float: Dict[str, "np.ndarray"] = {}
+
+    def text(self, column: str) -> "np.ndarray":
+        if column not in self._text:
+            self._text[column] = _text_array(self.chunk, column)
+        return self._text[column]
+
+    def floats(self, column: str) -> "np.ndarray":
+        if column not in self._float:
+            self._float[column] = _float_array(self.text(column))
+        return self._float[column]
+
+
+def _predicate_mask(columns: _ColumnCache, predicate: Predicate) -> "np.ndarray":
+    column, operator, value = predicate
+    if operator in ("==", "!="):
+        if _is_number(value):
+            equal = columns.floats(column) == value
+        else:
+            equal = columns.text(column) == str(value)
+        return equal if operator == "==" else ~equal
+    if operator == "in":
+        return np.isin(columns.text(column), list(value))
+    if operator == "contains":
+        return np.char.find(np.char.lower(columns.text(column)), str(value).lower()) >= 0
+    numbers = columns.floats(column)
+    with np.errstate(invalid="ignore"):
+        if operator == ">":
+            return numbers > value
+        if operator == ">=":
+            return numbers >= value
+        if operator == "<":
+            return numbers < value
+        return numbers <= value
+
+
+def filter_chunks(chunks: Iterable[List[Dict[str, Any]]], predicates: List[Predicate],
+                  offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Vectorised equivalent of utils.filter_chunks (all predicates ANDed).
+
+    Returns:
+        Tuple of (matching rows in the requested page, total matches, total rows)
+    """
+    page: List[Dict[str, Any]] = []
+    matches = 0
+    total_rows = 0
+    for chunk in chunks:
+        total_rows += len(chunk)
+        cache = _ColumnCache(chunk)
+        mask = np.ones(len(chunk), dtype=bool)
+        for predicate in predicates:
+            mask &= _predicate_mask(cache, predicate)
+        hits = np.flatnonzero(mask)
+        skip = max(offset - matches, 0)
+        matches += int(hits.size)
+        if limit is None:
+            page.extend(chunk[i] for i in hits[skip:])
+        elif len(page) < limit:
+            page.extend(chunk[i] for i in hits[skip:skip + limit - len(page)])
+    return page, matches, total_rows
+
+
+class _Reservoir:
+    """Uniform random sample of at most `size` values (the values with the smallest random keys)."""
+
+    def __init__(self, size: int, rng: "np.random.Generator"):
+        self.size = size
+        self.rng = rng
+        self.values = np.empty(0)
+        self.keys = np.empty(0)
+
+    def add(self, values: "np.ndarray") -> None:
+        keys = np.concatenate([self.keys, self.rng.random(values.size)])
+        values = np.concatenate([self.values, values])
+        if values.size > self.size:
+            keep = np.argpartition(keys, self.size - 1)[:self.size]
+            values, keys = values[keep], keys[keep]
+        self.values, self.keys = values, keys
+
+
+def summarize_chunks(chunks: Iterable[List[Dict[str, Any]]], columns: List[str],
+                     percentiles: Sequence[float] = DEFAULT_PERCENTILES, exact: bool = False
+                     ) -> Tuple[List[Dict[str, Any]], List[str], int]:
+    """
+    Vectorised equivalent of utils.summarize_chunks, with percentiles.
+
+    Count, min, max and sum are kept as running totals. Percentiles come
+    from a fixed-size uniform sample of each column (PERCENTILE_SAMPLE_SIZE
+    values), so memory does not grow with the file. With exact=True every
+    parsed value is kept (8 bytes per numeric cell) and percentiles are exact.
+
+    Returns:
+        Tuple of (numeric column summaries, text columns, total rows)
+    """
+    # Seeded so repeated summaries of the same file agree
+    rng = np.random.default_rng(0)
+    totals: Dict[str, List[float]] = {}
+    parts: Dict[str, List["np.ndarray"]] = {col: [] for col in columns}
+    samples = {col: _Reservoir(PERCENTILE_SAMPLE_SIZE, rng) for col in columns}
+    total_rows = 0
+    for chunk in chunks:
+        total_rows += len(chunk)
+        cache = _ColumnCache(chunk)
+        for col in columns:
+            values = cache.floats(col)
+            values = values[~np.isnan(values)]
+            if not values.size:
+                continue
+            if col in totals:
+                count, low, high, total = totals[col]
+                totals[col] = [count + values.size, min(low, float(values.min())),
+                               max(high, float(values.max())), total + float(values.sum())]
+            else:
+                totals[col] = [values.size, float(values.min()), float(values.max()), float(values.sum())]
+            if not percentiles:
+                continue
+            if exact:
+                parts[col].append(values)
+            else:
+                samples[col].add(values)
+
+    numeric: List[Dict[str, Any]] = []
+    for col in columns:
+        if col not in totals:
+            continue
+        count, low, high, total = totals[col]
+        stats = {
+            "column": col,
+            "count": int(count),
+            "min": low,
+            "max": high,
+            "avg": total / count
+        }
+        if percentiles:
+            values = np.concatenate(parts[col]) if exact else samples[col].values
+            parts[col] = []
+            points = np.percentile(values, list(percentiles))
+            stats["percentiles"] = {f"p{p:g}": float(v) for p, v in zip(percentiles, points)}
+            stats["percentiles_exact"] = exact or count <= PERCENTILE_SAMPLE_SIZE
+        numeric.append(stats)
+
+    numeric_names = {nc["column"] for nc in numeric}
+    text = [col for col in columns if col not in numeric_names]
+    return numeric, text, total_rows
@@ -7,13 +7,28 @@ Tools:
 For basic file operations, see data/files/tools.py
 """
 import json
-import csv
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from ...utilities.output import to_json
+from . import columnar
+from ..cache import MISSING, FileSignature, data_cache, file_signature
+from .utils import (
+    DEFAULT_CHUNK_SIZE,
+    estimate_row_count,
+    filter_chunks,
+    iter_chunks,
+    normalize_predicates,
+    open_csv,
+    page_rows,
+    read_prefix,
+    reservoir_sample,
+    summarize_chunks,
+)
+
 # --- Input Schemas ---
 
 class CsvProcessorInput(BaseModel):
@@ -21,10 +36,31 @@ class CsvProcessorInput(BaseModel):
     operation: str = Field(description="Operation: 'read', 'info', 'sample', 'filter', 'summary'")
     filter_column: Optional[str] = Field(default=None, description="Column to filter on (for filter operation)")
     filter_value: Optional[str] = Field(default=None, description="Value to filter for (for filter operation)")
+    filters: Optional[List[Dict[str, Any]]] = Field(default=None, description="Additional filter predicates, all must match: [{column: 'amount', operator: '>=', value: 100}]. Operators: ==, !=, >, >=, <, <=, in, contains")
     sample_size: int = Field(default=5, description="Number of rows to sample")
+    offset: int = Field(default=0, description="Number of rows (or filter matches) to skip before returning data")
+    limit: Optional[int] = Field(default=None, description="Maximum number of rows to return (defaults to 1000 for read/filter)")
+    chunk_size: int = Field(default=DEFAULT_CHUNK_SIZE, description="Rows processed per chunk for filter/summary")
+    backend: str = Field(default="auto", description="Engine for filter/summary: 'auto' (numpy if installed), 'numpy', or 'python'")
+    seed: Optional[int] = Field(default=None, description="Random seed for 'sample'; seeded samples are reproducible and cached")
+    exact_percentiles: bool = Field(default=False, description="Summary percentiles from every value instead of a fixed-size sample. Memory grows with the file")
 
 # --- Helper Functions ---
 
+# Page size used by 'read' and 'filter' when no limit is given
+DEFAULT_PAGE_SIZE = 1000
+
+def _resolve_backend(backend: str) -> str:
+    """Pick the filter/summary engine, raising if an unavailable one is requested."""
+    backend = (backend or "auto").lower()
+    if backend == "auto":
+        return "numpy" if columnar.is_available() else "python"
+    if backend == "numpy" and not columnar.is_available():
+        raise ValueError('The numpy backend is not available. Install it with: pip install ".[financial]"')
+    if backend not in ("numpy", "python"):
+        raise ValueError(f"Unknown backend: {backend}. Available: auto, numpy, python")
+    return backend
+
 def _safe_path(file_path: str) -> Path:
     """Convert to Path object and validate it's not trying to escape working directory."""
     path = Path(file_path).resolve()
@@ -38,20 +74,125 @@ def _safe_path(file_path: str) -> Path:
         # If path is outside current working directory, create relative path
         return cwd / Path(file_path).name
 
+def _read_header(path: Path, signature: FileSignature) -> Tuple[Dict[str, Any], bool]:
+    """
+    Read (or fetch from cache) the delimiter, columns and first rows of a CSV file.
+    
+    Returns:
+        Tuple of (header info, whether it came from the cache)
+    """
+    header = data_cache.get(signature, "csv_header")
+    if header is not MISSING:
+        return header, True
+    
+    f, reader, delimiter = open_csv(path)
+    with f:
+        columns = list(reader.fieldnames or [])
+        first_rows = read_prefix(reader, 3)
+    header = {
+        "delimiter": delimiter,
+        "columns": columns,
+        "first_rows": first_rows,
+        "estimated_total_rows": max(len(first_rows), estimate_row_count(path))
+    }
+    data_cache.put(signature, "csv_header", (), header)
+    return header, False
+
+def _run_pass(path: Path, header: Dict[str, Any], operation: str, filter_column: Optional[str],
+              filter_value: Optional[str], filters: Optional[List[Dict[str, Any]]], sample_size: int,
+              offset: int, page_limit: int, chunk_size: int, engine: str,
+              exact_percentiles: bool = False, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Stream the file once for a read/sample/filter/summary operation."""
+    columns = header["columns"]
+    output: Dict[str, Any] = {}
+    
+    if operation == "filter":
+        try:
+            predicates = normalize_predicates(columns, filters, filter_column, filter_value)
+        except ValueError as e:
+            return {"error": str(e)}
+    
+    f, reader, _ = open_csv(path)
+    with f:
+        rows = iter(reader)
+        
+        if operation == "sample":
+            # Single-pass reservoir sample; memory is bounded by sample_size
+            sample_rows, total_rows = reservoir_sample(rows, max(sample_size, 0), seed)
+            output["total_rows"] = total_rows
+            output["sample_size"] = len(sample_rows)
+            output["data"] = sample_rows
+            
+        elif operation == "read":
+            page, consumed, has_more = page_rows(rows, offset, page_limit)
+            output["offset"] = offset
+            output["limit"] = page_limit
+            output["returned_rows"] = len(page)
+            output["data"] = page
+            output["truncated"] = has_more
+            if has_more:
+                output["next_offset"] = offset + len(page)
+                output["warning"] = "More rows available. Use offset/limit to page through the file."
+            else:
+                output["total_rows"] = consumed
+                
+        elif operation == "filter":
+            run_filter = columnar.filter_chunks if engine == "numpy" else filter_chunks
+            page, matches, total_rows = run_filter(iter_chunks(rows, chunk_size), predicates, offset, page_limit)
+            output["backend"] = engine
+            output["total_rows"] = total_rows
+            output["filter_column"] = filter_column
+            output["filter_value"] = filter_value
+            output["filters"] = [
+                {"column": c, "operator": op, "value": sorted(v) if op == "in" else v}
+                for c, op, v in predicates
+            ]
+            output["filtered_rows"] = matches
+            output["offset"] = offset
+            output["limit"] = page_limit
+            output["returned_rows"] = len(page)
+            output["truncated"] = offset + len(page) < matches
+            output["data"] = page
+            
+        else:
+            if engine == "numpy":
+                numeric_cols, text_cols, total_rows = columnar.summarize_chunks(
+                    iter_chunks(rows, chunk_size), columns, exact=exact_percentiles
+                )
+            else:
+                numeric_cols, text_cols, total_rows = summarize_chunks(iter_chunks(rows, chunk_size), columns)
+            output["backend"] = engine
+            output["total_rows"] = total_rows
+            output["numeric_columns"] = numeric_cols
+            output["text_columns"] = text_cols
+    
+    return output
+
 # --- CSV Processing Tools ---
 
 @tool("csv_processor", args_schema=CsvProcessorInput)
 def csv_processor(file_path: str, operation: str, filter_column: Optional[str] = None,
-                 filter_value: Optional[str] = None, sample_size: int = 5) -> str:
+                 filter_value: Optional[str] = None, filters: Optional[List[Dict[str, Any]]] = None,
+                 sample_size: int = 5, offset: int = 0, limit: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, backend: str = "auto",
+                 exact_percentiles: bool = False, seed: Optional[int] = None) -> str:
     """
     Process CSV files with various operations.
     
     Supported operations:
-    - 'read': Read and return CSV content
-    - 'info': Get CSV structure information
-    - 'sample': Return a sample of rows
-    - 'filter': Filter rows by column value
-    - 'summary': Get statistical summary
+    - 'read': Read and return a page of CSV rows (use offset/limit to page)
+    - 'info': Get CSV structure information from the header and first rows
+    - 'sample': Return a uniform random sample of rows (pass `seed` for a reproducible one)
+    - 'filter': Filter rows by column value and/or `filters` predicates (matches are paged with offset/limit)
+    - 'summary': Get statistical summary (with percentiles on the numpy backend,
+      estimated from a fixed-size sample unless exact_percentiles is set)
+    
+    Files are streamed rather than loaded into memory, so large exports
+    can be inspected and paged through without memory growing with file size.
+    When NumPy is installed, filter and summary run on a vectorised columnar backend.
+    Results are cached per file version, so repeated calls on an unchanged
+    file are answered without re-reading it. Unseeded samples are drawn fresh
+    on every call.
     
     Returns JSON with processed CSV data.
     """
@@ -61,113 +202,87 @@ def csv_processor(file_path: str, operation: str, filter_column: Optional[str] =
         
         # Check if file exists
         if not safe_file_path.exists():
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"CSV file not found: {safe_file_path}",
                 "file_path": str(safe_file_path)
-            }, indent=2)
+            })
         
-        # Read CSV file
-        with open(safe_file_path, 'r', encoding='utf-8') as f:
-            # Detect delimiter
-            sample = f.read(1024)
-            f.seek(0)
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
-            
-            reader = csv.DictReader(f, delimiter=delimiter)
-            rows = list(reader)
+        chunk_size = max(chunk_size, 1)
+        engine = _resolve_backend(backend)
+        offset = max(offset, 0)
+        page_limit = limit if limit is not None and limit >= 0 else DEFAULT_PAGE_SIZE
         
-        if not rows:
-            return json.dumps({
+        signature = file_signature(safe_file_path)
+        header, header_cached = _read_header(safe_file_path, signature)
+        columns = header["columns"]
+        
+        if not header["first_rows"]:
+            return to_json({
                 "success": False,
                 "error": "CSV file is empty or has no data rows",
                 "file_path": str(safe_file_path)
-            }, indent=2)
-        
-        columns = list(rows[0].keys())
+            })
         
         result = {
             "success": True,
             "file_path": str(safe_file_path),
             "operation": operation,
-            "total_rows": len(rows),
             "columns": columns,
             "column_count": len(columns)
         }
         
         if operation == "info":
-            # Return structure information
-            result["delimiter"] = delimiter
-            result["sample_data"] = rows[:3]  # First 3 rows as sample
-            
-        elif operation == "sample":
-            # Return sample rows
-            import random
-            sample_rows = random.sample(rows, min(sample_size, len(rows)))
-            result["sample_size"] = len(sample_rows)
-            result["data"] = sample_rows
-            
-        elif operation == "read":
-            # Return all data (with reasonable limit)
-            if len(rows) > 1000:
-                result["warning"] = f"Large CSV file ({len(rows)} rows). Consider using 'sample' operation."
-                result["data"] = rows[:1000]
-                result["truncated"] = True
+            # Header plus a bounded prefix; exact row count only if an earlier pass computed it
+            result["delimiter"] = header["delimiter"]
+            result["sample_data"] = header["first_rows"]
+            result["file_size_bytes"] = signature[2]
+            total_rows = data_cache.get(signature, "csv_total_rows")
+            if total_rows is not MISSING:
+                result["total_rows"] = total_rows
             else:
-                result["data"] = rows
-                result["truncated"] = False
-                
-        elif operation == "filter":
-            # Filter by column value
-            if not filter_column or filter_column not in columns:
-                result["error"] = f"Filter column '{filter_column}' not found. Available: {columns}"
-            elif filter_value is None:
-                result["error"] = "Filter value is required for filter operation"
+                result["estimated_total_rows"] = header["estimated_total_rows"]
+            result["cached"] = header_cached
+            
+        elif operation in ("sample", "read", "filter", "summary"):
+            if operation == "sample":
+                cache_key = (sample_size, seed)
+            elif operation == "read":
+                cache_key = (offset, page_limit)
+            elif operation == "filter":
+                cache_key = (json.dumps([filter_column, filter_value, filters], sort_keys=True, default=str),
+                             offset, page_limit, engine)
             else:
-                filtered_rows = [row for row in rows if row.get(filter_column) == filter_value]
-                result["filter_column"] = filter_column
-                result["filter_value"] = filter_value
-                result["filtered_rows"] = len(filtered_rows)
-                result["data"] = filtered_rows
-                
-        elif operation == "summary":
-            # Basic statistical summary
-            numeric_cols = []
-            for col in columns:
-                # Check if column has numeric data
-                numeric_values = []
-                for row in rows:
-                    try:
-                        val = float(row[col])
-                        numeric_values.append(val)
-                    except (ValueError, TypeError):
-                        continue
-                
-                if numeric_values:
-                    numeric_cols.append({
-                        "column": col,
-                        "count": len(numeric_values),
-                        "min": min(numeric_values),
-                        "max": max(numeric_values),
-                        "avg": sum(numeric_values) / len(numeric_values)
-                    })
+                cache_key = (engine, exact_percentiles)
             
-            result["numeric_columns"] = numeric_cols
-            result["text_columns"] = [col for col in columns if col not in [nc["column"] for nc in numeric_cols]]
+            # An unseeded sample must differ between calls, so it is never cached
+            cacheable = operation != "sample" or seed is not None
+            output = data_cache.get(signature, f"csv_{operation}", cache_key) if cacheable else MISSING
+            cached = output is not MISSING
+            if not cached:
+                output = _run_pass(safe_file_path, header, operation, filter_column, filter_value,
+                                   filters, sample_size, offset, page_limit, chunk_size, engine,
+                                   exact_percentiles, seed)
+                if "error" not in output:
+                    if cacheable:
+                        data_cache.put(signature, f"csv_{operation}", cache_key, output)
+                    if "total_rows" in output:
+                        data_cache.put(signature, "csv_total_rows", (), output["total_rows"])
+            result.update(output)
+            result["cached"] = cached
             
         else:
             result["error"] = f"Unknown operation: {operation}. Available: read, info, sample, filter, summary"
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"CSV processing failed: {str(e)}",
             "file_path": file_path,
             "operation": operation
-        }, indent=2)
+        })
 
 # --- Tool Aggregator ---
 
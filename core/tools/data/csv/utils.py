@@ -0,0 +1,296 @@
+"""
+Streaming CSV helpers used by the csv_processor tool.
+
+These are non-tool helper functions that an agent's own Python code can import
+and use directly. They are NOT exposed to the LLM as tools.
+
+Everything here works on an open file handle and never materialises the whole
+file, so memory use stays flat regardless of file size.
+"""
+import csv
+import random
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Number of characters inspected when detecting the delimiter
+SNIFF_SIZE = 64 * 1024
+
+# Default number of rows processed per chunk by filter/summary
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def sniff_delimiter(sample: str, default: str = ",") -> str:
+    """Detect the delimiter of a CSV sample, falling back to `default`."""
+    try:
+        return csv.Sniffer().sniff(sample).delimiter
+    except csv.Error:
+        return default
+
+
+def open_csv(path: Path, encoding: str = "utf-8") -> Tuple[Any, csv.DictReader, str]:
+    """
+    Open a CSV file for streaming.
+
+    Returns:
+        Tuple of (file handle, DictReader, delimiter). The caller owns the
+        handle and must close it.
+    """
+    f = open(path, "r", encoding=encoding, newline="")
+    try:
+        sample = f.read(SNIFF_SIZE)
+        f.seek(0)
+        delimiter = sniff_delimiter(sample)
+        reader = csv.DictReader(f, delimiter=delimiter)
+        return f, reader, delimiter
+    except Exception:
+        f.close()
+        raise
+
+
+def estimate_row_count(path: Path) -> int:
+    """
+    Estimate the number of data rows from the line density of the first bytes.
+
+    Exact for files smaller than the probe window (barring quoted newlines).
+    """
+    file_size = path.stat().st_size
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_SIZE)
+    lines = head.count(b"\n") + (1 if head and not head.endswith(b"\n") else 0)
+    if not head or lines == 0:
+        return 0
+    if len(head) >= file_size:
+        return max(lines - 1, 0)
+    return max(int(file_size * lines / len(head)) - 1, 0)
+
+
+def iter_chunks(rows: Iterable[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Group a row stream into lists of at most `chunk_size` rows."""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_prefix(rows: Iterable[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    """Return the first `count` rows of a stream."""
+    return list(islice(rows, max(count, 0)))
+
+
+def reservoir_sample(rows: Iterable[Dict[str, Any]], size: int,
+                     seed: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Uniformly sample `size` rows from a stream in a single pass (Algorithm R).
+
+    Returns:
+        Tuple of (sampled rows, total rows seen)
+    """
+    rng = random.Random(seed)
+    reservoir: List[Dict[str, Any]] = []
+    seen = 0
+    for row in rows:
+        seen += 1
+        if len(reservoir) < size:
+            reservoir.append(row)
+        else:
+            j = rng.randrange(seen)
+            if j < size:
+                reservoir[j] = row
+    return reservoir, seen
+
+
+def page_rows(rows: Iterable[Dict[str, Any]], offset: int = 0,
+              limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """
+    Return one page of a row stream.
+
+    Reading stops as soon as the page is full and one extra row has been seen,
+    so later pages of a large file never require reading the tail.
+
+    Returns:
+        Tuple of (page rows, rows consumed, has_more)
+    """
+    offset = max(offset, 0)
+    page: List[Dict[str, Any]] = []
+    consumed = 0
+    for row in rows:
+        consumed += 1
+        if consumed <= offset:
+            continue
+        if limit is not None and len(page) >= limit:
+            return page, consumed - 1, True
+        page.append(row)
+    return page, consumed, False
+
+
+class NumericSummary:
+    """Single-pass accumulator for count/min/max/mean of one column."""
+
+    __slots__ = ("count", "min", "max", "total")
+
+    def __init__(self):
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def to_dict(self, column: str) -> Dict[str, Any]:
+        return {
+            "column": column,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "avg": self.total / self.count if self.count else None
+        }
+
+
+def summarize_chunks(chunks: Iterable[List[Dict[str, Any]]],
+                     columns: List[str]) -> Tuple[List[Dict[str, Any]], List[str], int]:
+    """
+    Compute numeric column statistics over a chunked row stream.
+
+    Returns:
+        Tuple of (numeric column summaries, text columns, total rows)
+    """
+    stats = {col: NumericSummary() for col in columns}
+    total_rows = 0
+    for chunk in chunks:
+        total_rows += len(chunk)
+        for col in columns:
+            acc = stats[col]
+            for row in chunk:
+                value = row.get(col)
+                if value is None or value == "":
+                    continue
+                try:
+                    acc.add(float(value))
+                except (ValueError, TypeError):
+                    continue
+
+    numeric = [stats[col].to_dict(col) for col in columns if stats[col].count]
+    numeric_names = {nc["column"] for nc in numeric}
+    text = [col for col in columns if col not in numeric_names]
+    return numeric, text, total_rows
+
+
+# Operators accepted in filter predicates
+FILTER_OPERATORS = ("==", "!=", ">", ">=", "<", "<=", "in", "contains")
+
+Predicate = Tuple[str, str, Any]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def normalize_predicates(columns: List[str], filters: Optional[List[Dict[str, Any]]] = None,
+                         filter_column: Optional[str] = None,
+                         filter_value: Optional[str] = None) -> List[Predicate]:
+    """
+    Build a validated list of (column, operator, value) predicates.
+
+    The legacy `filter_column`/`filter_value` pair becomes a single '=='
+    predicate. All predicates are combined with AND.
+
+    Raises:
+        ValueError: If a column or operator is unknown, or no predicate is given.
+    """
+    specs = list(filters or [])
+    if filter_column is not None or filter_value is not None:
+        specs.insert(0, {"column": filter_column, "operator": "==", "value": filter_value})
+    if not specs:
+        raise ValueError("Filter value is required for filter operation")
+
+    predicates: List[Predicate] = []
+    for spec in specs:
+        column = spec.get("column")
+        operator = str(spec.get("operator", "==")).lower()
+        value = spec.get("value")
+        if not column or column not in columns:
+            raise ValueError(f"Filter column '{column}' not found. Available: {columns}")
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator '{operator}'. Available: {list(FILTER_OPERATORS)}")
+        if value is None:
+            raise ValueError("Filter value is required for filter operation")
+        if operator == "in":
+            if not isinstance(value, (list, tuple, set)):
+                raise ValueError("Filter operator 'in' requires a list value")
+            value = frozenset(str(v) for v in value)
+        elif operator in (">", ">=", "<", "<="):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Filter operator '{operator}' requires a numeric value, got {value!r}")
+        predicates.append((column, operator, value))
+    return predicates
+
+
+def _cell_matches(cell: Optional[str], operator: str, value: Any) -> bool:
+    """Evaluate one predicate against a raw CSV cell."""
+    if cell is None:
+        return operator == "!="
+    if operator in ("==", "!="):
+        if _is_number(value):
+            try:
+                equal = float(cell) == value
+            except ValueError:
+                equal = False
+        else:
+            equal = cell == str(value)
+        return equal if operator == "==" else not equal
+    if operator == "in":
+        return cell in value
+    if operator == "contains":
+        return str(value).lower() in cell.lower()
+    try:
+        number = float(cell)
+    except ValueError:
+        return False
+    if operator == ">":
+        return number > value
+    if operator == ">=":
+        return number >= value
+    if operator == "<":
+        return number < value
+    return number <= value
+
+
+def row_matches(row: Dict[str, Any], predicates: List[Predicate]) -> bool:
+    """Return True if a row satisfies every predicate."""
+    for column, operator, value in predicates:
+        if not _cell_matches(row.get(column), operator, value):
+            return False
+    return True
+
+
+def filter_chunks(chunks: Iterable[List[Dict[str, Any]]], predicates: List[Predicate],
+                  offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Keep rows matching all predicates, paging over the matches.
+
+    Returns:
+        Tuple of (matching rows in the requested page, total matches, total rows)
+    """
+    page: List[Dict[str, Any]] = []
+    matches = 0
+    total_rows = 0
+    for chunk in chunks:
+        total_rows += len(chunk)
+        for row in chunk:
+            if not row_matches(row, predicates):
+                continue
+            matches += 1
+            if matches > offset and (limit is None or len(page) < limit):
+                page.append(row)
+    return page, matches, total_rows
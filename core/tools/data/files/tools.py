@@ -3,20 +3,37 @@ File System Tools - Basic file operations for data persistence.
 
 Tools:
 - file_store: Save content to files with safety checks
-- file_read: Read file content with size limits  
+- file_read: Read file content with size limits, or ranged/head/tail/grep slices
 - file_list: List directory contents with pattern matching
 
 For CSV-specific operations, see data/csv/tools.py
 For network file operations, see network/ftp/tools.py (future)
 """
-import json
 import os
+import re
 from pathlib import Path
 from typing import Optional
 
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from ...utilities.output import to_json
+from ..cache import MISSING, data_cache, file_signature
+from .utils import (
+    PROBE_SIZE,
+    DirectoryIndex,
+    decode_bytes,
+    detect_encoding,
+    grep_lines,
+    head_lines,
+    is_line_splittable,
+    iter_directory,
+    mapped,
+    read_byte_range,
+    read_line_range,
+    tail_lines,
+)
+
 # --- Input Schemas ---
 
 class FileStoreInput(BaseModel):
@@ -29,16 +46,29 @@ class FileStoreInput(BaseModel):
 class FileReadInput(BaseModel):
     file_path: str = Field(description="Path to the file to read")
     encoding: str = Field(default="utf-8", description="File encoding")
-    max_size_mb: int = Field(default=10, description="Maximum file size to read in MB (safety limit)")
+    max_size_mb: int = Field(default=10, description="Maximum file size to read in MB (safety limit); caps returned content in ranged modes")
+    mode: str = Field(default="full", description="Read mode: 'full', 'head', 'tail', 'lines', 'bytes', 'grep'")
+    num_lines: int = Field(default=50, description="Lines to return for head/tail, or maximum matches for grep")
+    line_start: Optional[int] = Field(default=None, description="First line to return, 1-based (for lines mode)")
+    line_end: Optional[int] = Field(default=None, description="Last line to return, inclusive (for lines mode)")
+    byte_start: Optional[int] = Field(default=None, description="First byte offset to return (for bytes mode)")
+    byte_end: Optional[int] = Field(default=None, description="Byte offset to stop at, exclusive (for bytes mode)")
+    pattern: Optional[str] = Field(default=None, description="Regular expression to search for (for grep mode)")
+    ignore_case: bool = Field(default=False, description="Case-insensitive matching (for grep mode)")
 
 class FileListInput(BaseModel):
     directory_path: str = Field(description="Directory path to list files from")
     pattern: str = Field(default="*", description="File pattern to match (e.g., '*.txt', '*.json')")
     recursive: bool = Field(default=False, description="Whether to search subdirectories recursively")
     include_dirs: bool = Field(default=False, description="Whether to include directories in the results")
+    max_results: Optional[int] = Field(default=None, description="Stop listing after this many entries")
+    workers: int = Field(default=0, description="Threads used to scan directories in parallel during recursive listings (0 = sequential)")
+    use_index: bool = Field(default=False, description="Use a persistent listing index refreshed by directory mtime (sizes of files edited in place may lag)")
 
 # --- Helper Functions ---
 
+READ_MODES = ("full", "head", "tail", "lines", "bytes", "grep")
+
 def _safe_path(file_path: str) -> Path:
     """Convert to Path object and validate it's not trying to escape working directory."""
     path = Path(file_path).resolve()
@@ -92,15 +122,16 @@ def file_store(content: str, file_path: str, mode: str = "w", encoding: str = "u
         
         # Check if file exists for exclusive mode
         if mode == 'x' and safe_file_path.exists():
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"File already exists: {safe_file_path}",
                 "file_path": str(safe_file_path)
-            }, indent=2)
+            })
         
         # Write the file
         with open(safe_file_path, mode, encoding=encoding) as f:
             f.write(content)
+        data_cache.invalidate(safe_file_path)
         
         # Get file info
         file_size = safe_file_path.stat().st_size
@@ -116,39 +147,50 @@ def file_store(content: str, file_path: str, mode: str = "w", encoding: str = "u
             "created_dirs": create_dirs and not safe_file_path.parent.exists()
         }
         
-        return json.dumps(result, indent=2)
+        return to_json(result)
         
     except PermissionError:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Permission denied: Cannot write to {file_path}",
             "file_path": file_path
-        }, indent=2)
+        })
     
     except FileNotFoundError:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Directory does not exist: {Path(file_path).parent}",
             "file_path": file_path
-        }, indent=2)
+        })
     
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"File write failed: {str(e)}",
             "file_path": file_path
-        }, indent=2)
+        })
 
 @tool("file_read", args_schema=FileReadInput)
-def file_read(file_path: str, encoding: str = "utf-8", max_size_mb: int = 10) -> str:
+def file_read(file_path: str, encoding: str = "utf-8", max_size_mb: int = 10, mode: str = "full",
+              num_lines: int = 50, line_start: Optional[int] = None, line_end: Optional[int] = None,
+              byte_start: Optional[int] = None, byte_end: Optional[int] = None,
+              pattern: Optional[str] = None, ignore_case: bool = False) -> str:
     """
     Read content from files with safety limits and error handling.
     
+    Read modes:
+    - 'full': Whole file (subject to max_size_mb)
+    - 'head' / 'tail': First or last num_lines lines
+    - 'lines': Lines line_start..line_end (1-based, inclusive)
+    - 'bytes': Bytes byte_start..byte_end (0-based, end exclusive)
+    - 'grep': Lines matching a regex pattern (up to num_lines matches)
+    
     Features:
-    - File size safety limits (default 10MB)
-    - Automatic encoding detection fallback
+    - File size safety limits (default 10MB); ranged modes work on files of any size
+    - Memory-mapped ranged reads that only load the returned slice
+    - Single-pass encoding detection (BOM, requested encoding, binary check, latin-1)
     - Detailed file metadata
-    - Binary file detection
+    - Repeated full reads of an unchanged file are served from the shared data cache
     
     Returns JSON with file content and metadata.
     """
@@ -158,80 +200,160 @@ def file_read(file_path: str, encoding: str = "utf-8", max_size_mb: int = 10) ->
         
         # Check if file exists
         if not safe_file_path.exists():
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"File not found: {safe_file_path}",
                 "file_path": str(safe_file_path)
-            }, indent=2)
+            })
+        
+        mode = (mode or "full").lower()
+        if mode not in READ_MODES:
+            return to_json({
+                "success": False,
+                "error": f"Unknown read mode: {mode}. Available: {', '.join(READ_MODES)}",
+                "file_path": str(safe_file_path)
+            })
         
         # Check file size
-        file_size = safe_file_path.stat().st_size
+        stat = safe_file_path.stat()
+        file_size = stat.st_size
         max_size_bytes = max_size_mb * 1024 * 1024
         
-        if file_size > max_size_bytes:
-            return json.dumps({
+        if mode == "full" and file_size > max_size_bytes:
+            return to_json({
                 "success": False,
                 "error": f"File too large: {_format_file_size(file_size)} > {max_size_mb}MB limit",
                 "file_path": str(safe_file_path),
                 "file_size_bytes": file_size,
-                "file_size_human": _format_file_size(file_size)
-            }, indent=2)
+                "file_size_human": _format_file_size(file_size),
+                "suggested_action": "Use mode 'head', 'tail', 'lines', 'bytes' or 'grep' to read part of the file"
+            })
         
-        # Try to read the file
-        try:
-            with open(safe_file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # Try with different encoding
-            try:
-                with open(safe_file_path, 'r', encoding='latin-1') as f:
-                    content = f.read()
-                encoding = 'latin-1'
-            except UnicodeDecodeError:
-                return json.dumps({
-                    "success": False,
-                    "error": "Unable to decode file - may be binary",
-                    "file_path": str(safe_file_path),
-                    "file_size_bytes": file_size,
-                    "suggested_action": "Use binary file tools if this is not a text file"
-                }, indent=2)
-        
-        # Get file metadata
-        stat = safe_file_path.stat()
+        binary_error = {
+            "success": False,
+            "error": "Unable to decode file - may be binary",
+            "file_path": str(safe_file_path),
+            "file_size_bytes": file_size,
+            "suggested_action": "Use binary file tools if this is not a text file"
+        }
         
         result = {
             "success": True,
             "file_path": str(safe_file_path),
-            "content": content,
-            "encoding": encoding,
+            "mode": mode
+        }
+        
+        if mode == "full":
+            signature = file_signature(safe_file_path)
+            cached = data_cache.get(signature, "file_text", encoding)
+            if cached is not MISSING:
+                content, used_encoding = cached
+            else:
+                with open(safe_file_path, 'rb') as f:
+                    data = f.read()
+                used_encoding = detect_encoding(data[:PROBE_SIZE], encoding)
+                if used_encoding is None:
+                    return to_json(binary_error)
+                content, used_encoding = decode_bytes(data, used_encoding)
+                del data
+                data_cache.put(signature, "file_text", encoding, (content, used_encoding))
+            result["content"] = content
+            result["line_count"] = content.count('\n') + (1 if content and not content.endswith('\n') else 0)
+            result["cached"] = cached is not MISSING
+            
+        else:
+            with mapped(safe_file_path) as mm:
+                used_encoding = detect_encoding(mm[:PROBE_SIZE], encoding)
+                if used_encoding is None:
+                    return to_json(binary_error)
+                if mode != "bytes" and not is_line_splittable(used_encoding):
+                    return to_json({
+                        "success": False,
+                        "error": f"Line-based modes are not supported for {used_encoding} files",
+                        "file_path": str(safe_file_path),
+                        "suggested_action": "Use mode 'full' or 'bytes'"
+                    })
+                
+                if mode == "grep":
+                    if not pattern:
+                        return to_json({
+                            "success": False,
+                            "error": "pattern is required for grep mode",
+                            "file_path": str(safe_file_path)
+                        })
+                    matches, truncated = grep_lines(mm, pattern, used_encoding, num_lines, ignore_case)
+                    result["pattern"] = pattern
+                    result["matches"] = matches
+                    result["match_count"] = len(matches)
+                    result["truncated"] = truncated
+                else:
+                    if mode == "head":
+                        data, lines = head_lines(mm, num_lines)
+                    elif mode == "tail":
+                        data, lines = tail_lines(mm, num_lines)
+                    elif mode == "lines":
+                        start = line_start or 1
+                        data, lines = read_line_range(mm, start, line_end)
+                        result["line_start"] = start
+                        result["line_end"] = start + lines - 1 if lines else None
+                    else:
+                        data = read_byte_range(mm, byte_start or 0, byte_end)
+                        lines = None
+                        result["byte_start"] = min(max(byte_start or 0, 0), file_size)
+                        result["byte_end"] = result["byte_start"] + len(data)
+                    
+                    truncated = len(data) > max_size_bytes
+                    if truncated:
+                        data = data[:max_size_bytes]
+                    cut_start = mode == "bytes" and result["byte_start"] > 0
+                    cut_end = truncated or (mode == "bytes" and result["byte_end"] < file_size)
+                    content, used_encoding = decode_bytes(data, used_encoding, cut_start, cut_end)
+                    result["content"] = content
+                    if lines is not None:
+                        result["line_count"] = lines
+                    result["truncated"] = truncated
+        
+        if "content" in result:
+            result["content_length"] = len(result["content"])
+        result.update({
+            "encoding": used_encoding,
             "file_size_bytes": file_size,
             "file_size_human": _format_file_size(file_size),
-            "content_length": len(content),
-            "line_count": content.count('\n') + (1 if content and not content.endswith('\n') else 0),
             "modified_time": stat.st_mtime,
             "created_time": stat.st_ctime
-        }
+        })
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
+    except re.error as e:
+        return to_json({
+            "success": False,
+            "error": f"Invalid grep pattern: {str(e)}",
+            "file_path": file_path
+        })
+    
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"File read failed: {str(e)}",
             "file_path": file_path
-        }, indent=2)
+        })
 
 @tool("file_list", args_schema=FileListInput)
 def file_list(directory_path: str, pattern: str = "*", recursive: bool = False, 
-              include_dirs: bool = False) -> str:
+              include_dirs: bool = False, max_results: Optional[int] = None,
+              workers: int = 0, use_index: bool = False) -> str:
     """
     List files in directories with pattern matching and filtering.
     
     Features:
-    - Glob pattern matching (*.txt, *.json, etc.)
+    - Glob pattern matching (*.txt, **/*.py, etc.)
     - Recursive directory traversal
     - File metadata (size, modification time)
     - Directory inclusion option
+    - scandir-based walk that stops early at max_results
+    - Optional thread pool (workers) for slow network filesystems
+    - Optional on-disk index (use_index) that only re-lists directories whose mtime changed
     
     Returns JSON with file listing and metadata.
     """
@@ -241,51 +363,48 @@ def file_list(directory_path: str, pattern: str = "*", recursive: bool = False,
         
         # Check if directory exists
         if not safe_dir_path.exists():
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"Directory not found: {safe_dir_path}",
                 "directory_path": str(safe_dir_path)
-            }, indent=2)
+            })
         
         if not safe_dir_path.is_dir():
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"Path is not a directory: {safe_dir_path}",
                 "directory_path": str(safe_dir_path)
-            }, indent=2)
+            })
         
-        # List files based on pattern
-        if recursive:
-            paths = safe_dir_path.rglob(pattern)
+        # Stream matching entries, stopping as soon as max_results is reached
+        index_stats = None
+        if use_index:
+            index_stats = {}
+            entries = DirectoryIndex(safe_dir_path).scan(pattern, recursive, index_stats)
         else:
-            paths = safe_dir_path.glob(pattern)
+            entries = iter_directory(safe_dir_path, pattern, recursive, workers)
         
         files = []
         dirs = []
+        truncated = False
         
-        for path in paths:
-            try:
-                stat = path.stat()
-                
-                item_info = {
-                    "name": path.name,
-                    "path": str(path),
-                    "relative_path": str(path.relative_to(safe_dir_path)),
-                    "size_bytes": stat.st_size,
-                    "size_human": _format_file_size(stat.st_size),
-                    "modified_time": stat.st_mtime,
-                    "is_file": path.is_file(),
-                    "is_dir": path.is_dir()
-                }
-                
-                if path.is_file():
-                    files.append(item_info)
-                elif path.is_dir() and include_dirs:
-                    dirs.append(item_info)
-                    
-            except (OSError, PermissionError):
-                # Skip files we can't access
+        for info in entries:
+            if info["is_file"]:
+                target = files
+            elif info["is_dir"] and include_dirs:
+                target = dirs
+            else:
                 continue
+            if max_results is not None and len(files) + len(dirs) >= max_results:
+                truncated = True
+                break
+            item_info = dict(info)
+            item_info.pop("is_symlink", None)
+            item_info["size_human"] = _format_file_size(info["size_bytes"])
+            target.append(item_info)
+        
+        if hasattr(entries, "close"):
+            entries.close()
         
         # Sort by name
         files.sort(key=lambda x: x['name'])
@@ -299,18 +418,21 @@ def file_list(directory_path: str, pattern: str = "*", recursive: bool = False,
             "include_dirs": include_dirs,
             "file_count": len(files),
             "dir_count": len(dirs),
+            "truncated": truncated,
             "files": files,
             "directories": dirs if include_dirs else []
         }
+        if index_stats is not None:
+            result["index"] = index_stats
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Directory listing failed: {str(e)}",
             "directory_path": directory_path
-        }, indent=2)
+        })
 
 
 # --- Tool Aggregator ---
@@ -0,0 +1,447 @@
+"""
+Ranged and streaming file readers used by the file_read tool.
+
+These are non-tool helper functions that an agent's own Python code can import
+and use directly. They are NOT exposed to the LLM as tools.
+
+Reads are backed by mmap, so slicing, tailing or grepping a large file only
+materialises the bytes that are actually returned. Directory listings use
+os.scandir so file type checks come from the directory entry itself.
+"""
+import codecs
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Bytes inspected when detecting encoding / binary content
+PROBE_SIZE = 8192
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def detect_encoding(head: bytes, requested: str = "utf-8") -> Optional[str]:
+    """
+    Pick an encoding from the first bytes of a file in one pass.
+
+    Order: byte-order mark, the requested encoding, then latin-1 (which
+    accepts any byte sequence). Text that decodes with the requested
+    encoding is returned as such even if it contains NUL bytes; only content
+    that fails it and contains NUL bytes is treated as binary rather than
+    decoded as latin-1.
+
+    Returns:
+        The encoding name, or None if the content looks binary.
+    """
+    for bom, name in _BOMS:
+        if head.startswith(bom):
+            return name
+    try:
+        # Incremental decode so a multi-byte character cut at the probe boundary is not an error
+        codecs.getincrementaldecoder(requested)().decode(head, final=False)
+        return requested
+    except (UnicodeDecodeError, LookupError):
+        pass
+    if b"\x00" in head:
+        return None
+    return "latin-1"
+
+
+def is_line_splittable(encoding: str) -> bool:
+    """Return True if b'\\n' reliably marks line ends in this encoding."""
+    # Covers the -le/-be variants too
+    return not codecs.lookup(encoding).name.startswith(("utf-16", "utf-32"))
+
+
+def decode_bytes(data: bytes, encoding: str, cut_start: bool = False,
+                 cut_end: bool = False) -> Tuple[str, str]:
+    """
+    Decode bytes, falling back to latin-1 without re-reading the file.
+
+    `cut_start` / `cut_end` say the data was sliced at an arbitrary byte
+    offset there. A character split by such a cut is dropped, instead of
+    making the whole slice fall back to latin-1.
+
+    Returns:
+        Tuple of (text, encoding actually used)
+    """
+    # A character is at most 4 bytes, so at most 3 belong to one cut at the start
+    for skip in range(4 if cut_start else 1):
+        try:
+            if cut_end:
+                # Without final=True the decoder holds back an incomplete trailing character
+                return codecs.getincrementaldecoder(encoding)().decode(data[skip:], final=False), encoding
+            return data[skip:].decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin-1"), "latin-1"
+
+
+@contextmanager
+def mapped(path: Path) -> Iterator[Any]:
+    """Memory-map a file read-only. Yields b'' for empty files, which cannot be mapped."""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            yield b""
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def read_byte_range(mm: Any, start: int = 0, end: Optional[int] = None) -> bytes:
+    """Return bytes [start, end) of a mapped file."""
+    size = len(mm)
+    start = min(max(start, 0), size)
+    end = size if end is None else min(max(end, start), size)
+    return mm[start:end]
+
+
+def line_offset(mm: Any, line_number: int) -> int:
+    """Byte offset where 1-based `line_number` starts (len(mm) if past the end)."""
+    pos = 0
+    size = len(mm)
+    for _ in range(max(line_number, 1) - 1):
+        nl = mm.find(b"\n", pos)
+        if nl == -1:
+            return size
+        pos = nl + 1
+    return pos
+
+
+def read_line_range(mm: Any, start: int = 1, end: Optional[int] = None) -> Tuple[bytes, int]:
+    """
+    Return the bytes of lines start..end (1-based, inclusive).
+
+    Returns:
+        Tuple of (bytes, number of lines returned)
+    """
+    begin = line_offset(mm, start)
+    size = len(mm)
+    if end is None:
+        stop = size
+    else:
+        stop = begin
+        for _ in range(max(end - start + 1, 0)):
+            nl = mm.find(b"\n", stop)
+            if nl == -1:
+                stop = size
+                break
+            stop = nl + 1
+    data = mm[begin:stop]
+    return data, _count_lines(data)
+
+
+def head_lines(mm: Any, count: int) -> Tuple[bytes, int]:
+    """Return the first `count` lines."""
+    return read_line_range(mm, 1, count) if count > 0 else (b"", 0)
+
+
+def tail_lines(mm: Any, count: int) -> Tuple[bytes, int]:
+    """Return the last `count` lines by scanning backwards from the end of the file."""
+    size = len(mm)
+    if count <= 0 or size == 0:
+        return b"", 0
+    # Ignore a trailing newline so it does not count as an empty last line
+    pos = size - 1 if mm[size - 1:size] == b"\n" else size
+    for _ in range(count):
+        nl = mm.rfind(b"\n", 0, pos)
+        if nl == -1:
+            pos = -1
+            break
+        pos = nl
+    data = mm[pos + 1:size]
+    return data, _count_lines(data)
+
+
+def grep_lines(mm: Any, pattern: str, encoding: str, max_matches: int = 50,
+               ignore_case: bool = False) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Return lines matching a regular expression, one line decoded at a time.
+
+    Returns:
+        Tuple of ([{line_number, line}], whether matching stopped at max_matches)
+    """
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    matches: List[Dict[str, Any]] = []
+    size = len(mm)
+    pos = 0
+    line_number = 0
+    while pos < size:
+        nl = mm.find(b"\n", pos)
+        stop = size if nl == -1 else nl + 1
+        line_number += 1
+        line = mm[pos:stop].decode(encoding, errors="replace").rstrip("\r\n")
+        pos = stop
+        if regex.search(line):
+            if len(matches) >= max_matches:
+                return matches, True
+            matches.append({"line_number": line_number, "line": line})
+    return matches, False
+
+
+def _count_lines(data: bytes) -> int:
+    return data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+
+
+# --- Directory scanning ---
+
+def _entry_info(entry: os.DirEntry, rel_dir: str) -> Optional[Dict[str, Any]]:
+    """Build listing metadata from a DirEntry, or None if it cannot be stat'ed."""
+    try:
+        is_dir = entry.is_dir()
+        is_file = entry.is_file()
+        is_symlink = entry.is_symlink()
+        stat = entry.stat()
+    except OSError:
+        return None
+    return {
+        "name": entry.name,
+        "path": entry.path,
+        "relative_path": f"{rel_dir}/{entry.name}" if rel_dir else entry.name,
+        "size_bytes": stat.st_size,
+        "modified_time": stat.st_mtime,
+        "is_file": is_file,
+        "is_dir": is_dir,
+        "is_symlink": is_symlink
+    }
+
+
+def _scan_one(path: str, rel_dir: str) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
+    """
+    List a single directory.
+
+    Returns:
+        Tuple of (entry metadata, [(subdirectory path, relative path)])
+    """
+    items: List[Dict[str, Any]] = []
+    subdirs: List[Tuple[str, str]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                info = _entry_info(entry, rel_dir)
+                if info is None:
+                    continue
+                items.append(info)
+                if info["is_dir"] and not info["is_symlink"]:
+                    subdirs.append((entry.path, info["relative_path"]))
+    except OSError:
+        pass
+    return items, subdirs
+
+
+def _dir_depth(rel_dir: str) -> int:
+    return rel_dir.count("/") + 1 if rel_dir else 0
+
+
+@lru_cache(maxsize=256)
+def _glob_parts(pattern: str, recursive: bool) -> Tuple[str, ...]:
+    """Split a glob into path segments. Recursive listings match at any depth, like Path.rglob."""
+    parts = tuple(part for part in pattern.split("/") if part)
+    if recursive and parts[:1] != ("**",):
+        parts = ("**",) + parts
+    return parts
+
+
+def _match_parts(parts: Tuple[str, ...], pattern: Tuple[str, ...]) -> bool:
+    """Match path segments against glob segments, where '**' spans zero or more directories."""
+    if not pattern:
+        return not parts
+    head, rest = pattern[0], pattern[1:]
+    if head == "**":
+        return any(_match_parts(parts[i:], rest) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatchcase(parts[0], head) and _match_parts(parts[1:], rest)
+
+
+def _max_depth(pattern: str, recursive: bool) -> Optional[int]:
+    """Deepest directory level (0 = root) whose entries can match, or None if unbounded."""
+    parts = _glob_parts(pattern, recursive)
+    if "**" in parts:
+        return None
+    return len(parts) - 1
+
+
+def _matches(info: Dict[str, Any], pattern: str, recursive: bool = False) -> bool:
+    return _match_parts(tuple(info["relative_path"].split("/")), _glob_parts(pattern, recursive))
+
+
+def iter_directory(root: Path, pattern: str = "*", recursive: bool = False,
+                   workers: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Stream metadata for directory entries matching `pattern`.
+
+    Patterns follow Path.glob: '*' stays within one path segment and '**'
+    matches zero or more directories; a recursive listing matches the
+    pattern at any depth, like Path.rglob. Symlinked directories are listed
+    but not descended into. With
+    `workers` > 0, each level of the tree is scanned on a thread pool, which
+    hides latency on network filesystems. Stop iterating to end the walk early.
+    """
+    root_str = str(root)
+    max_depth = _max_depth(pattern, recursive)
+    if max_depth is not None or workers <= 0:
+        pending = deque([(root_str, "")])
+        while pending:
+            path, rel_dir = pending.popleft()
+            items, subdirs = _scan_one(path, rel_dir)
+            for info in items:
+                if _matches(info, pattern, recursive):
+                    yield info
+            if max_depth is None or _dir_depth(rel_dir) < max_depth:
+                pending.extend(subdirs)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="braid-scan")
+    try:
+        frontier = [(root_str, "")]
+        while frontier:
+            next_frontier: List[Tuple[str, str]] = []
+            for items, subdirs in executor.map(lambda d: _scan_one(*d), frontier):
+                for info in items:
+                    if _matches(info, pattern, recursive):
+                        yield info
+                next_frontier.extend(subdirs)
+            frontier = next_frontier
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class DirectoryIndex:
+    """
+    On-disk listing index for one directory tree, refreshed incrementally.
+
+    Each directory's entries are stored with the directory's mtime. On
+    refresh, a directory whose mtime is unchanged reuses its stored entries
+    instead of being re-listed, so only one stat per directory is needed.
+    Directory mtimes only change when entries are added, removed or renamed,
+    so sizes and mtimes of files modified in place may be stale until their
+    directory changes.
+
+    Index files live in BRAID_FILE_INDEX_DIR (default ~/.cache/braid/file_index).
+    """
+
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, root: Path, index_dir: Optional[Path] = None):
+        self.root = root
+        base = index_dir or Path(os.getenv("BRAID_FILE_INDEX_DIR", Path.home() / ".cache" / "braid" / "file_index"))
+        digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+        self.index_path = Path(base) / f"{digest}.json"
+        with self._locks_guard:
+            self._lock = self._locks.setdefault(str(self.index_path), threading.Lock())
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("root") == str(self.root):
+                return data.get("dirs", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save(self, dirs: Dict[str, Any]) -> None:
+        with self._lock:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"root": str(self.root), "dirs": dirs}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+
+    def _walk(self, old: Dict[str, Any], new: Dict[str, Any], stats: Dict[str, int],
+              max_depth: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (relative dir, record) down to `max_depth`, reusing records whose mtime is unchanged."""
+        pending = deque([(str(self.root), "")])
+        while pending:
+            path, rel_dir = pending.popleft()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            cached = old.get(rel_dir)
+            if cached is not None and cached.get("mtime_ns") == mtime_ns:
+                record = cached
+                stats["dirs_reused"] += 1
+            else:
+                items, _ = _scan_one(path, rel_dir)
+                record = {"mtime_ns": mtime_ns, "entries": items}
+                stats["dirs_scanned"] += 1
+            new[rel_dir] = record
+            yield rel_dir, record
+            if max_depth is None or _dir_depth(rel_dir) < max_depth:
+                for info in record["entries"]:
+                    if info["is_dir"] and not info["is_symlink"]:
+                        pending.append((info["path"], info["relative_path"]))
+
+    def refresh(self) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Bring the whole index up to date with the tree on disk.
+
+        Returns:
+            Tuple of (per-directory index, {"dirs_scanned", "dirs_reused"})
+        """
+        old = self._load()
+        new: Dict[str, Any] = {}
+        stats = {"dirs_scanned": 0, "dirs_reused": 0}
+        for _ in self._walk(old, new, stats):
+            pass
+        if new != old:
+            self._save(new)
+        return new, stats
+
+    def iter_entries(self, dirs: Dict[str, Any], pattern: str = "*",
+                     recursive: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream matching entries from a refreshed index."""
+        max_depth = _max_depth(pattern, recursive)
+        for rel_dir, record in dirs.items():
+            if max_depth is not None and _dir_depth(rel_dir) > max_depth:
+                continue
+            for info in record["entries"]:
+                if _matches(info, pattern, recursive):
+                    yield info
+
+    def scan(self, pattern: str = "*", recursive: bool = False,
+             stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream matching entries, refreshing only the directories the listing reaches.
+
+        Like iter_directory, the walk goes no deeper than `pattern` can match
+        and ends when the caller stops iterating. The directories visited are
+        saved to the index; the others keep their stored records. Pass a dict
+        as `stats` to collect dirs_scanned and dirs_reused.
+        """
+        stats = stats if stats is not None else {}
+        stats.update(dirs_scanned=0, dirs_reused=0)
+        max_depth = _max_depth(pattern, recursive)
+        old = self._load()
+        new: Dict[str, Any] = {}
+        complete = False
+        try:
+            for _, record in self._walk(old, new, stats, max_depth):
+                for info in record["entries"]:
+                    if _matches(info, pattern, recursive):
+                        yield info
+            complete = max_depth is None
+        finally:
+            # Only a walk of the whole tree can drop directories that no longer exist
+            dirs = new if complete else {**old, **new}
+            if dirs != old:
+                self._save(dirs)
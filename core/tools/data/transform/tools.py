@@ -7,11 +7,12 @@ Tools:
 - date_time: Manipulate dates/times and calculate intervals
 - sort_items: Order items by one or more fields
 - rename_keys: Bulk-rename field names via mapping
+- transform_pipeline: Chain the item tools above in one call
 
 Inspired by n8n core transformation nodes for ETL-style workflows.
 """
-import json
 import re
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Union
 from operator import itemgetter
@@ -19,6 +20,9 @@ from operator import itemgetter
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from ...utilities.output import to_json
+from .utils import PIPELINE_STEPS, compile_condition, edit_record, rename_record, run_pipeline, sort_records
+
 # --- Input Schemas ---
 
 class EditFieldsInput(BaseModel):
@@ -27,7 +31,7 @@ class EditFieldsInput(BaseModel):
 
 class FilterItemsInput(BaseModel):
     items: List[Dict[str, Any]] = Field(description="List of data items to filter")
-    condition: str = Field(description="Filter condition: 'field operator value' (e.g., 'age > 25', 'status == active')")
+    condition: str = Field(description="Filter condition: 'field operator value', combinable with and/or/not and parentheses (e.g., 'age > 25 and status == active', 'role in [admin, owner]', 'user.country == US')")
     limit: Optional[int] = Field(default=None, description="Maximum number of items to return")
 
 class DateTimeInput(BaseModel):
@@ -40,11 +44,16 @@ class DateTimeInput(BaseModel):
 class SortItemsInput(BaseModel):
     items: List[Dict[str, Any]] = Field(description="List of data items to sort")
     sort_fields: List[Dict[str, Any]] = Field(description="Sort criteria: [{field: 'name', order: 'asc|desc'}]")
+    limit: Optional[int] = Field(default=None, description="Only return the first N items (top-k)")
 
 class RenameKeysInput(BaseModel):
     items: List[Dict[str, Any]] = Field(description="List of data items to process")
     key_mapping: Dict[str, str] = Field(description="Mapping of old_key: new_key")
 
+class TransformPipelineInput(BaseModel):
+    items: List[Dict[str, Any]] = Field(description="List of data items to process")
+    steps: List[Dict[str, Any]] = Field(description="Ordered steps, each {tool: 'edit_fields|filter_items|sort_items|rename_keys', ...that tool's arguments except items}")
+
 # --- Data Transformation Tools ---
 
 @tool("edit_fields", args_schema=EditFieldsInput)
@@ -65,33 +74,8 @@ def edit_fields(items: List[Dict[str, Any]], operations: List[Dict[str, Any]]) -
     Returns JSON with processed items and operation summary.
     """
     try:
-        processed_items = []
         operation_count = {"add": 0, "remove": 0, "rename": 0}
-        
-        for item in items:
-            processed_item = item.copy()
-            
-            for op in operations:
-                action = op.get("action", "").lower()
-                field = op.get("field", "")
-                
-                if action == "add":
-                    value = op.get("value", "")
-                    processed_item[field] = value
-                    operation_count["add"] += 1
-                    
-                elif action == "remove":
-                    if field in processed_item:
-                        del processed_item[field]
-                        operation_count["remove"] += 1
-                        
-                elif action == "rename":
-                    new_name = op.get("new_name", "")
-                    if field in processed_item and new_name:
-                        processed_item[new_name] = processed_item.pop(field)
-                        operation_count["rename"] += 1
-            
-            processed_items.append(processed_item)
+        processed_items = [edit_record(item, operations, operation_count) for item in items]
         
         result = {
             "success": True,
@@ -101,117 +85,74 @@ def edit_fields(items: List[Dict[str, Any]], operations: List[Dict[str, Any]]) -
             "items": processed_items
         }
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Field editing failed: {str(e)}",
             "original_count": len(items) if items else 0
-        }, indent=2)
+        })
 
 @tool("filter_items", args_schema=FilterItemsInput)
 def filter_items(items: List[Dict[str, Any]], condition: str, limit: Optional[int] = None) -> str:
     """
     Keep only items matching a condition with optional limit.
     
-    Condition format: 'field operator value'
-    Operators: ==, !=, >, <, >=, <=, contains, startswith, endswith
+    Condition format: 'field operator value', combinable with and/or/not and parentheses
+    Operators: ==, !=, >, <, >=, <=, contains, startswith, endswith, in, not in
+    Fields may be dotted paths into nested objects (e.g. 'customer.address.city')
     
     Examples:
     - 'age > 25'
     - 'status == active'
     - 'name contains John'
     - 'email endswith gmail.com'
+    - 'age >= 18 and (country == US or country == CA)'
+    - 'role in [admin, owner] and not profile.suspended == true'
+    
+    Conditions are compiled once and cached, then applied in a single pass.
     
     Returns JSON with filtered items and filter statistics.
     """
     try:
-        # Parse condition
-        condition_parts = condition.strip().split()
-        if len(condition_parts) < 3:
-            return json.dumps({
+        try:
+            compiled = compile_condition(condition)
+        except ValueError as e:
+            return to_json({
                 "success": False,
-                "error": "Invalid condition format. Use: 'field operator value'",
-                "example": "age > 25"
-            }, indent=2)
-        
-        field = condition_parts[0]
-        operator = condition_parts[1]
-        value = " ".join(condition_parts[2:])  # Handle values with spaces
+                "error": f"Invalid condition: {str(e)}",
+                "example": "age > 25 and (status == active or role in [admin, owner])"
+            })
         
-        # Convert value to appropriate type
-        if value.lower() in ['true', 'false']:
-            value = value.lower() == 'true'
-        elif value.isdigit():
-            value = int(value)
-        elif value.replace('.', '').replace('-', '').isdigit():
-            value = float(value)
-        elif value.startswith('"') and value.endswith('"'):
-            value = value[1:-1]  # Remove quotes
+        # Single pass over the items; stops early once the limit is reached
+        filtered_items = compiled.filter(items, limit)
         
-        filtered_items = []
-        
-        for item in items:
-            if field not in item:
-                continue
-                
-            item_value = item[field]
-            matches = False
-            
-            try:
-                if operator == "==":
-                    matches = item_value == value
-                elif operator == "!=":
-                    matches = item_value != value
-                elif operator == ">":
-                    matches = float(item_value) > float(value)
-                elif operator == "<":
-                    matches = float(item_value) < float(value)
-                elif operator == ">=":
-                    matches = float(item_value) >= float(value)
-                elif operator == "<=":
-                    matches = float(item_value) <= float(value)
-                elif operator == "contains":
-                    matches = str(value).lower() in str(item_value).lower()
-                elif operator == "startswith":
-                    matches = str(item_value).lower().startswith(str(value).lower())
-                elif operator == "endswith":
-                    matches = str(item_value).lower().endswith(str(value).lower())
-                else:
-                    continue  # Unknown operator
-                    
-                if matches:
-                    filtered_items.append(item)
-                    
-            except (ValueError, TypeError):
-                continue  # Skip items that can't be compared
-        
-        # Apply limit if specified
-        if limit and limit > 0:
-            filtered_items = filtered_items[:limit]
+        clauses = compiled.comparisons
+        single = clauses[0] if len(clauses) == 1 and compiled.tree is clauses[0] else None
         
         result = {
             "success": True,
             "condition": condition,
             "original_count": len(items),
             "filtered_count": len(filtered_items),
-            "filter_field": field,
-            "filter_operator": operator,
-            "filter_value": value,
+            "filter_field": single.field if single else None,
+            "filter_operator": single.operator if single else None,
+            "filter_value": single.value if single else None,
+            "filter_clauses": [clause.describe() for clause in clauses],
             "limit_applied": limit,
             "items": filtered_items
         }
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Filtering failed: {str(e)}",
             "condition": condition,
             "original_count": len(items) if items else 0
-        }, indent=2)
+        })
 
 @tool("date_time", args_schema=DateTimeInput)
 def date_time(operation: str, date_value: Optional[str] = None, amount: Optional[int] = None,
@@ -256,17 +197,17 @@ def date_time(operation: str, date_value: Optional[str] = None, amount: Optional
                         except ValueError:
                             continue
                     else:
-                        return json.dumps({
+                        return to_json({
                             "success": False,
                             "error": f"Could not parse date: {date_value}",
                             "supported_formats": ["ISO 8601", "YYYY-MM-DD", "YYYY-MM-DD HH:MM:SS"]
-                        }, indent=2)
+                        })
             
             if amount is None:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": "Amount is required for add/subtract operations"
-                }, indent=2)
+                })
             
             # Calculate time delta
             if unit == "days":
@@ -278,11 +219,11 @@ def date_time(operation: str, date_value: Optional[str] = None, amount: Optional
             elif unit == "seconds":
                 delta = timedelta(seconds=amount)
             else:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": f"Unknown time unit: {unit}",
                     "supported_units": ["days", "hours", "minutes", "seconds"]
-                }, indent=2)
+                })
             
             if operation == "add":
                 result_date = base_date + delta
@@ -296,34 +237,34 @@ def date_time(operation: str, date_value: Optional[str] = None, amount: Optional
                 try:
                     input_date = datetime.fromisoformat(date_value.replace('Z', '+00:00'))
                 except ValueError:
-                    return json.dumps({
+                    return to_json({
                         "success": False,
                         "error": f"Could not parse date for formatting: {date_value}"
-                    }, indent=2)
+                    })
             
             result_date = input_date
             
         elif operation == "parse":
             if not date_value:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": "Date value is required for parse operation"
-                }, indent=2)
+                })
             
             try:
                 result_date = datetime.fromisoformat(date_value.replace('Z', '+00:00'))
             except ValueError:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": f"Could not parse date: {date_value}"
-                }, indent=2)
+                })
         
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"Unknown operation: {operation}",
                 "supported_operations": ["now", "add", "subtract", "format", "parse"]
-            }, indent=2)
+            })
         
         # Format result
         formatted_result = result_date.strftime(format_string)
@@ -341,102 +282,60 @@ def date_time(operation: str, date_value: Optional[str] = None, amount: Optional
             "result_timestamp": result_date.timestamp()
         }
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Date/time operation failed: {str(e)}",
             "operation": operation
-        }, indent=2)
+        })
 
 @tool("sort_items", args_schema=SortItemsInput)
-def sort_items(items: List[Dict[str, Any]], sort_fields: List[Dict[str, Any]]) -> str:
+def sort_items(items: List[Dict[str, Any]], sort_fields: List[Dict[str, Any]],
+               limit: Optional[int] = None) -> str:
     """
     Order items by one or more fields (ascending/descending).
     
     Sort fields format: [{"field": "name", "order": "asc|desc"}]
     
     Features:
-    - Multi-field sorting with priority order
+    - Multi-field sorting with priority order, in a single pass
     - Ascending/descending per field
-    - Type-aware sorting (numbers, strings, dates)
-    - Handles missing fields gracefully
+    - Type-aware sorting (numeric strings as numbers, case-insensitive text)
+    - Handles missing fields gracefully (sorted last)
+    - Nested field paths (e.g. 'customer.name')
+    - Top-N selection via a heap when limit is given
     
     Returns JSON with sorted items and sort criteria.
     """
     try:
         if not sort_fields:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": "At least one sort field is required"
-            }, indent=2)
+            })
         
-        sorted_items = items.copy()
-        
-        # Build sort key function for multiple fields
-        def sort_key(item):
-            keys = []
-            for sort_field in reversed(sort_fields):  # Reverse for stable sorting
-                field = sort_field.get("field", "")
-                order = sort_field.get("order", "asc").lower()
-                
-                if field not in item:
-                    value = ""  # Default for missing fields
-                else:
-                    value = item[field]
-                
-                # Convert to comparable type
-                if isinstance(value, str):
-                    try:
-                        # Try to convert to number if possible
-                        if '.' in value:
-                            value = float(value)
-                        else:
-                            value = int(value)
-                    except ValueError:
-                        value = value.lower()  # Case-insensitive string sort
-                
-                # Handle reverse order
-                if order == "desc":
-                    if isinstance(value, (int, float)):
-                        value = -value
-                    elif isinstance(value, str):
-                        # For strings, we'll sort normally then reverse the list
-                        keys.append((field, value, True))  # True indicates desc
-                        continue
-                
-                keys.append((field, value, order == "desc"))
-            
-            return keys
-        
-        # Sort by each field in reverse order for multi-field sorting
-        for sort_field in reversed(sort_fields):
-            field = sort_field.get("field", "")
-            order = sort_field.get("order", "asc").lower()
-            reverse = order == "desc"
-            
-            sorted_items.sort(
-                key=lambda item: item.get(field, ""),
-                reverse=reverse
-            )
+        # One composite key per item, one sort (or a heap for top-k)
+        sorted_items = sort_records(items, sort_fields, limit)
         
         result = {
             "success": True,
             "original_count": len(items),
             "sorted_count": len(sorted_items),
             "sort_fields": sort_fields,
+            "limit_applied": limit,
             "items": sorted_items
         }
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Sorting failed: {str(e)}",
             "original_count": len(items) if items else 0
-        }, indent=2)
+        })
 
 @tool("rename_keys", args_schema=RenameKeysInput)
 def rename_keys(items: List[Dict[str, Any]], key_mapping: Dict[str, str]) -> str:
@@ -454,26 +353,8 @@ def rename_keys(items: List[Dict[str, Any]], key_mapping: Dict[str, str]) -> str
     Returns JSON with items having renamed keys and operation summary.
     """
     try:
-        processed_items = []
         rename_stats = {"total_renames": 0, "items_affected": 0}
-        
-        for item in items:
-            processed_item = {}
-            item_renames = 0
-            
-            for key, value in item.items():
-                if key in key_mapping:
-                    new_key = key_mapping[key]
-                    processed_item[new_key] = value
-                    item_renames += 1
-                    rename_stats["total_renames"] += 1
-                else:
-                    processed_item[key] = value
-            
-            if item_renames > 0:
-                rename_stats["items_affected"] += 1
-                
-            processed_items.append(processed_item)
+        processed_items = [rename_record(item, key_mapping, rename_stats) for item in items]
         
         result = {
             "success": True,
@@ -484,17 +365,68 @@ def rename_keys(items: List[Dict[str, Any]], key_mapping: Dict[str, str]) -> str
             "items": processed_items
         }
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Key renaming failed: {str(e)}",
             "original_count": len(items) if items else 0
-        }, indent=2)
+        })
+
+@tool("transform_pipeline", args_schema=TransformPipelineInput)
+def transform_pipeline(items: List[Dict[str, Any]], steps: List[Dict[str, Any]]) -> str:
+    """
+    Run several transformation steps over the same items in one call.
+    
+    Steps run in order, in-process, over a single item stream; only the final
+    result is returned. Use this instead of chaining edit_fields, filter_items,
+    sort_items and rename_keys calls one after another.
+    
+    Step format: {"tool": "<tool name>", ...same arguments as that tool, minus items}
+    
+    Example:
+    [
+      {"tool": "filter_items", "condition": "status == active"},
+      {"tool": "edit_fields", "operations": [{"action": "remove", "field": "password"}]},
+      {"tool": "sort_items", "sort_fields": [{"field": "created", "order": "desc"}], "limit": 10},
+      {"tool": "rename_keys", "key_mapping": {"created": "created_at"}}
+    ]
+    
+    Returns JSON with the final items plus per-step counts and timings.
+    """
+    start = time.perf_counter()
+    try:
+        try:
+            final_items, step_reports = run_pipeline(items, steps)
+        except ValueError as e:
+            return to_json({
+                "success": False,
+                "error": f"Invalid pipeline: {str(e)}",
+                "available_tools": list(PIPELINE_STEPS),
+                "original_count": len(items) if items else 0
+            })
+        
+        result = {
+            "success": True,
+            "original_count": len(items),
+            "final_count": len(final_items),
+            "steps": step_reports,
+            "total_duration_seconds": round(time.perf_counter() - start, 6),
+            "items": final_items
+        }
+        
+        return to_json(result)
+        
+    except Exception as e:
+        return to_json({
+            "success": False,
+            "error": f"Pipeline failed: {str(e)}",
+            "original_count": len(items) if items else 0
+        })
 
 # --- Tool Aggregator ---
 
 def get_transform_tools():
     """Returns a list of all data transformation tools."""
-    return [edit_fields, filter_items, date_time, sort_items, rename_keys]
\ No newline at end of file
+    return [edit_fields, filter_items, date_time, sort_items, rename_keys, transform_pipeline]
\ No newline at end of file
@@ -0,0 +1,673 @@
+"""
+Transformation helpers used by the data transformation tools.
+
+These are non-tool helper functions that an agent's own Python code can import
+and use directly. They are NOT exposed to the LLM as tools.
+
+Condition expressions
+---------------------
+compile_condition() turns a filter condition string into a reusable
+predicate. Compiled conditions are cached, so repeated filters with the same
+condition skip parsing entirely.
+
+Grammar (keywords are case-insensitive):
+
+    expr       := or_expr
+    or_expr    := and_expr ('or' and_expr)*
+    and_expr   := not_expr ('and' not_expr)*
+    not_expr   := 'not' not_expr | '(' expr ')' | comparison
+    comparison := field operator value
+    operator   := == | != | > | < | >= | <= | contains | startswith | endswith | in | not in
+    value      := "quoted" | 'quoted' | [v1, v2, ...] | bare words
+
+Fields may be dotted paths into nested dicts/lists (customer.address.city,
+tags.0). Bare values are typed like the original single-clause filter: true/false
+become booleans, digits become numbers, anything else is a string.
+
+Sorting
+-------
+sort_records() sorts on several fields with one composite key per item,
+computed once, and uses a heap when only the first N items are wanted.
+
+Pipelines
+---------
+run_pipeline() chains edit/filter/sort/rename steps over one in-process item
+stream, so multi-step transformations do not serialise the data between steps.
+"""
+import heapq
+import math
+import re
+import time
+from functools import lru_cache, reduce
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Returned by get_path when a field is absent
+MISSING = object()
+
+COMPARISON_OPERATORS = ("==", "!=", ">", "<", ">=", "<=", "contains", "startswith", "endswith", "in", "not in")
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op>==|!=|>=|<=|>|<)
+      | (?P<punct>[()\[\],])
+      | (?P<word>(?:[^\s()\[\],"'<>=!]|!(?!=))+)
+    )''', re.VERBOSE)
+
+# After an operator, an unquoted operand runs to the next 'and'/'or' or ')'
+_BARE_VALUE_RE = re.compile(r'''
+    \s*(?P<value>(?:(?!\s+(?:and|or)(?:\s|$))[^)])+)
+    ''', re.VERBOSE | re.IGNORECASE)
+
+_KEYWORD_OPERATORS = ("contains", "startswith", "endswith", "in")
+
+# Operators whose operand is a single value rather than a list
+_VALUE_OPERATORS = ("contains", "startswith", "endswith")
+
+
+def get_path(item: Any, path: str) -> Any:
+    """
+    Resolve a dotted field path against nested dicts and lists.
+
+    A literal key containing dots takes precedence over path traversal.
+    Returns MISSING if any step is absent.
+    """
+    if isinstance(item, dict) and path in item:
+        return item[path]
+    current = item
+    for part in path.split("."):
+        if isinstance(current, dict):
+            if part not in current:
+                return MISSING
+            current = current[part]
+        elif isinstance(current, (list, tuple)) and part.lstrip("-").isdigit():
+            index = int(part)
+            if not -len(current) <= index < len(current):
+                return MISSING
+            current = current[index]
+        else:
+            return MISSING
+    return current
+
+
+def convert_value(value: str) -> Any:
+    """Type a bare condition value the way filter_items always has."""
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    if value.isdigit():
+        return int(value)
+    if value.replace(".", "").replace("-", "").isdigit():
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _unquote(token: str) -> str:
+    body = token[1:-1]
+    return re.sub(r"\\(.)", r"\1", body)
+
+
+def _tokenize(condition: str) -> List[Tuple[str, str]]:
+    """
+    Split a condition into tokens.
+
+    An unquoted operand after a comparison operator is taken verbatim up to
+    the next 'and'/'or' or ')', so values such as O'Brien or a=b need no quotes.
+    """
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    text = condition.strip()
+    # Words since the last boolean keyword or punctuation; an operator word follows the field
+    clause_words = 0
+    while pos < len(text):
+        previous = tokens[-1] if tokens else None
+        operand_next = previous is not None and (
+            previous[0] == "op"
+            or (previous[0] == "word" and previous[1].lower() in _VALUE_OPERATORS and clause_words == 2)
+        )
+        if operand_next and text[pos:].lstrip()[:1] not in ("'", '"'):
+            match = _BARE_VALUE_RE.match(text, pos)
+            if match:
+                pos = match.end()
+                tokens.append(("value", match.group("value").strip()))
+                clause_words = 0
+                continue
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unexpected character at position {pos}: {text[pos:pos + 10]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+        tokens.append((kind, token))
+        if kind == "word" and token.lower() not in ("and", "or", "not"):
+            clause_words += 1
+        else:
+            clause_words = 0
+    return tokens
+
+
+class Comparison:
+    """A single `field operator value` clause."""
+
+    def __init__(self, field: str, operator: str, value: Any):
+        self.field = field
+        self.operator = operator
+        self.value = value
+
+    def describe(self) -> Dict[str, Any]:
+        return {"field": self.field, "operator": self.operator, "value": self.value}
+
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def peek_keyword(self, *words: str) -> bool:
+        token = self.peek()
+        return token is not None and token[0] == "word" and token[1].lower() in words
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise ValueError("Unexpected end of condition")
+        self.pos += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        token = self.take()
+        if token[1] != value:
+            raise ValueError(f"Expected '{value}' but found '{token[1]}'")
+
+    def parse(self) -> Any:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected token '{self.peek()[1]}'")
+        return node
+
+    def parse_or(self) -> Any:
+        nodes = [self.parse_and()]
+        while self.peek_keyword("or"):
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and(self) -> Any:
+        nodes = [self.parse_not()]
+        while self.peek_keyword("and"):
+            self.take()
+            nodes.append(self.parse_not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_not(self) -> Any:
+        if self.peek_keyword("not"):
+            self.take()
+            return ("not", self.parse_not())
+        token = self.peek()
+        if token is not None and token == ("punct", "("):
+            self.take()
+            node = self.parse_or()
+            self.expect(")")
+            return node
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> Comparison:
+        kind, field = self.take()
+        if kind != "word":
+            raise ValueError(f"Expected a field name but found '{field}'")
+        kind, operator = self.take()
+        operator = operator.lower()
+        if kind == "word" and operator == "not" and self.peek_keyword("in"):
+            self.take()
+            operator = "not in"
+        elif not (kind == "op" or (kind == "word" and operator in _KEYWORD_OPERATORS)):
+            raise ValueError(f"Unknown operator '{operator}'. Available: {', '.join(COMPARISON_OPERATORS)}")
+        if operator in ("in", "not in"):
+            value = self.parse_list()
+        else:
+            value = self.parse_value()
+        return Comparison(field, operator, value)
+
+    def parse_list(self) -> List[Any]:
+        if self.peek() != ("punct", "["):
+            # Allow a single bare value: 'status in active'
+            return [self.parse_value()]
+        self.take()
+        values: List[Any] = []
+        while self.peek() != ("punct", "]"):
+            kind, token = self.take()
+            if kind == "string":
+                values.append(_unquote(token))
+            elif kind == "word":
+                # An unquoted item runs to the next ',' or ']': [New York, Boston]
+                words = [token]
+                while self.peek() is not None and self.peek()[0] == "word":
+                    words.append(self.take()[1])
+                values.append(convert_value(" ".join(words)))
+            else:
+                raise ValueError(f"Unexpected '{token}' in list")
+            if self.peek() == ("punct", ","):
+                self.take()
+        self.expect("]")
+        return values
+
+    def parse_value(self) -> Any:
+        token = self.peek()
+        if token is None:
+            raise ValueError("Missing value in condition")
+        if token[0] == "string":
+            self.take()
+            return _unquote(token[1])
+        if token[0] == "value":
+            self.take()
+            return convert_value(token[1])
+        # Bare value: consume words until a boolean keyword or closing paren
+        words: List[str] = []
+        while True:
+            token = self.peek()
+            if token is None or token[0] != "word" or self.peek_keyword("and", "or"):
+                break
+            words.append(self.take()[1])
+        if not words:
+            raise ValueError("Missing value in condition")
+        return convert_value(" ".join(words))
+
+
+def _compile_comparison(node: Comparison) -> Callable[[Any], bool]:
+    field, operator, value = node.field, node.operator, node.value
+
+    if operator in (">", "<", ">=", "<="):
+        try:
+            threshold = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Operator '{operator}' requires a numeric value, got {value!r}")
+        compare = {
+            ">": lambda x: x > threshold,
+            "<": lambda x: x < threshold,
+            ">=": lambda x: x >= threshold,
+            "<=": lambda x: x <= threshold,
+        }[operator]
+
+        def numeric(item: Any) -> bool:
+            actual = get_path(item, field)
+            if actual is MISSING:
+                return False
+            try:
+                return compare(float(actual))
+            except (TypeError, ValueError):
+                return False
+        return numeric
+
+    if operator in ("==", "!="):
+        equal = operator == "=="
+
+        def equality(item: Any) -> bool:
+            actual = get_path(item, field)
+            if actual is MISSING:
+                return False
+            return (actual == value) is equal
+        return equality
+
+    if operator in ("in", "not in"):
+        inside = operator == "in"
+        try:
+            members: Any = frozenset(value)
+        except TypeError:
+            members = list(value)
+
+        def membership(item: Any) -> bool:
+            actual = get_path(item, field)
+            if actual is MISSING:
+                return False
+            try:
+                return (actual in members) is inside
+            except TypeError:
+                return False
+        return membership
+
+    needle = str(value).lower()
+    if operator == "contains":
+        test = lambda text: needle in text
+    elif operator == "startswith":
+        test = lambda text: text.startswith(needle)
+    else:
+        test = lambda text: text.endswith(needle)
+
+    def text_match(item: Any) -> bool:
+        actual = get_path(item, field)
+        if actual is MISSING:
+            return False
+        return test(str(actual).lower())
+    return text_match
+
+
+def _compile_node(node: Any) -> Callable[[Any], bool]:
+    if isinstance(node, Comparison):
+        return _compile_comparison(node)
+    kind, children = node
+    if kind == "not":
+        inner = _compile_node(children)
+        return lambda item: not inner(item)
+    compiled = [_compile_node(child) for child in children]
+    combine = _both if kind == "and" else _either
+    return reduce(combine, compiled)
+
+
+def _both(left: Callable[[Any], bool], right: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    return lambda item: left(item) and right(item)
+
+
+def _either(left: Callable[[Any], bool], right: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    return lambda item: left(item) or right(item)
+
+
+class CompiledCondition:
+    """A parsed filter condition, callable on an item."""
+
+    def __init__(self, condition: str, tree: Any):
+        self.condition = condition
+        self.tree = tree
+        self._predicate = _compile_node(tree)
+
+    def __call__(self, item: Any) -> bool:
+        return self._predicate(item)
+
+    @property
+    def comparisons(self) -> List[Comparison]:
+        """All comparison clauses, in source order."""
+        found: List[Comparison] = []
+
+        def walk(node: Any) -> None:
+            if isinstance(node, Comparison):
+                found.append(node)
+            elif node[0] == "not":
+                walk(node[1])
+            else:
+                for child in node[1]:
+                    walk(child)
+        walk(self.tree)
+        return found
+
+    def filter(self, items: Sequence[Any], limit: Optional[int] = None) -> List[Any]:
+        """Return matching items in one pass, stopping once `limit` matches are found."""
+        predicate = self._predicate
+        if not limit or limit <= 0:
+            return [item for item in items if predicate(item)]
+        matched: List[Any] = []
+        for item in items:
+            if predicate(item):
+                matched.append(item)
+                if len(matched) >= limit:
+                    break
+        return matched
+
+
+@lru_cache(maxsize=256)
+def compile_condition(condition: str) -> CompiledCondition:
+    """
+    Parse and compile a filter condition (cached by condition string).
+
+    Raises:
+        ValueError: If the condition is malformed.
+    """
+    tokens = _tokenize(condition)
+    if not tokens:
+        raise ValueError("Condition is empty")
+    return CompiledCondition(condition, _Parser(tokens).parse())
+
+
+# --- Sorting ---
+
+class _Descending:
+    """Wraps a value so that it sorts in reverse order inside an ascending key."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+
+# Type groups, so numbers, strings and other values never compare directly
+_RANK_NUMBER, _RANK_STRING, _RANK_OTHER, _RANK_MISSING = 0, 1, 2, 3
+
+
+def _sort_component(value: Any, descending: bool) -> Tuple[int, Any]:
+    """Key component for one field: numeric strings sort as numbers, text case-insensitively, missing last."""
+    if value is MISSING or value is None:
+        return (_RANK_MISSING, 0)
+    if isinstance(value, str):
+        try:
+            number = float(value) if value.strip() else None
+        except ValueError:
+            number = None
+        if number is None or math.isnan(number):
+            text = value.casefold()
+            return (-_RANK_STRING, _Descending(text)) if descending else (_RANK_STRING, text)
+        value = number
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and math.isnan(value):
+            return (_RANK_MISSING, 0)
+        return (-_RANK_NUMBER, -value) if descending else (_RANK_NUMBER, value)
+    text = str(value)
+    return (-_RANK_OTHER, _Descending(text)) if descending else (_RANK_OTHER, text)
+
+
+def build_sort_key(sort_fields: Sequence[Dict[str, Any]]) -> Callable[[Any], Tuple]:
+    """
+    Build a function returning one composite key tuple per item.
+
+    sort_fields: [{"field": "name", "order": "asc|desc"}], highest priority first.
+    """
+    spec = [(str(f.get("field", "")), str(f.get("order", "asc")).lower() == "desc") for f in sort_fields]
+
+    def key(item: Any) -> Tuple:
+        return tuple(_sort_component(get_path(item, field), descending) for field, descending in spec)
+    return key
+
+
+def sort_records(items: Sequence[Any], sort_fields: Sequence[Dict[str, Any]],
+                 limit: Optional[int] = None) -> List[Any]:
+    """
+    Sort items on several fields in a single stable pass.
+
+    With a positive `limit`, only the first `limit` items are selected using a
+    heap (O(n log k)) instead of sorting the whole list.
+    """
+    key = build_sort_key(sort_fields)
+    if limit is not None and 0 < limit < len(items):
+        return heapq.nsmallest(limit, items, key=key)
+    return sorted(items, key=key)
+
+
+# --- Record operations ---
+
+def edit_record(item: Dict[str, Any], operations: Sequence[Dict[str, Any]],
+                counts: Dict[str, int]) -> Dict[str, Any]:
+    """Apply add/remove/rename field operations to a copy of one item, updating `counts`."""
+    processed_item = item.copy()
+    for op in operations:
+        action = op.get("action", "").lower()
+        field = op.get("field", "")
+
+        if action == "add":
+            processed_item[field] = op.get("value", "")
+            counts["add"] += 1
+
+        elif action == "remove":
+            if field in processed_item:
+                del processed_item[field]
+                counts["remove"] += 1
+
+        elif action == "rename":
+            new_name = op.get("new_name", "")
+            if field in processed_item and new_name:
+                processed_item[new_name] = processed_item.pop(field)
+                counts["rename"] += 1
+    return processed_item
+
+
+def rename_record(item: Dict[str, Any], key_mapping: Dict[str, str],
+                  stats: Dict[str, int]) -> Dict[str, Any]:
+    """Return a copy of one item with keys renamed via `key_mapping`, updating `stats`."""
+    processed_item = {}
+    item_renames = 0
+    for key, value in item.items():
+        if key in key_mapping:
+            processed_item[key_mapping[key]] = value
+            item_renames += 1
+        else:
+            processed_item[key] = value
+    if item_renames:
+        stats["total_renames"] += item_renames
+        stats["items_affected"] += 1
+    return processed_item
+
+
+# --- Pipelines ---
+
+PIPELINE_STEPS = ("edit_fields", "filter_items", "sort_items", "rename_keys")
+
+
+class _StepMeter:
+    """Counts items through one pipeline step and the time spent inside it."""
+
+    def __init__(self, index: int, name: str):
+        self.index = index
+        self.name = name
+        self.input_count = 0
+        self.output_count = 0
+        self.seconds = 0.0
+        self.details: Dict[str, Any] = {}
+
+    def feed(self, upstream: Iterable[Any]) -> Iterator[Any]:
+        """Wrap the step's input, excluding upstream time from this step's timing."""
+        iterator = iter(upstream)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds -= time.perf_counter() - start
+                return
+            self.seconds -= time.perf_counter() - start
+            self.input_count += 1
+            yield item
+
+    def drain(self, produced: Iterable[Any]) -> Iterator[Any]:
+        """Wrap the step's output, charging each pull to this step."""
+        iterator = iter(produced)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds += time.perf_counter() - start
+                return
+            self.seconds += time.perf_counter() - start
+            self.output_count += 1
+            yield item
+
+    def report(self) -> Dict[str, Any]:
+        report = {
+            "step": self.index,
+            "tool": self.name,
+            "input_count": self.input_count,
+            "output_count": self.output_count,
+            "duration_seconds": round(max(self.seconds, 0.0), 6)
+        }
+        report.update(self.details)
+        return report
+
+
+def _build_step(step: Dict[str, Any], meter: _StepMeter) -> Callable[[Iterator[Any]], Iterable[Any]]:
+    """Validate one step spec and return a function transforming an item stream."""
+    name = meter.name
+
+    if name == "edit_fields":
+        operations = step.get("operations")
+        if not isinstance(operations, list):
+            raise ValueError("edit_fields step requires 'operations' (list)")
+        counts = meter.details.setdefault("operations_applied", {"add": 0, "remove": 0, "rename": 0})
+        return lambda stream: (edit_record(item, operations, counts) for item in stream)
+
+    if name == "rename_keys":
+        key_mapping = step.get("key_mapping")
+        if not isinstance(key_mapping, dict):
+            raise ValueError("rename_keys step requires 'key_mapping' (object)")
+        stats = meter.details.setdefault("rename_statistics", {"total_renames": 0, "items_affected": 0})
+        return lambda stream: (rename_record(item, key_mapping, stats) for item in stream)
+
+    if name == "filter_items":
+        condition = step.get("condition")
+        if not condition:
+            raise ValueError("filter_items step requires 'condition'")
+        predicate = compile_condition(condition)
+        limit = step.get("limit")
+        if limit is not None and limit > 0:
+            return lambda stream: islice(filter(predicate, stream), limit)
+        return lambda stream: filter(predicate, stream)
+
+    if name == "sort_items":
+        sort_fields = step.get("sort_fields")
+        if not sort_fields:
+            raise ValueError("sort_items step requires 'sort_fields'")
+        limit = step.get("limit")
+        key = build_sort_key(sort_fields)
+
+        # A generator, so the sort runs (and is timed) when the next step first pulls
+        def sort_stage(stream: Iterator[Any]) -> Iterator[Any]:
+            if limit is not None and limit > 0:
+                yield from heapq.nsmallest(limit, stream, key=key)
+            else:
+                yield from sorted(stream, key=key)
+        return sort_stage
+
+    raise ValueError(f"Unknown pipeline tool '{name}'. Available: {', '.join(PIPELINE_STEPS)}")
+
+
+def run_pipeline(items: Iterable[Any], steps: Sequence[Dict[str, Any]]) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """
+    Run transformation steps over one item stream.
+
+    Each step is {"tool": <name>, ...the tool's own arguments...}. Streaming
+    steps (edit_fields, filter_items, rename_keys) are chained as generators;
+    sort_items collects its input before emitting.
+
+    Returns:
+        Tuple of (final items, per-step reports with counts and timings)
+
+    Raises:
+        ValueError: If a step is malformed. Raised before any item is processed,
+            with the failing step index in the message.
+    """
+    meters: List[_StepMeter] = []
+    stages: List[Callable[[Iterator[Any]], Iterable[Any]]] = []
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict):
+            raise ValueError(f"Step {index}: expected an object with a 'tool' key")
+        meter = _StepMeter(index, str(step.get("tool", "")))
+        try:
+            stages.append(_build_step(step, meter))
+        except ValueError as e:
+            raise ValueError(f"Step {index} ({meter.name}): {e}")
+        meters.append(meter)
+
+    stream: Iterable[Any] = items
+    for meter, stage in zip(meters, stages):
+        stream = meter.drain(stage(meter.feed(stream)))
+    result = list(stream)
+    return result, [meter.report() for meter in meters]
@@ -0,0 +1,402 @@
+"""
+HTTP response cache for the network tools.
+
+Agents fetch the same API endpoints and pages repeatedly, within one run and
+across runs. This cache stores GET responses in a local SQLite database and
+follows standard HTTP caching rules:
+
+- Fresh responses (Cache-Control max-age, Expires, or the Last-Modified
+  heuristic) are served without touching the network.
+- Stale responses with an ETag or Last-Modified are revalidated with
+  If-None-Match / If-Modified-Since; a 304 reuses the stored body.
+- Cache-Control no-store and private responses, and responses that set
+  cookies, are never stored; no-cache is always revalidated.
+
+Requests that carry credentials (Authorization, Cookie, API keys or other
+token-like headers, user:password in the URL, or query parameters such as
+api_key, access_token or sig) bypass the cache entirely, so authenticated bodies are
+never written to disk or served to another caller. All other request headers
+are part of the cache key. Total body size is kept under a byte budget with
+least-recently-used eviction.
+
+These are non-tool helpers. Configure with BRAID_HTTP_CACHE_MB (default 64,
+0 disables) and BRAID_HTTP_CACHE_PATH
+(default ~/.cache/braid/http_cache.sqlite3).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from requests.models import PreparedRequest
+
+from .utils import response_info
+
+# Freshness given to responses that only have Last-Modified is capped at this
+HEURISTIC_MAX_AGE = 24 * 3600
+
+# Request headers that carry credentials; requests with any of them are not cached
+CREDENTIAL_HEADERS = {"authorization", "proxy-authorization", "cookie"}
+CREDENTIAL_MARKERS = ("auth", "token", "key", "secret", "session", "signature", "password", "credential")
+# Short query parameter names used by signed URLs and the like
+CREDENTIAL_PARAMS = {"sig", "jwt", "pwd", "pass"}
+
+# Request headers that control caching rather than select a response
+_UNKEYED_HEADERS = {"cache-control", "pragma", "if-none-match", "if-modified-since"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    reason TEXT,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    encoding TEXT,
+    vary TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    must_revalidate INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+def _lower_keys(headers: Dict[str, str]) -> Dict[str, str]:
+    return {k.lower(): v for k, v in headers.items()}
+
+
+def has_credentials(headers: Dict[str, str]) -> bool:
+    """True if any request header looks like it carries a credential."""
+    for name in headers:
+        lower = name.lower()
+        if lower in CREDENTIAL_HEADERS or any(marker in lower for marker in CREDENTIAL_MARKERS):
+            return True
+    return False
+
+
+def url_has_credentials(url: str, params: Optional[Dict[str, Any]] = None) -> bool:
+    """True if the URL has user:password, or a query parameter (in the URL or `params`) looks like a credential."""
+    parts = urlsplit(url)
+    if parts.username or parts.password:
+        return True
+    names = [name for name, _ in parse_qsl(parts.query, keep_blank_values=True)] + list(params or {})
+    for name in names:
+        lower = str(name).lower()
+        if lower in CREDENTIAL_PARAMS or any(marker in lower for marker in CREDENTIAL_MARKERS):
+            return True
+    return False
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into {directive: argument or None}."""
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _int_directive(directives: Dict[str, Optional[str]], name: str) -> Optional[int]:
+    value = directives.get(name)
+    return int(value) if value is not None and value.isdigit() else None
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float) -> float:
+    """Seconds a response stays fresh, from max-age, Expires or the Last-Modified heuristic."""
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    age = int(headers["age"]) if headers.get("age", "").isdigit() else 0
+    max_age = _int_directive(directives, "max-age")
+    if max_age is not None:
+        return max(max_age - age, 0)
+    date = _http_date(headers.get("date")) or now
+    expires = _http_date(headers.get("expires"))
+    if "expires" in headers:
+        return max((expires or 0) - date, 0)
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None and last_modified < date:
+        return min((date - last_modified) / 10, HEURISTIC_MAX_AGE)
+    return 0
+
+
+class HttpCache:
+    """Thread-safe SQLite-backed HTTP cache with a byte budget and LRU eviction."""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_served = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database on first use. Caller holds the lock."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def cache_key(method: str, url: str, params: Optional[Dict[str, Any]],
+                  headers: Dict[str, str]) -> Tuple[str, str]:
+        """Return (key, full url) for a request; every request header is hashed into the key."""
+        prepared = PreparedRequest()
+        prepared.prepare_url(url, params or {})
+        keyed = sorted((k, v) for k, v in _lower_keys(headers).items() if k not in _UNKEYED_HEADERS)
+        digest = hashlib.sha256(
+            f"{method.upper()} {prepared.url}\n{json.dumps(keyed)}".encode("utf-8")
+        ).hexdigest()
+        return digest, prepared.url
+
+    def lookup(self, key: str, request_headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for `key` if its Vary headers match the request."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT url, status_code, reason, headers, body, encoding, vary, expires_at, must_revalidate "
+                "FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        request = _lower_keys(request_headers)
+        vary = json.loads(row[6])
+        if any(request.get(name) != value for name, value in vary.items()):
+            return None
+        return {
+            "key": key,
+            "url": row[0],
+            "status_code": row[1],
+            "reason": row[2],
+            "headers": json.loads(row[3]),
+            "content": row[4],
+            "encoding": row[5],
+            "expires_at": row[7],
+            "must_revalidate": bool(row[8])
+        }
+
+    def is_fresh(self, entry: Dict[str, Any], request_headers: Dict[str, str], now: float) -> bool:
+        """True if the entry can be served without revalidation."""
+        directives = parse_cache_control(_lower_keys(request_headers).get("cache-control", ""))
+        if "no-cache" in directives or _int_directive(directives, "max-age") == 0:
+            return False
+        return not entry["must_revalidate"] and now < entry["expires_at"]
+
+    @staticmethod
+    def validators(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating an entry."""
+        headers = _lower_keys(entry["headers"])
+        conditional = {}
+        if "etag" in headers:
+            conditional["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            conditional["If-Modified-Since"] = headers["last-modified"]
+        return conditional
+
+    def store(self, key: str, info: Dict[str, Any], request_headers: Dict[str, str], now: float) -> bool:
+        """Store a 200 response if its headers allow it; returns True if stored."""
+        if info["status_code"] != 200:
+            return False
+        headers = _lower_keys(info["headers"])
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        if ("no-store" in directives or "private" in directives or "set-cookie" in headers
+                or headers.get("vary", "").strip() == "*" or has_credentials(request_headers)
+                or url_has_credentials(info["url"])):
+            return False
+        lifetime = freshness_lifetime(headers, now)
+        must_revalidate = "no-cache" in directives
+        if lifetime <= 0 and not self.validators(info):
+            return False
+        body = info["content"]
+        size = len(body) + len(json.dumps(info["headers"]))
+        if size > self.max_bytes:
+            return False
+        request = _lower_keys(request_headers)
+        vary = {name.strip().lower(): request.get(name.strip().lower())
+                for name in headers.get("vary", "").split(",") if name.strip()}
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, info["url"], info["status_code"], info["reason"], json.dumps(info["headers"]),
+                 body, info["encoding"], json.dumps(vary), now, now + lifetime,
+                 int(must_revalidate), size, now)
+            )
+            self.stores += 1
+            self._evict(db)
+            db.commit()
+        return True
+
+    def refresh(self, entry: Dict[str, Any], not_modified_headers: Dict[str, str], now: float) -> Dict[str, Any]:
+        """Apply a 304 response: merge its headers into the entry and restart its lifetime."""
+        headers = dict(entry["headers"])
+        existing = {k.lower(): k for k in headers}
+        for name, value in not_modified_headers.items():
+            headers[existing.get(name.lower(), name)] = value
+        lower = _lower_keys(headers)
+        expires_at = now + freshness_lifetime(lower, now)
+        must_revalidate = "no-cache" in parse_cache_control(lower.get("cache-control", ""))
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE responses SET headers = ?, stored_at = ?, expires_at = ?, must_revalidate = ?, "
+                "last_access = ? WHERE key = ?",
+                (json.dumps(headers), now, expires_at, int(must_revalidate), now, entry["key"])
+            )
+            db.commit()
+        return dict(entry, headers=headers, expires_at=expires_at, must_revalidate=must_revalidate)
+
+    def touch(self, key: str, now: float) -> None:
+        """Mark an entry as recently used."""
+        with self._lock:
+            db = self._db()
+            db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            db.commit()
+
+    def record(self, outcome: str, served_bytes: int = 0) -> None:
+        """Count a lookup outcome: 'hit', 'revalidated' or 'miss'."""
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidated += 1
+            else:
+                self.misses += 1
+            self.bytes_served += served_bytes
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM responses")
+            db.commit()
+            self.hits = self.revalidated = self.misses = self.stores = self.evictions = 0
+            self.bytes_served = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/revalidation/miss counters and current disk use."""
+        with self._lock:
+            entries, size = (0, 0)
+            if self._conn is not None:
+                entries, size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "bytes_served": self.bytes_served,
+                "hit_ratio": (self.hits + self.revalidated) / lookups if lookups else 0.0
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def cached_get(session: Any, cache: HttpCache, url: str, headers: Dict[str, str],
+               params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Tuple[Dict[str, Any], str]:
+    """
+    Perform a GET through `cache`.
+
+    Returns:
+        Tuple of (response_info()-style dict, cache status: 'hit', 'revalidated', 'miss' or 'bypass')
+    """
+    lower = _lower_keys(headers)
+    directives = parse_cache_control(lower.get("cache-control", ""))
+    if (not cache.enabled or "no-store" in directives or has_credentials(headers)
+            or url_has_credentials(url, params) or "if-none-match" in lower or "if-modified-since" in lower):
+        return response_info(session.get(url, headers=headers, params=params, **kwargs)), "bypass"
+
+    key, full_url = cache.cache_key("GET", url, params, headers)
+    now = time.time()
+    entry = cache.lookup(key, headers)
+    if entry is not None and cache.is_fresh(entry, headers, now):
+        cache.touch(key, now)
+        cache.record("hit", len(entry["content"]))
+        return _entry_info(entry), "hit"
+
+    request_headers = dict(headers)
+    if entry is not None:
+        request_headers.update(cache.validators(entry))
+    response = session.get(full_url, headers=request_headers, **kwargs)
+    now = time.time()
+    if entry is not None and response.status_code == 304:
+        entry = cache.refresh(entry, dict(response.headers), now)
+        cache.record("revalidated", len(entry["content"]))
+        info = _entry_info(entry)
+        info["elapsed_seconds"] = response.elapsed.total_seconds()
+        return info, "revalidated"
+
+    info = response_info(response)
+    cache.record("miss")
+    cache.store(key, info, headers, now)
+    return info, "miss"
+
+
+def _entry_info(entry: Dict[str, Any]) -> Dict[str, Any]:
+    encoding = entry["encoding"] or "utf-8"
+    return {
+        "status_code": entry["status_code"],
+        "reason": entry["reason"],
+        "url": entry["url"],
+        "headers": entry["headers"],
+        "content": entry["content"],
+        "text": entry["content"].decode(encoding, errors="replace"),
+        "encoding": entry["encoding"],
+        "elapsed_seconds": 0.0
+    }
+
+
+# Global instance shared by the HTTP tools
+http_cache = HttpCache(
+    Path(os.getenv("BRAID_HTTP_CACHE_PATH", Path.home() / ".cache" / "braid" / "http_cache.sqlite3")),
+    int(float(os.getenv("BRAID_HTTP_CACHE_MB", "64")) * 1024 * 1024)
+)
@@ -0,0 +1,289 @@
+"""
+Streaming HTML extraction for web_scrape.
+
+These are non-tool helper functions that an agent's own Python code can import
+and use directly. They are NOT exposed to the LLM as tools.
+
+The response body is read in chunks up to a byte budget and fed to an
+incremental, event-based parser. No document tree is built: CSS selectors are
+matched against the stack of currently open elements, and only the text of
+matching elements (and links, title and description) is kept.
+
+lxml's HTML parser is used when installed (pip install ".[retrieval]"), as it
+repairs malformed markup the same way browsers do; otherwise the standard
+library html.parser is used.
+
+Supported selectors: tag, #id, .class, [attr], [attr=value], [attr~=value],
+[attr^=value], [attr$=value], [attr*=value], descendant (space) and child (>)
+combinators, and comma-separated groups.
+"""
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Default byte budget for streaming reads
+DEFAULT_STREAM_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+})
+_SKIP_TEXT_TAGS = frozenset({"script", "style"})
+
+_COMPOUND_RE = re.compile(
+    r"""(?P<tag>\*|[a-zA-Z][\w-]*)
+      | \#(?P<id>[\w-]+)
+      | \.(?P<cls>[\w-]+)
+      | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~^$*]?=)\s*(?P<value>"[^"]*"|'[^']*'|[^\]\s]+)\s*)?\]""",
+    re.VERBOSE
+)
+
+Node = Tuple[str, Dict[str, str]]
+
+
+class _Compound:
+    """One compound selector such as div.card[data-id] (no combinators)."""
+
+    def __init__(self, text: str):
+        self.tag: Optional[str] = None
+        self.conditions: List[Tuple[str, Optional[str], Optional[str]]] = []
+        pos = 0
+        while pos < len(text):
+            match = _COMPOUND_RE.match(text, pos)
+            if match is None or match.end() == pos:
+                raise ValueError(f"Unsupported selector syntax for streaming mode: {text!r} (use stream=False)")
+            if match.group("tag"):
+                self.tag = None if match.group("tag") == "*" else match.group("tag").lower()
+            elif match.group("id"):
+                self.conditions.append(("id", "=", match.group("id")))
+            elif match.group("cls"):
+                self.conditions.append(("class", "~=", match.group("cls")))
+            else:
+                value = match.group("value")
+                if value and value[0] in "\"'":
+                    value = value[1:-1]
+                self.conditions.append((match.group("attr").lower(), match.group("op"), value))
+            pos = match.end()
+
+    def matches(self, node: Node) -> bool:
+        tag, attrs = node
+        if self.tag is not None and tag != self.tag:
+            return False
+        for name, op, expected in self.conditions:
+            actual = attrs.get(name)
+            if actual is None:
+                return False
+            if op is None:
+                continue
+            if op == "=" and actual != expected:
+                return False
+            if op == "~=" and expected not in actual.split():
+                return False
+            if op == "^=" and not actual.startswith(expected):
+                return False
+            if op == "$=" and not actual.endswith(expected):
+                return False
+            if op == "*=" and expected not in actual:
+                return False
+        return True
+
+
+class Selector:
+    """A comma-separated group of selectors matched against an open-element stack."""
+
+    def __init__(self, css: str):
+        self.chains: List[List[Tuple[str, _Compound]]] = []
+        for group in css.split(","):
+            tokens = re.sub(r"\s*>\s*", " > ", group.strip()).split()
+            if not tokens:
+                raise ValueError(f"Empty selector in {css!r}")
+            chain: List[Tuple[str, _Compound]] = []
+            combinator = " "
+            for token in tokens:
+                if token == ">":
+                    combinator = ">"
+                    continue
+                chain.append((combinator, _Compound(token)))
+                combinator = " "
+            self.chains.append(chain)
+
+    def matches(self, stack: List[Node]) -> bool:
+        """True if the innermost element of `stack` matches any selector in the group."""
+        return any(self._match_at(chain, len(chain) - 1, stack, len(stack) - 1) for chain in self.chains)
+
+    def _match_at(self, chain: List[Tuple[str, _Compound]], step: int, stack: List[Node], pos: int) -> bool:
+        if pos < 0 or not chain[step][1].matches(stack[pos]):
+            return False
+        if step == 0:
+            return True
+        if chain[step][0] == ">":
+            return self._match_at(chain, step - 1, stack, pos - 1)
+        return any(self._match_at(chain, step - 1, stack, p) for p in range(pos - 1, -1, -1))
+
+
+class ScrapeHandler:
+    """
+    Parser target collecting page metadata plus selected text, full text and links.
+
+    Implements the lxml parser-target interface (start/end/data/close); the
+    html.parser driver below forwards its callbacks to the same methods.
+    """
+
+    def __init__(self, css_selector: Optional[str], extract_links: bool):
+        self.selector = Selector(css_selector) if css_selector else None
+        self.extract_links = extract_links
+        self.stack: List[Node] = []
+        self.title: Optional[str] = None
+        self.description: Optional[str] = None
+        self.selected: List[Optional[str]] = []
+        self.links: List[Dict[str, str]] = []
+        self.text: List[str] = []
+        self._captures: List[Tuple[int, int, List[str]]] = []
+        self._open_links: List[Tuple[int, str, List[str]]] = []
+        self._title: Optional[List[str]] = None
+        self._skip = 0
+
+    def start(self, tag: str, attrib: Any) -> None:
+        tag = tag.lower()
+        attrs = {k.lower(): v or "" for k, v in dict(attrib).items()}
+        self.stack.append((tag, attrs))
+        depth = len(self.stack)
+        if tag in _SKIP_TEXT_TAGS:
+            self._skip += 1
+        elif tag == "title" and self.title is None:
+            self._title = []
+        elif tag == "meta" and attrs.get("name", "").lower() == "description" and self.description is None:
+            self.description = attrs.get("content", "").strip()
+        if self.extract_links and tag == "a" and attrs.get("href"):
+            self._open_links.append((depth, attrs["href"], []))
+        if self.selector is not None and self.selector.matches(self.stack):
+            # Reserve the slot now so results keep document order when matches nest
+            self._captures.append((depth, len(self.selected), []))
+            self.selected.append(None)
+
+    def end(self, tag: str) -> None:
+        tag = tag.lower()
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                while len(self.stack) > index:
+                    self._close_innermost()
+                return
+
+    def _close_innermost(self) -> None:
+        depth = len(self.stack)
+        tag, _ = self.stack.pop()
+        if tag in _SKIP_TEXT_TAGS:
+            self._skip -= 1
+        elif tag == "title" and self._title is not None:
+            self.title = "".join(self._title).strip()
+            self._title = None
+        while self._captures and self._captures[-1][0] == depth:
+            _, slot, parts = self._captures.pop()
+            self.selected[slot] = "".join(parts).strip()
+        while self._open_links and self._open_links[-1][0] == depth:
+            _, href, parts = self._open_links.pop()
+            text = "".join(parts).strip()
+            if text:
+                self.links.append({"url": href, "text": text})
+
+    def data(self, text: str) -> None:
+        if self._skip:
+            return
+        if self._title is not None:
+            self._title.append(text)
+        for _, _, parts in self._captures:
+            parts.append(text)
+        for _, _, parts in self._open_links:
+            parts.append(text)
+        if self.selector is None:
+            self.text.append(text)
+
+    def close(self) -> "ScrapeHandler":
+        while self.stack:
+            self._close_innermost()
+        return self
+
+
+class _StdlibDriver(HTMLParser):
+    """Feeds html.parser events into a ScrapeHandler."""
+
+    def __init__(self, handler: ScrapeHandler, encoding: Optional[str]):
+        super().__init__(convert_charrefs=True)
+        self.handler = handler
+        self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handler.start(tag, dict(attrs))
+        if tag in VOID_TAGS:
+            self.handler.end(tag)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handler.start(tag, dict(attrs))
+        self.handler.end(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in VOID_TAGS:
+            self.handler.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self.handler.data(data)
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        self.feed(self._decoder.decode(chunk))
+
+    def finish(self) -> ScrapeHandler:
+        self.feed(self._decoder.decode(b"", final=True))
+        super().close()
+        return self.handler.close()
+
+
+def _charset(content_type: str) -> Optional[str]:
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type or "", re.IGNORECASE)
+    if match is None:
+        return None
+    try:
+        return codecs.lookup(match.group(1)).name
+    except LookupError:
+        return None
+
+
+def stream_scrape(chunks: Iterable[bytes], content_type: str, css_selector: Optional[str],
+                  extract_links: bool, max_bytes: int = DEFAULT_STREAM_BYTES
+                  ) -> Tuple[ScrapeHandler, int, bool, str]:
+    """
+    Parse HTML from a stream of byte chunks, stopping after `max_bytes`.
+
+    Returns:
+        Tuple of (finished ScrapeHandler, bytes read, whether the budget cut
+        the page short, parser name)
+    """
+    handler = ScrapeHandler(css_selector, extract_links)
+    encoding = _charset(content_type)
+    if etree is not None:
+        parser = etree.HTMLParser(target=handler, encoding=encoding)
+        feed, finish, name = parser.feed, parser.close, "lxml"
+    else:
+        driver = _StdlibDriver(handler, encoding)
+        feed, finish, name = driver.feed_bytes, driver.finish, "html.parser"
+
+    read = 0
+    truncated = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - read]
+            truncated = True
+        if chunk:
+            feed(chunk)
+            read += len(chunk)
+        if truncated:
+            break
+    return finish(), read, truncated, name
@@ -3,15 +3,16 @@ Web tools for HTTP requests, API integration, and web scraping.
 """
 import json
 import os
+import time
 from typing import Dict, List, Optional, Any
 
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from ...utilities.output import to_json
+
 try:
     import requests
-    from requests.adapters import HTTPAdapter
-    from urllib3.util.retry import Retry
 except ImportError:
     raise ImportError(
         "Web tools are not available. "
@@ -19,6 +20,10 @@ except ImportError:
         'pip install requests>=2.28.0'
     )
 
+from .cache import cached_get, http_cache
+from .streaming import DEFAULT_STREAM_BYTES, CHUNK_SIZE, stream_scrape
+from .utils import fetch_all, http_sessions, response_info, run_coroutine
+
 # --- Input Schemas ---
 
 class HttpRequestInput(BaseModel):
@@ -29,30 +34,39 @@ class HttpRequestInput(BaseModel):
     body: Optional[str] = Field(default=None, description="Request body content (for POST/PUT requests)")
     timeout: int = Field(default=30, description="Request timeout in seconds")
     follow_redirects: bool = Field(default=True, description="Whether to follow redirects")
+    use_cache: bool = Field(default=False, description="Serve GET requests from the local HTTP cache when the response allows it (Cache-Control/ETag/Last-Modified). Requests with credential headers are never cached")
 
 class WebScrapeInput(BaseModel):
     url: str = Field(description="The URL to scrape content from")
     css_selector: Optional[str] = Field(default=None, description="CSS selector to extract specific elements")
     extract_links: bool = Field(default=False, description="Whether to extract all links from the page")
     timeout: int = Field(default=30, description="Request timeout in seconds")
+    use_cache: bool = Field(default=False, description="Serve the page from the local HTTP cache when the response allows it (Cache-Control/ETag/Last-Modified)")
+    stream: bool = Field(default=False, description="Read the page in chunks and parse incrementally, keeping only selected elements and links. Lower memory for large pages; bypasses the cache")
+    max_bytes: Optional[int] = Field(default=None, description=f"Stop reading after this many bytes in stream mode (default {DEFAULT_STREAM_BYTES})")
 
-# --- Helper Functions ---
+class HttpBatchRequestInput(BaseModel):
+    urls: Optional[List[str]] = Field(default=None, description="URLs to request, all with the same method/headers")
+    request_specs: Optional[List[Dict[str, Any]]] = Field(default=None, description="Individual requests: [{url, method, headers, params, body}]. Fields not given use the shared values")
+    method: str = Field(default="GET", description="HTTP method for all requests: GET, POST, PUT, DELETE, PATCH")
+    headers: Optional[Dict[str, str]] = Field(default=None, description="HTTP headers for all requests")
+    concurrency: int = Field(default=10, description="Maximum requests in flight at once")
+    per_host_limit: int = Field(default=4, description="Maximum requests in flight to any single host")
+    retries: int = Field(default=2, description="Retries per request for connection errors, timeouts and 429/5xx responses")
+    timeout: int = Field(default=30, description="Per-request timeout in seconds")
+    follow_redirects: bool = Field(default=True, description="Whether to follow redirects")
+    max_content_chars: Optional[int] = Field(default=None, description="Truncate each text response body to this many characters")
 
-def _create_session_with_retries():
-    """Create a requests session with retry strategy."""
-    session = requests.Session()
-    
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-    )
-    
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    
-    return session
+class WebScrapeBatchInput(BaseModel):
+    urls: List[str] = Field(description="The URLs to scrape")
+    css_selector: Optional[str] = Field(default=None, description="CSS selector to extract specific elements")
+    extract_links: bool = Field(default=False, description="Whether to extract all links from each page")
+    concurrency: int = Field(default=10, description="Maximum pages fetched at once")
+    per_host_limit: int = Field(default=4, description="Maximum pages fetched at once from any single host")
+    retries: int = Field(default=2, description="Retries per page for connection errors, timeouts and 429/5xx responses")
+    timeout: int = Field(default=30, description="Per-page timeout in seconds")
+
+# --- Helper Functions ---
 
 def _safe_json_parse(text: str) -> Any:
     """Safely parse JSON, return original text if parsing fails."""
@@ -61,12 +75,150 @@ def _safe_json_parse(text: str) -> Any:
     except (json.JSONDecodeError, TypeError):
         return text
 
+def _response_result(method: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the http_request result for a response_info() dict."""
+    content = info["text"]
+    content_type = next((v for k, v in info["headers"].items() if k.lower() == 'content-type'), '').lower()
+    
+    # Try to parse JSON responses
+    parsed_content = content
+    if 'application/json' in content_type:
+        parsed_content = _safe_json_parse(content)
+    
+    result = {
+        "success": True,
+        "status_code": info["status_code"],
+        "status_text": info["reason"],
+        "url": info["url"],
+        "method": method.upper(),
+        "headers": info["headers"],
+        "content": parsed_content,
+        "content_length": len(content),
+        "encoding": info["encoding"],
+        "elapsed_seconds": info["elapsed_seconds"]
+    }
+    
+    # Add error info for non-2xx status codes
+    if not 200 <= info["status_code"] < 300:
+        result["error"] = f"HTTP {info['status_code']}: {info['reason']}"
+    return result
+
+def _scrape_page(soup_class: Any, content: bytes, url: str, status_code: int,
+                 css_selector: Optional[str], extract_links: bool) -> Dict[str, Any]:
+    """Extract title, description, text or selected elements, and links from a page."""
+    soup = soup_class(content, 'html.parser')
+    
+    # Extract basic page info
+    result = {
+        "success": True,
+        "url": url,
+        "title": soup.title.string.strip() if soup.title and soup.title.string else None,
+        "status_code": status_code
+    }
+    
+    # Extract meta description
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc:
+        result["description"] = meta_desc.get('content', '').strip()
+    
+    # Extract specific content based on selector
+    if css_selector:
+        elements = soup.select(css_selector)
+        result["selected_content"] = [elem.get_text().strip() for elem in elements]
+        result["selected_count"] = len(elements)
+    else:
+        # Extract main text content (remove script and style elements)
+        for script in soup(["script", "style"]):
+            script.decompose()
+        result["text_content"] = soup.get_text()
+    
+    # Extract links if requested
+    if extract_links:
+        links = []
+        for link in soup.find_all('a', href=True):
+            href = link['href']
+            text = link.get_text().strip()
+            if href and text:
+                links.append({
+                    "url": href,
+                    "text": text
+                })
+        result["links"] = links
+        result["link_count"] = len(links)
+    
+    return result
+
+def _batch_specs(urls: Optional[List[str]], request_specs: Optional[List[Dict[str, Any]]],
+                 method: str, headers: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Merge URL lists and per-request specs with the shared method and headers."""
+    specs = [{"url": url} for url in urls or []] + [dict(spec) for spec in request_specs or []]
+    for spec in specs:
+        if not spec.get("url"):
+            raise ValueError(f"Request spec has no url: {spec}")
+        spec["method"] = spec.get("method") or method
+        spec["headers"] = {**headers, **(spec.get("headers") or {})}
+    return specs
+
+def _scrape_stream(session: Any, url: str, headers: Dict[str, str], timeout: int,
+                   css_selector: Optional[str], extract_links: bool, max_bytes: int) -> Dict[str, Any]:
+    """Fetch a page in chunks and extract content without building a DOM."""
+    with session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+        if response.status_code >= 400:
+            return {
+                "success": False,
+                "error": f"Scraping failed: HTTP {response.status_code}: {response.reason}",
+                "url": url,
+                "status_code": response.status_code
+            }
+        page, bytes_read, truncated, parser = stream_scrape(
+            response.iter_content(CHUNK_SIZE), response.headers.get('content-type', ''),
+            css_selector, extract_links, max_bytes
+        )
+        
+        result = {
+            "success": True,
+            "url": response.url,
+            "title": page.title or None,
+            "status_code": response.status_code
+        }
+    if page.description is not None:
+        result["description"] = page.description
+    if css_selector:
+        result["selected_content"] = [text or "" for text in page.selected]
+        result["selected_count"] = len(page.selected)
+    else:
+        result["text_content"] = "".join(page.text)
+    if extract_links:
+        result["links"] = page.links
+        result["link_count"] = len(page.links)
+    result["stream"] = {"bytes_read": bytes_read, "truncated": truncated, "parser": parser}
+    result["cache"] = "bypass"
+    return result
+
+async def _gather_batch(specs: List[Dict[str, Any]], handle, **options) -> List[Dict[str, Any]]:
+    """Run fetch_all and convert each response as it arrives, so raw bodies are not kept."""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(specs)
+    async for index, info in fetch_all(specs, **options):
+        results[index] = handle(specs[index], info)
+    return results
+
+def _batch_summary(results: List[Dict[str, Any]], started: float) -> Dict[str, Any]:
+    succeeded = sum(1 for r in results if r.get("success") and "error" not in r)
+    return {
+        "success": True,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "results": results
+    }
+
 # --- Web Tools ---
 
 @tool("http_request", args_schema=HttpRequestInput)
 def http_request(url: str, method: str = "GET", headers: Optional[Dict[str, str]] = None,
                 params: Optional[Dict[str, str]] = None, body: Optional[str] = None,
-                timeout: int = 30, follow_redirects: bool = True) -> str:
+                timeout: int = 30, follow_redirects: bool = True, use_cache: bool = False) -> str:
     """
     Make HTTP requests to APIs and websites.
     
@@ -74,13 +226,15 @@ def http_request(url: str, method: str = "GET", headers: Optional[Dict[str, str]
     - Custom headers and query parameters
     - Request body for POST/PUT operations
     - Automatic retries for failed requests
+    - Pooled keep-alive connections shared across calls
+    - HTTP caching of GET responses with ETag/Last-Modified revalidation
     - JSON response parsing
     - Error handling and detailed status reporting
     
     Returns a JSON string with response details including status, headers, and content.
     """
     try:
-        session = _create_session_with_retries()
+        session = http_sessions.session()
         
         # Set default headers
         request_headers = {
@@ -90,73 +244,56 @@ def http_request(url: str, method: str = "GET", headers: Optional[Dict[str, str]
         if headers:
             request_headers.update(headers)
         
-        # Make the request
-        response = session.request(
-            method=method.upper(),
-            url=url,
-            headers=request_headers,
-            params=params or {},
-            data=body,
-            timeout=timeout,
-            allow_redirects=follow_redirects
-        )
-        
-        # Parse response content
-        content = response.text
-        content_type = response.headers.get('content-type', '').lower()
-        
-        # Try to parse JSON responses
-        parsed_content = content
-        if 'application/json' in content_type:
-            parsed_content = _safe_json_parse(content)
-        
-        # Build result
-        result = {
-            "success": True,
-            "status_code": response.status_code,
-            "status_text": response.reason,
-            "url": response.url,
-            "method": method.upper(),
-            "headers": dict(response.headers),
-            "content": parsed_content,
-            "content_length": len(content),
-            "encoding": response.encoding,
-            "elapsed_seconds": response.elapsed.total_seconds()
-        }
-        
-        # Add error info for non-2xx status codes
-        if not response.ok:
-            result["error"] = f"HTTP {response.status_code}: {response.reason}"
+        # Make the request (GET without a body can be answered from the cache)
+        if use_cache and method.upper() == "GET" and body is None:
+            info, cache_status = cached_get(
+                session, http_cache, url, request_headers, params=params or {},
+                timeout=timeout, allow_redirects=follow_redirects
+            )
+        else:
+            response = session.request(
+                method=method.upper(),
+                url=url,
+                headers=request_headers,
+                params=params or {},
+                data=body,
+                timeout=timeout,
+                allow_redirects=follow_redirects
+            )
+            info, cache_status = response_info(response), "bypass"
         
-        return json.dumps(result, indent=2, default=str)
+        result = _response_result(method, info)
+        result["cache"] = cache_status
+        return to_json(result)
         
     except requests.exceptions.Timeout:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Request timed out after {timeout} seconds",
             "url": url,
             "method": method.upper()
-        }, indent=2)
+        })
     
     except requests.exceptions.ConnectionError as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Connection error: {str(e)}",
             "url": url,
             "method": method.upper()
-        }, indent=2)
+        })
     
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Unexpected error: {str(e)}",
             "url": url,
             "method": method.upper()
-        }, indent=2)
+        })
 
 @tool("web_scrape", args_schema=WebScrapeInput)
 def web_scrape(url: str, css_selector: Optional[str] = None, 
-               extract_links: bool = False, timeout: int = 30) -> str:
+               extract_links: bool = False, timeout: int = 30, use_cache: bool = False,
+               stream: bool = False, max_bytes: Optional[int] = None) -> str:
     """
     Scrape content from web pages with optional CSS selector filtering.
     
@@ -166,80 +303,164 @@ def web_scrape(url: str, css_selector: Optional[str] = None,
     - All links from the page
     - Page metadata (title, description)
     
+    With stream=True the page is read in chunks up to max_bytes and parsed
+    incrementally, so only the selected elements and links are kept in memory.
+    
     Returns extracted content as JSON with metadata.
     """
     try:
+        session = http_sessions.session()
+        request_headers = {'User-Agent': 'Braid-Agent/1.0 (Web Scraper)'}
+        
+        if stream:
+            result = _scrape_stream(session, url, request_headers, timeout, css_selector, extract_links,
+                                    max_bytes or DEFAULT_STREAM_BYTES)
+            return to_json(result, ensure_ascii=False)
+        
         # Import BeautifulSoup here to make it optional
         try:
             from bs4 import BeautifulSoup
         except ImportError:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": "BeautifulSoup not available. Install with: pip install beautifulsoup4"
             })
         
-        session = _create_session_with_retries()
-        
         # Get the page
-        response = session.get(url, timeout=timeout, headers={
-            'User-Agent': 'Braid-Agent/1.0 (Web Scraper)'
-        })
-        response.raise_for_status()
+        if use_cache:
+            info, cache_status = cached_get(session, http_cache, url, request_headers, timeout=timeout)
+        else:
+            info, cache_status = response_info(session.get(url, timeout=timeout, headers=request_headers)), "bypass"
+        if info["status_code"] >= 400:
+            return to_json({
+                "success": False,
+                "error": f"Scraping failed: HTTP {info['status_code']}: {info['reason']}",
+                "url": url,
+                "status_code": info["status_code"]
+            })
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        result = _scrape_page(BeautifulSoup, info["content"], info["url"], info["status_code"],
+                              css_selector, extract_links)
+        result["cache"] = cache_status
         
-        # Extract basic page info
-        result = {
-            "success": True,
-            "url": response.url,
-            "title": soup.title.string.strip() if soup.title else None,
-            "status_code": response.status_code
+        return to_json(result, ensure_ascii=False)
+        
+    except Exception as e:
+        return to_json({
+            "success": False,
+            "error": f"Scraping failed: {str(e)}",
+            "url": url
+        })
+
+@tool("http_batch_request", args_schema=HttpBatchRequestInput)
+def http_batch_request(urls: Optional[List[str]] = None, request_specs: Optional[List[Dict[str, Any]]] = None,
+                       method: str = "GET", headers: Optional[Dict[str, str]] = None,
+                       concurrency: int = 10, per_host_limit: int = 4, retries: int = 2,
+                       timeout: int = 30, follow_redirects: bool = True,
+                       max_content_chars: Optional[int] = None) -> str:
+    """
+    Make many HTTP requests concurrently and return all responses together.
+    
+    Use instead of repeated http_request calls when fetching a list of URLs:
+    - Total time is close to the slowest response, not the sum of all
+    - Global and per-host concurrency limits to avoid overloading servers
+    - Retries with jittered backoff for connection errors, timeouts and 429/5xx
+    - Results in the same order as the requests, each shaped like http_request output
+    
+    Returns a JSON string with per-request results and success/failure counts.
+    """
+    try:
+        request_headers = {
+            'User-Agent': 'Braid-Agent/1.0',
+            'Accept': 'application/json, text/plain, */*'
         }
+        request_headers.update(headers or {})
+        specs = _batch_specs(urls, request_specs, method, request_headers)
+        if not specs:
+            return to_json({
+                "success": False,
+                "error": "Provide at least one URL in 'urls' or 'request_specs'"
+            })
         
-        # Extract meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            result["description"] = meta_desc.get('content', '').strip()
+        def handle(spec: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+            if "error" in info:
+                return {"success": False, "error": info["error"], "url": spec["url"],
+                        "method": spec["method"].upper(), "attempts": info["attempts"]}
+            result = _response_result(spec["method"], info)
+            result["attempts"] = info["attempts"]
+            if max_content_chars is not None and isinstance(result["content"], str) \
+                    and len(result["content"]) > max_content_chars:
+                result["content"] = result["content"][:max_content_chars]
+                result["content_truncated"] = True
+            return result
         
-        # Extract specific content based on selector
-        if css_selector:
-            elements = soup.select(css_selector)
-            result["selected_content"] = [elem.get_text().strip() for elem in elements]
-            result["selected_count"] = len(elements)
-        else:
-            # Extract main text content (remove script and style elements)
-            for script in soup(["script", "style"]):
-                script.decompose()
-            result["text_content"] = soup.get_text()
-        
-        # Extract links if requested
-        if extract_links:
-            links = []
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                text = link.get_text().strip()
-                if href and text:
-                    links.append({
-                        "url": href,
-                        "text": text
-                    })
-            result["links"] = links
-            result["link_count"] = len(links)
-        
-        return json.dumps(result, indent=2, ensure_ascii=False)
+        started = time.perf_counter()
+        results = run_coroutine(_gather_batch(
+            specs, handle, concurrency=concurrency, per_host=per_host_limit,
+            retries=retries, timeout=timeout, follow_redirects=follow_redirects
+        ))
+        return to_json(_batch_summary(results, started))
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
-            "error": f"Scraping failed: {str(e)}",
-            "url": url
-        }, indent=2)
+            "error": f"Batch request failed: {str(e)}"
+        })
+
+@tool("web_scrape_batch", args_schema=WebScrapeBatchInput)
+def web_scrape_batch(urls: List[str], css_selector: Optional[str] = None, extract_links: bool = False,
+                     concurrency: int = 10, per_host_limit: int = 4, retries: int = 2,
+                     timeout: int = 30) -> str:
+    """
+    Scrape many web pages concurrently with the same extraction settings.
+    
+    Each page is fetched in parallel (with global and per-host limits and
+    retries) and parsed as soon as it arrives. Per-page results match
+    web_scrape output and keep the order of the input URLs.
+    
+    Returns a JSON string with per-page results and success/failure counts.
+    """
+    try:
+        try:
+            from bs4 import BeautifulSoup
+        except ImportError:
+            return to_json({
+                "success": False,
+                "error": "BeautifulSoup not available. Install with: pip install beautifulsoup4"
+            })
+        
+        specs = _batch_specs(urls, None, "GET", {'User-Agent': 'Braid-Agent/1.0 (Web Scraper)'})
+        
+        def handle(spec: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+            if "error" in info:
+                return {"success": False, "error": f"Scraping failed: {info['error']}", "url": spec["url"]}
+            if info["status_code"] >= 400:
+                return {"success": False, "error": f"HTTP {info['status_code']}: {info['reason']}",
+                        "url": spec["url"], "status_code": info["status_code"]}
+            try:
+                return _scrape_page(BeautifulSoup, info["content"], info["url"], info["status_code"],
+                                    css_selector, extract_links)
+            except Exception as e:
+                return {"success": False, "error": f"Scraping failed: {str(e)}", "url": spec["url"]}
+        
+        started = time.perf_counter()
+        results = run_coroutine(_gather_batch(
+            specs, handle, concurrency=concurrency, per_host=per_host_limit,
+            retries=retries, timeout=timeout
+        ))
+        return to_json(_batch_summary(results, started), ensure_ascii=False)
+        
+    except Exception as e:
+        return to_json({
+            "success": False,
+            "error": f"Batch scraping failed: {str(e)}"
+        })
 
 # --- Tool Aggregator ---
 
 def get_http_tools():
     """Returns a list of all HTTP and web tools."""
-    return [http_request, web_scrape]
+    return [http_request, web_scrape, http_batch_request, web_scrape_batch]
 
 # Legacy compatibility
 def get_web_tools():
@@ -0,0 +1,352 @@
+"""
+Shared HTTP connection pools for the network tools.
+
+These are non-tool helper functions that an agent's own Python code can import
+and use directly. They are NOT exposed to the LLM as tools.
+
+Every tool call used to build its own requests.Session, so each call opened a
+new connection pool and paid a fresh TCP/TLS handshake. The registry here keeps
+one set of HTTPAdapters (and therefore one urllib3 connection pool per host)
+for the whole process, so repeated calls to the same host reuse kept-alive
+connections.
+
+Configuration:
+- BRAID_HTTP_POOL_SIZE: connections kept per host (default 10)
+- BRAID_HTTP_POOL_HOSTS: number of host pools kept before the least recently
+  used is discarded (default 32)
+- BRAID_HTTP_HOST_POOL_SIZES: per-host overrides, e.g.
+  "api.example.com=32,cdn.example.com=16"
+
+fetch_all() runs many requests concurrently on asyncio with global and
+per-host limits. It uses httpx.AsyncClient when httpx is installed
+(pip install ".[http]"), otherwise the pooled requests sessions on a bounded
+thread pool.
+"""
+import asyncio
+import atexit
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_HOSTS = 32
+
+# Status codes that are retried, by both the session Retry policy and fetch_all
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def retry_policy() -> Retry:
+    """The retry strategy used for every pooled session."""
+    return Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=sorted(RETRY_STATUSES),
+    )
+
+
+def _parse_host_sizes(spec: str) -> Dict[str, int]:
+    sizes: Dict[str, int] = {}
+    for part in spec.split(","):
+        host, _, size = part.strip().partition("=")
+        if host and size.strip().isdigit():
+            sizes[host.strip().lower()] = int(size)
+    return sizes
+
+
+class SessionRegistry:
+    """
+    Process-wide, thread-safe pool of HTTP connections.
+
+    Adapters (which own the connection pools) are shared by all threads. Each
+    thread gets its own lightweight requests.Session mounted on those adapters,
+    because Session state such as cookies is not safe to mutate concurrently.
+    Hosts with a configured pool size get a dedicated adapter mounted on their
+    URL prefix; all other hosts share the default adapter. With retry=False the
+    adapters do not retry, for callers that apply their own retry policy.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, pool_hosts: int = DEFAULT_POOL_HOSTS,
+                 host_pool_sizes: Optional[Dict[str, int]] = None, retry: bool = True):
+        self.pool_size = pool_size
+        self.pool_hosts = pool_hosts
+        self.retry = retry
+        self._host_pool_sizes = {h.lower(): s for h, s in (host_pool_sizes or {}).items()}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._generation = 0
+        self.sessions_created = 0
+
+    def _adapter(self, pool_size: int, pool_hosts: int) -> HTTPAdapter:
+        return HTTPAdapter(
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_size,
+            max_retries=retry_policy() if self.retry else 0,
+        )
+
+    def _build_adapters(self) -> Dict[str, HTTPAdapter]:
+        """Return prefix -> adapter, creating them on first use. Caller holds the lock."""
+        if not self._adapters:
+            default = self._adapter(self.pool_size, self.pool_hosts)
+            adapters = {"http://": default, "https://": default}
+            for host, size in self._host_pool_sizes.items():
+                dedicated = self._adapter(size, 1)
+                adapters[f"http://{host}"] = dedicated
+                adapters[f"https://{host}"] = dedicated
+            self._adapters = adapters
+        return self._adapters
+
+    def configure_host(self, host: str, pool_size: int) -> None:
+        """Give `host` its own pool of `pool_size` connections."""
+        with self._lock:
+            host = host.lower()
+            self._host_pool_sizes[host] = pool_size
+            if self._adapters:
+                dedicated = self._adapter(pool_size, 1)
+                for prefix in (f"http://{host}", f"https://{host}"):
+                    old = self._adapters.get(prefix)
+                    self._adapters[prefix] = dedicated
+                if old is not None:
+                    old.close()
+            self._generation += 1
+
+    def session(self) -> requests.Session:
+        """
+        Return this thread's pooled session.
+
+        Cookies are cleared on every call so state never leaks from one tool
+        call into the next, matching the old one-session-per-call behaviour.
+        """
+        local = self._local
+        session = getattr(local, "session", None)
+        if session is None or local.generation != self._generation:
+            with self._lock:
+                adapters = self._build_adapters()
+                generation = self._generation
+            session = requests.Session()
+            # Session.__init__ mounts its own default adapters; replace them with the shared ones
+            session.adapters.clear()
+            for prefix, adapter in adapters.items():
+                session.mount(prefix, adapter)
+            local.session = session
+            local.generation = generation
+            self.sessions_created += 1
+        session.cookies.clear()
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool configuration and how many thread sessions were created."""
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "pool_hosts": self.pool_hosts,
+                "host_pool_sizes": dict(self._host_pool_sizes),
+                "adapters": len({id(a) for a in self._adapters.values()}),
+                "sessions_created": self.sessions_created
+            }
+
+    def close(self) -> None:
+        """Close every pooled connection. The registry rebuilds its pools if used again."""
+        with self._lock:
+            adapters = self._adapters
+            self._adapters = {}
+            self._generation += 1
+        for adapter in {id(a): a for a in adapters.values()}.values():
+            adapter.close()
+
+
+# Global instance shared by the HTTP tools
+http_sessions = SessionRegistry(
+    pool_size=int(os.getenv("BRAID_HTTP_POOL_SIZE", str(DEFAULT_POOL_SIZE))),
+    pool_hosts=int(os.getenv("BRAID_HTTP_POOL_HOSTS", str(DEFAULT_POOL_HOSTS))),
+    host_pool_sizes=_parse_host_sizes(os.getenv("BRAID_HTTP_HOST_POOL_SIZES", "")),
+)
+
+atexit.register(http_sessions.close)
+
+# Sessions for fetch_all, which applies its own retry policy
+batch_sessions = SessionRegistry(
+    pool_size=int(os.getenv("BRAID_HTTP_POOL_SIZE", str(DEFAULT_POOL_SIZE))),
+    pool_hosts=int(os.getenv("BRAID_HTTP_POOL_HOSTS", str(DEFAULT_POOL_HOSTS))),
+    host_pool_sizes=_parse_host_sizes(os.getenv("BRAID_HTTP_HOST_POOL_SIZES", "")),
+    retry=False,
+)
+
+atexit.register(batch_sessions.close)
+
+
+# --- Async batch fetching ---
+
+def response_info(response: Any, elapsed_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Normalise a requests or httpx response into a plain dict."""
+    if elapsed_seconds is None:
+        elapsed_seconds = response.elapsed.total_seconds()
+    return {
+        "status_code": response.status_code,
+        "reason": getattr(response, "reason", None) or getattr(response, "reason_phrase", ""),
+        "url": str(response.url),
+        "headers": dict(response.headers),
+        "content": response.content,
+        "text": response.text,
+        "encoding": response.encoding,
+        "elapsed_seconds": elapsed_seconds
+    }
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 10.0) -> float:
+    """Exponential backoff with full jitter for retry number `attempt` (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _retry_after(info: Optional[Dict[str, Any]], cap: float = 30.0) -> float:
+    """Seconds requested by a numeric Retry-After header, if any."""
+    if not info:
+        return 0.0
+    value = {k.lower(): v for k, v in info["headers"].items()}.get("retry-after", "")
+    try:
+        return min(max(float(value), 0.0), cap)
+    except ValueError:
+        return 0.0
+
+
+def run_coroutine(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion from synchronous code, even inside a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class _RequestsTransport:
+    """Blocking requests sessions driven from asyncio via a bounded thread pool."""
+
+    name = "requests"
+    retryable = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+    def __init__(self, concurrency: int, timeout: float, follow_redirects: bool):
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="braid-http")
+        self._timeout = timeout
+        self._follow_redirects = follow_redirects
+
+    def _send(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        response = batch_sessions.session().request(
+            method=spec.get("method", "GET").upper(),
+            url=spec["url"],
+            headers=spec.get("headers"),
+            params=spec.get("params") or {},
+            data=spec.get("body"),
+            timeout=self._timeout,
+            allow_redirects=self._follow_redirects
+        )
+        return response_info(response)
+
+    async def send(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._send, spec)
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _HttpxTransport:
+    """Native asyncio transport using one httpx.AsyncClient per batch."""
+
+    name = "httpx"
+
+    def __init__(self, concurrency: int, timeout: float, follow_redirects: bool):
+        self.retryable = (httpx.TransportError,)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            timeout=timeout,
+            follow_redirects=follow_redirects
+        )
+
+    async def send(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        response = await self._client.request(
+            spec.get("method", "GET").upper(),
+            spec["url"],
+            headers=spec.get("headers"),
+            params=spec.get("params") or None,
+            content=spec.get("body")
+        )
+        return response_info(response, loop.time() - started)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def _make_transport(backend: str, concurrency: int, timeout: float, follow_redirects: bool):
+    if backend == "httpx" and httpx is None:
+        raise ValueError('httpx is not installed. Install with: pip install ".[http]"')
+    if backend not in ("auto", "httpx", "requests"):
+        raise ValueError(f"Unknown backend: {backend}. Available: auto, httpx, requests")
+    if backend == "httpx" or (backend == "auto" and httpx is not None):
+        return _HttpxTransport(concurrency, timeout, follow_redirects)
+    return _RequestsTransport(concurrency, timeout, follow_redirects)
+
+
+async def fetch_all(specs: List[Dict[str, Any]], concurrency: int = 10, per_host: int = 4,
+                    retries: int = 2, timeout: float = 30, follow_redirects: bool = True,
+                    backend: str = "auto") -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Fetch many requests concurrently, yielding (index, result) as each finishes.
+
+    Each spec is {url, method?, headers?, params?, body?}. At most
+    `concurrency` requests are in flight overall and `per_host` per host.
+    Connection errors, timeouts and retryable status codes are retried up to
+    `retries` times with jittered exponential backoff (or the server's
+    Retry-After); slots are released while waiting. Results are response_info()
+    dicts plus "attempts" and "backend", or {"error", "attempts", "backend"}.
+    """
+    transport = _make_transport(backend, max(concurrency, 1), timeout, follow_redirects)
+    overall = asyncio.Semaphore(max(concurrency, 1))
+    hosts: Dict[str, asyncio.Semaphore] = {}
+
+    async def fetch_one(index: int, spec: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        host = urlsplit(spec["url"]).netloc.lower()
+        limit = hosts.setdefault(host, asyncio.Semaphore(max(per_host, 1)))
+        info: Optional[Dict[str, Any]] = None
+        for attempt in range(retries + 1):
+            error = None
+            # Take the host slot first so requests queued on a busy host do not hold global slots
+            async with limit, overall:
+                try:
+                    info = await transport.send(spec)
+                except transport.retryable as e:
+                    info, error = None, e
+                except Exception as e:
+                    return index, {"error": f"{type(e).__name__}: {e}", "attempts": attempt + 1,
+                                   "backend": transport.name}
+            if error is None and (info["status_code"] not in RETRY_STATUSES or attempt == retries):
+                info["attempts"] = attempt + 1
+                info["backend"] = transport.name
+                return index, info
+            if attempt == retries:
+                return index, {"error": f"{type(error).__name__}: {error}", "attempts": attempt + 1,
+                               "backend": transport.name}
+            await asyncio.sleep(max(backoff_delay(attempt), _retry_after(info)))
+
+    tasks = [asyncio.ensure_future(fetch_one(i, spec)) for i, spec in enumerate(specs)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await transport.aclose()
@@ -0,0 +1,152 @@
+"""
+Result encoding shared by every Braid tool.
+
+Tools return their result dicts through to_json() instead of calling
+json.dumps directly, so the output format can be switched fleet-wide:
+
+- BRAID_TOOL_OUTPUT=pretty (default): indented JSON, identical to the
+  historical json.dumps(result, indent=2, default=str) output.
+- BRAID_TOOL_OUTPUT=compact: no indentation or extra whitespace, and uses
+  orjson when it is installed. Both encoders give the same text, including
+  escaped non-ASCII characters unless ensure_ascii=False.
+- BRAID_TOOL_OUTPUT_MAX_BYTES=<n>: cap the encoded size. Oversized results
+  have their largest list/string fields trimmed and gain a "_truncated" entry
+  describing what was cut.
+
+The same settings can be changed at runtime with configure_output().
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_settings = {
+    "compact": os.getenv("BRAID_TOOL_OUTPUT", "pretty").lower() == "compact",
+    "max_bytes": int(os.getenv("BRAID_TOOL_OUTPUT_MAX_BYTES", "0") or 0),
+    "use_orjson": True,
+}
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                   if orjson is not None else 0)
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "bytes": 0, "truncated": 0}
+
+
+def configure_output(compact: Optional[bool] = None, max_bytes: Optional[int] = None,
+                     use_orjson: Optional[bool] = None) -> Dict[str, Any]:
+    """Change the output settings for this process; returns the new settings."""
+    if compact is not None:
+        _settings["compact"] = compact
+    if max_bytes is not None:
+        _settings["max_bytes"] = max(max_bytes, 0)
+    if use_orjson is not None:
+        _settings["use_orjson"] = use_orjson
+    return dict(_settings)
+
+
+def output_stats(reset: bool = False) -> Dict[str, Any]:
+    """Return counters for encoded results (calls, total bytes, truncations)."""
+    with _stats_lock:
+        stats = dict(_stats)
+        stats["avg_bytes"] = stats["bytes"] / stats["calls"] if stats["calls"] else 0
+        if reset:
+            _stats.update(calls=0, bytes=0, truncated=0)
+    return stats
+
+
+def _encode(result: Any, ensure_ascii: bool, compact: bool) -> str:
+    if not compact:
+        return json.dumps(result, indent=2, default=str, ensure_ascii=ensure_ascii)
+    if orjson is not None and _settings["use_orjson"]:
+        try:
+            # Datetimes and dataclasses go through default=str, as they do with json
+            encoded = orjson.dumps(result, default=str, option=_ORJSON_OPTIONS).decode("utf-8")
+        except (TypeError, orjson.JSONEncodeError):
+            encoded = None
+        # orjson cannot escape non-ASCII; leave such results to json
+        if encoded is not None and (not ensure_ascii or encoded.isascii()):
+            return encoded
+    return json.dumps(result, separators=(",", ":"), default=str, ensure_ascii=ensure_ascii)
+
+
+def _size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _fit_field(result: Dict[str, Any], field: str, max_bytes: int, ensure_ascii: bool,
+               compact: bool) -> bool:
+    """Shrink one list/string field as little as possible so the result fits; True if it does."""
+    original = result[field]
+    # Record the field first (with the widest possible count) so its metadata is part of the budget
+    note = {"original_length": len(original), "returned_length": len(original)}
+    result["_truncated"]["fields"][field] = note
+    low, high = 0, len(original)
+    best = None
+    while low <= high:
+        mid = (low + high) // 2
+        result[field] = original[:mid]
+        if _size(_encode(result, ensure_ascii, compact)) <= max_bytes:
+            best = mid
+            low = mid + 1
+        else:
+            high = mid - 1
+    result[field] = original[:best if best is not None else 0]
+    note["returned_length"] = best or 0
+    return best is not None
+
+
+def _truncate(result: Any, encoded: str, max_bytes: int, ensure_ascii: bool, compact: bool) -> str:
+    original_bytes = _size(encoded)
+    if isinstance(result, dict):
+        trimmed = dict(result)
+        trimmed["_truncated"] = {"original_bytes": original_bytes, "max_bytes": max_bytes, "fields": {}}
+        candidates: List[str] = sorted(
+            (k for k, v in result.items() if isinstance(v, (list, str)) and v),
+            key=lambda k: _size(_encode(result[k], ensure_ascii, compact)),
+            reverse=True
+        )
+        for field in candidates:
+            if _fit_field(trimmed, field, max_bytes, ensure_ascii, compact):
+                return _encode(trimmed, ensure_ascii, compact)
+    # Nothing trimmable was enough: return a preview of the encoded text
+    envelope = {
+        "_truncated": {"original_bytes": original_bytes, "max_bytes": max_bytes, "fields": {}},
+        "preview": ""
+    }
+    if isinstance(result, dict) and "success" in result:
+        envelope["success"] = result["success"]
+    room = max(max_bytes - _size(_encode(envelope, ensure_ascii, compact)), 0)
+    envelope["preview"] = encoded.encode("utf-8")[:room].decode("utf-8", errors="ignore")
+    while room and _size(_encode(envelope, ensure_ascii, compact)) > max_bytes:
+        room = room * 3 // 4
+        envelope["preview"] = envelope["preview"][:room]
+    return _encode(envelope, ensure_ascii, compact)
+
+
+def to_json(result: Any, ensure_ascii: bool = True, compact: Optional[bool] = None) -> str:
+    """
+    Encode a tool result using the configured output mode and size cap.
+
+    Non-JSON-serialisable values are converted with str(), as tools have
+    always done with default=str. Pass `compact` to override the configured
+    mode for tools whose output has always been compact.
+    """
+    if compact is None:
+        compact = _settings["compact"]
+    encoded = _encode(result, ensure_ascii, compact)
+    max_bytes = _settings["max_bytes"]
+    truncated = False
+    if max_bytes and _size(encoded) > max_bytes:
+        encoded = _truncate(result, encoded, max_bytes, ensure_ascii, compact)
+        truncated = True
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["bytes"] += _size(encoded)
+        _stats["truncated"] += truncated
+    return encoded
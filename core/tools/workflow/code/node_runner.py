@@ -0,0 +1,352 @@
+"""
+Warm Node.js workers for the javascript_code tool.
+
+These are non-tool helper functions that an agent's own Python code can import
+and use directly. They are NOT exposed to the LLM as tools.
+
+Starting Node costs 40-80 ms, so instead of spawning `node` per snippet a
+small pool of long-lived Node processes serves jobs over a line-delimited
+JSON protocol on stdio. Each job runs in a fresh vm context, so globals never
+leak between snippets, with its own console/process.stdout capture and CommonJS globals (require,
+module, exports, __dirname, __filename).
+
+- Per-job timeout: vm's synchronous timeout, a timer for async work, and a
+  hard kill from Python if the worker stops responding.
+- Workers are recycled after BRAID_NODE_MAX_JOBS jobs (default 200).
+- BRAID_NODE_WORKERS sets the pool size (default 2).
+- The `node --version` check runs once per process.
+"""
+import atexit
+import contextlib
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# Extra seconds the parent waits beyond a job's timeout before killing the worker
+KILL_GRACE_SECONDS = 2.0
+
+_RUNNER_JS = r"""
+'use strict';
+const vm = require('vm');
+const util = require('util');
+const os = require('os');
+const path = require('path');
+const readline = require('readline');
+const Module = require('module');
+
+const send = (msg) => process.stdout.write(JSON.stringify(msg) + '\n');
+const userRequire = Module.createRequire(path.join(process.cwd(), '__braid_runner__.js'));
+// Snippets used to run as a temp file, so __dirname/__filename point there
+const snippetDir = os.tmpdir();
+const snippetFile = path.join(snippetDir, 'javascript_code.js');
+let current = null;
+
+class ExitSignal {
+  constructor(code) { this.code = code === undefined ? 0 : code; }
+}
+
+// Drop the runner's own frames from stack traces
+function userStack(err) {
+  if (!err || !err.stack) return String(err);
+  const lines = String(err.stack).split('\n');
+  const cut = lines.findIndex((line) => /^\s+at .*(node:vm|\[eval\])/.test(line));
+  return (cut === -1 ? lines : lines.slice(0, cut)).join('\n');
+}
+
+function report(err) {
+  if (current === null) return;
+  if (err instanceof ExitSignal) { current.exitCode = err.code; current.finish(); return; }
+  current.stderr.push(userStack(err) + '\n');
+  current.exitCode = 1;
+  current.finish();
+}
+process.on('uncaughtException', report);
+process.on('unhandledRejection', report);
+
+function makeSandbox(job) {
+  const timers = new Set();
+  const track = (schedule, clear, repeat) => (fn, ms, ...args) => {
+    const handle = schedule(() => {
+      if (!repeat) timers.delete(handle);
+      try { fn(...args); } catch (e) { report(e); return; }
+      job.check();
+    }, ms);
+    timers.add(handle);
+    handle.__clear = clear;
+    return handle;
+  };
+  const untrack = (handle) => {
+    if (handle && timers.has(handle)) { timers.delete(handle); handle.__clear(handle); }
+    job.check();
+  };
+  const writer = (buffer) => ({ write: (chunk) => { buffer.push(String(chunk)); return true; } });
+  const fakeProcess = Object.create(process, {
+    stdout: { value: writer(job.stdout) },
+    stderr: { value: writer(job.stderr) },
+    exit: { value: (code) => { throw new ExitSignal(code); } },
+  });
+  const out = (...args) => { job.stdout.push(util.format(...args) + '\n'); };
+  const err = (...args) => { job.stderr.push(util.format(...args) + '\n'); };
+  const module = { id: '.', filename: snippetFile, path: snippetDir, exports: {}, require: userRequire };
+  const sandbox = {
+    console: { log: out, info: out, debug: out, error: err, warn: err, trace: err, dir: out },
+    process: fakeProcess,
+    require: userRequire,
+    module, exports: module.exports,
+    __dirname: snippetDir, __filename: snippetFile,
+    Buffer, URL, URLSearchParams, TextEncoder, TextDecoder,
+    setTimeout: track(setTimeout, clearTimeout, false),
+    setInterval: track(setInterval, clearInterval, true),
+    setImmediate: track(setImmediate, clearImmediate, false),
+    clearTimeout: untrack, clearInterval: untrack, clearImmediate: untrack,
+    queueMicrotask,
+  };
+  sandbox.global = sandbox;
+  job.timers = timers;
+  return sandbox;
+}
+
+function runJob(msg) {
+  const started = Date.now();
+  const job = { stdout: [], stderr: [], exitCode: 0, done: false, timers: new Set(), pending: 0 };
+  let deadline = null;
+  job.finish = () => {
+    if (job.done) return;
+    job.done = true;
+    clearTimeout(deadline);
+    for (const handle of job.timers) handle.__clear(handle);
+    current = null;
+    send({ id: msg.id, exit_code: job.exitCode, stdout: job.stdout.join(''), stderr: job.stderr.join(''),
+           timed_out: job.timedOut === true, duration_ms: Date.now() - started });
+    setImmediate(drain);
+  };
+  job.check = () => { if (!job.done && job.pending === 0 && job.timers.size === 0) setImmediate(() => {
+    if (!job.done && job.pending === 0 && job.timers.size === 0) job.finish();
+  }); };
+  current = job;
+  const timeoutMs = Math.max(1, Math.round(msg.timeout * 1000));
+  deadline = setTimeout(() => {
+    job.timedOut = true;
+    job.stderr.push(`Timed out after ${msg.timeout} seconds\n`);
+    job.exitCode = 124;
+    job.finish();
+  }, timeoutMs);
+
+  try {
+    const sandbox = makeSandbox(job);
+    for (const name of msg.modules || []) sandbox[name.replace(/-/g, '_')] = userRequire(name);
+    const context = vm.createContext(sandbox);
+    // Build context variables inside the context so Array/Object checks behave normally
+    const parse = vm.runInContext('JSON.parse', context);
+    for (const [key, value] of Object.entries(msg.context_vars || {})) sandbox[key] = parse(JSON.stringify(value));
+    const result = vm.runInContext(msg.code, context, { timeout: timeoutMs, filename: 'javascript_code.js' });
+    if (result && typeof result.then === 'function') {
+      job.pending += 1;
+      result.then(() => { job.pending -= 1; job.check(); }, (e) => { job.pending -= 1; report(e); });
+    }
+  } catch (e) {
+    if (e && e.code === 'ERR_SCRIPT_EXECUTION_TIMEOUT') {
+      job.timedOut = true;
+      job.exitCode = 124;
+      job.stderr.push(`Timed out after ${msg.timeout} seconds\n`);
+      job.finish();
+      return;
+    }
+    report(e);
+    return;
+  }
+  job.check();
+}
+
+const queue = [];
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+  if (!line.trim()) return;
+  queue.push(JSON.parse(line));
+  drain();
+});
+function drain() {
+  if (current !== null || queue.length === 0) return;
+  runJob(queue.shift());
+}
+send({ ready: true, version: process.version });
+"""
+
+
+@lru_cache(maxsize=1)
+def node_version() -> Optional[str]:
+    """Return the installed Node.js version, or None if Node is unavailable. Checked once per process."""
+    if shutil.which("node") is None:
+        return None
+    try:
+        result = subprocess.run(["node", "--version"], capture_output=True, text=True, timeout=5)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+class _NodeWorker:
+    """One long-lived `node` process and a thread reading its replies."""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            ["node", "-e", _RUNNER_JS],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", bufsize=1
+        )
+        self._replies: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        threading.Thread(target=self._read_replies, name="braid-node-reader", daemon=True).start()
+        self.ready = False
+        self.jobs = 0
+
+    def _read_replies(self) -> None:
+        for line in self.process.stdout:
+            with contextlib.suppress(ValueError):
+                self._replies.put(json.loads(line))
+        self._replies.put(None)
+
+    def _reply(self, timeout: float) -> Dict[str, Any]:
+        reply = self._replies.get(timeout=timeout)
+        if reply is None:
+            raise EOFError("Node worker exited")
+        return reply
+
+    def request(self, payload: str, timeout: float) -> Dict[str, Any]:
+        """Send one JSON-encoded job line and wait for its reply."""
+        if not self.ready:
+            self._reply(NodePool.STARTUP_TIMEOUT)
+            self.ready = True
+        self.jobs += 1
+        self.process.stdin.write(payload)
+        self.process.stdin.flush()
+        return self._reply(timeout)
+
+    def stop(self) -> None:
+        with contextlib.suppress(Exception):
+            self.process.stdin.close()
+            self.process.wait(1)
+        self.kill()
+
+    def kill(self) -> None:
+        with contextlib.suppress(Exception):
+            self.process.kill()
+            self.process.wait(1)
+
+
+class NodePool:
+    """
+    Small pool of warm Node.js workers, shared by all threads.
+
+    Workers start on first use. A worker is replaced after `max_jobs` jobs,
+    or immediately if it crashes or stops responding.
+    """
+
+    STARTUP_TIMEOUT = 15.0
+
+    def __init__(self, size: int = 2, max_jobs: int = 200):
+        self.size = max(size, 1)
+        self.max_jobs = max_jobs
+        self._idle: "queue.Queue[_NodeWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self._next_id = 0
+        self.stats_counters = {"jobs": 0, "timeouts": 0, "crashes": 0, "recycled": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats_counters[name] += 1
+
+    def start(self) -> None:
+        """Start all workers now rather than on first use."""
+        with self._lock:
+            if self._started:
+                return
+            workers = [_NodeWorker() for _ in range(self.size)]
+            self._started = True
+            self._closed = False
+        for worker in workers:
+            self._idle.put(worker)
+
+    def _release(self, worker: _NodeWorker) -> None:
+        if self._closed:
+            worker.stop()
+        elif worker.jobs >= self.max_jobs:
+            self._count("recycled")
+            worker.stop()
+            self._idle.put(_NodeWorker())
+        else:
+            self._idle.put(worker)
+
+    def _replace(self, worker: _NodeWorker) -> None:
+        worker.kill()
+        if not self._closed:
+            self._idle.put(_NodeWorker())
+
+    def run(self, code: str, context_vars: Optional[Dict[str, Any]] = None,
+            modules: Optional[List[str]] = None, timeout: float = 30) -> Dict[str, Any]:
+        """
+        Run a snippet and return {exit_code, stdout, stderr, timed_out, duration_ms}.
+
+        Raises:
+            EOFError: if the worker crashed while running the job
+        """
+        with self._lock:
+            self._next_id += 1
+            job_id = self._next_id
+        job = {"id": job_id, "code": code, "context_vars": context_vars or {},
+               "modules": modules or [], "timeout": timeout}
+        # Encoded before taking a worker, so a bad job cannot cost a healthy worker
+        try:
+            payload = json.dumps(job) + "\n"
+        except (TypeError, ValueError) as e:
+            return {"exit_code": 1, "stdout": "", "stderr": f"context_vars must be JSON-serializable: {str(e)}\n",
+                    "timed_out": False, "duration_ms": 0}
+        self.start()
+        worker = self._idle.get()
+        try:
+            self._count("jobs")
+            reply = worker.request(payload, timeout + KILL_GRACE_SECONDS)
+        except queue.Empty:
+            # The worker is stuck (e.g. a busy loop in async code); kill it
+            self._count("timeouts")
+            self._replace(worker)
+            return {"exit_code": 124, "stdout": "", "stderr": f"Timed out after {timeout} seconds\n",
+                    "timed_out": True, "duration_ms": int((timeout + KILL_GRACE_SECONDS) * 1000)}
+        except BaseException:
+            self._count("crashes")
+            self._replace(worker)
+            raise
+        self._release(worker)
+        if reply.get("timed_out"):
+            self._count("timeouts")
+        return reply
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool size, recycling threshold and job counters."""
+        with self._lock:
+            return {"workers": self.size, "max_jobs": self.max_jobs, **self.stats_counters}
+
+    def close(self) -> None:
+        """Stop all idle workers; busy ones stop when their current job returns."""
+        with self._lock:
+            self._closed = True
+            self._started = False
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+
+# Global instance used by the javascript_code tool
+node_pool = NodePool(
+    size=int(os.getenv("BRAID_NODE_WORKERS", "2")),
+    max_jobs=int(os.getenv("BRAID_NODE_MAX_JOBS", "200")),
+)
+
+atexit.register(node_pool.close)
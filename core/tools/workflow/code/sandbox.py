@@ -0,0 +1,340 @@
+"""
+Warm sandbox worker processes for the python_code tool.
+
+These are non-tool helper functions that an agent's own Python code can import
+and use directly. They are NOT exposed to the LLM as tools.
+
+Snippets run in a pool of long-lived worker processes instead of the agent's
+own process, so a CPU-heavy snippet cannot stall the caller and can be killed:
+
+- Workers start once, import the allowed modules up front and then serve
+  line-delimited JSON jobs over stdio, so each call costs one round trip
+  instead of interpreter setup.
+- Each job has a wall-clock timeout enforced by the parent (the worker is
+  killed and replaced) and a CPU-time rlimit enforced by the kernel.
+- Workers run under an address-space rlimit (memory cap).
+- Compiled code objects are cached in each worker by source hash.
+
+Configuration:
+- BRAID_SANDBOX_WORKERS: number of workers (default min(4, CPUs); 0 runs
+  snippets in-process without isolation or timeouts)
+- BRAID_SANDBOX_MEMORY_MB: memory cap per worker (default 512, 0 disables)
+- BRAID_SANDBOX_MODULES: extra modules to pre-import and expose, e.g.
+  "statistics,re"
+
+Workers are separate interpreters started from this file, which only uses
+the standard library, so they never re-run the agent's own main script.
+"""
+import atexit
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Builtins available to sandboxed code
+SAFE_BUILTINS = (
+    'len', 'str', 'int', 'float', 'bool', 'list', 'dict', 'tuple', 'set',
+    'min', 'max', 'sum', 'abs', 'round', 'sorted', 'reversed',
+    'enumerate', 'zip', 'range', 'print', 'type', 'isinstance',
+    'hasattr', 'getattr', 'setattr', 'delattr'
+)
+
+# Modules pre-imported in every worker and exposed to sandboxed code by name
+DEFAULT_MODULES = ("json", "math")
+
+# Compiled snippets kept per worker
+CODE_CACHE_SIZE = 256
+
+
+def _exposed_modules() -> List[str]:
+    extra = [m.strip() for m in os.getenv("BRAID_SANDBOX_MODULES", "").split(",") if m.strip()]
+    return list(DEFAULT_MODULES) + [m for m in extra if m not in DEFAULT_MODULES]
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert a value to what to_json would emit, so it can cross the pipe."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class _Executor:
+    """Runs snippets against the restricted globals; one per worker process."""
+
+    def __init__(self, modules: List[str]):
+        import builtins
+        self.builtins = {name: getattr(builtins, name) for name in SAFE_BUILTINS}
+        self.modules = {name: importlib.import_module(name) for name in modules}
+        self._code: "OrderedDict[str, Any]" = OrderedDict()
+        self.cache_hits = 0
+
+    def _compile(self, code: str) -> Any:
+        digest = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        compiled = self._code.get(digest)
+        if compiled is not None:
+            self._code.move_to_end(digest)
+            self.cache_hits += 1
+            return compiled
+        compiled = compile(code, "<python_code>", "exec")
+        self._code[digest] = compiled
+        if len(self._code) > CODE_CACHE_SIZE:
+            self._code.popitem(last=False)
+        return compiled
+
+    def run(self, code: str, context_vars: Optional[Dict[str, Any]], capture_output: bool) -> Dict[str, Any]:
+        """Execute `code` and return the result fields of the python_code tool."""
+        exec_globals: Dict[str, Any] = {'__builtins__': self.builtins, 'datetime': datetime}
+        exec_globals.update(self.modules)
+        if context_vars:
+            exec_globals.update(context_vars)
+        exec_locals: Dict[str, Any] = {}
+        stdout_capture, stderr_capture = io.StringIO(), io.StringIO()
+        try:
+            compiled = self._compile(code)
+            if capture_output:
+                with contextlib.redirect_stdout(stdout_capture), contextlib.redirect_stderr(stderr_capture):
+                    exec(compiled, exec_globals, exec_locals)
+            else:
+                exec(compiled, exec_globals, exec_locals)
+        except MemoryError:
+            return {
+                "success": False,
+                "error": "Python code exceeded the sandbox memory limit",
+                "error_type": "MemoryError",
+                "stdout": stdout_capture.getvalue(),
+                "stderr": stderr_capture.getvalue()
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Python code execution failed: {str(e)}",
+                "error_type": type(e).__name__,
+                "stdout": stdout_capture.getvalue(),
+                "stderr": stderr_capture.getvalue()
+            }
+        return {
+            "success": True,
+            "code_executed": True,
+            "stdout": stdout_capture.getvalue(),
+            "stderr": stderr_capture.getvalue(),
+            "return_value": _jsonable(exec_locals.get('__return__', None)),
+            "local_variables": _jsonable({k: v for k, v in exec_locals.items() if not k.startswith('__')})
+        }
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _worker_main(modules: List[str], memory_mb: int) -> None:
+    """Worker loop: read JSON jobs from stdin, write JSON results to stdout."""
+    # Keep the original stdout for the protocol; anything else printed goes to stderr
+    protocol_out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    if resource is not None and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    executor = _Executor(modules)
+
+    def send(message: Dict[str, Any]) -> None:
+        protocol_out.write(json.dumps(message).encode("utf-8") + b"\n")
+        protocol_out.flush()
+
+    send({"ready": True, "pid": os.getpid()})
+    for line in sys.stdin.buffer:
+        job = json.loads(line)
+        if resource is not None and job["cpu_limit"]:
+            # RLIMIT_CPU counts the whole process lifetime, so extend it from current usage
+            soft = int(_cpu_seconds() + job["cpu_limit"]) + 1
+            hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+            resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+        try:
+            result = executor.run(job["code"], job["context_vars"], job["capture_output"])
+        except MemoryError:
+            result = {"success": False, "error": "Python code exceeded the sandbox memory limit",
+                      "error_type": "MemoryError"}
+        except Exception as e:
+            result = {"success": False, "error": f"Python code results could not be returned: {str(e)}",
+                      "error_type": type(e).__name__}
+        result["compiled_cache_hits"] = executor.cache_hits
+        send(result)
+
+
+class _Worker:
+    """Parent-side handle for one worker process and its reply stream."""
+
+    def __init__(self, modules: List[str], memory_mb: int):
+        options = json.dumps({"modules": modules, "memory_mb": memory_mb})
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), options],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self._replies: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        threading.Thread(target=self._read_replies, name="braid-sandbox-reader", daemon=True).start()
+        self.ready = False
+        self.jobs = 0
+
+    def _read_replies(self) -> None:
+        for line in self.process.stdout:
+            self._replies.put(json.loads(line))
+        self._replies.put(None)
+
+    def _reply(self, timeout: float) -> Dict[str, Any]:
+        """Next reply; raises queue.Empty on timeout and EOFError if the worker exited."""
+        reply = self._replies.get(timeout=timeout)
+        if reply is None:
+            raise EOFError("Sandbox worker exited")
+        return reply
+
+    def request(self, payload: bytes, timeout: float) -> Dict[str, Any]:
+        """Send one JSON-encoded job line and wait for its reply."""
+        if not self.ready:
+            self._reply(SandboxPool.STARTUP_TIMEOUT)
+            self.ready = True
+        self.process.stdin.write(payload)
+        self.process.stdin.flush()
+        self.jobs += 1
+        return self._reply(timeout)
+
+    def stop(self) -> None:
+        """Ask the worker to exit by closing its input, killing it if it does not."""
+        with contextlib.suppress(Exception):
+            self.process.stdin.close()
+            self.process.wait(1)
+        self.kill()
+
+    def kill(self) -> None:
+        with contextlib.suppress(Exception):
+            self.process.kill()
+            self.process.wait(1)
+
+
+class SandboxPool:
+    """
+    Fixed-size pool of sandbox worker processes, shared by all threads.
+
+    Workers are started on first use (or by calling start()); a caller waits
+    for a free worker when all are busy. Workers that time out, exceed a
+    limit or crash are replaced.
+    """
+
+    STARTUP_TIMEOUT = 30.0
+
+    def __init__(self, size: int, memory_mb: int = 512, modules: Optional[List[str]] = None):
+        self.size = size
+        self.memory_mb = memory_mb
+        self.modules = modules if modules is not None else _exposed_modules()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self.stats_counters = {"jobs": 0, "timeouts": 0, "crashes": 0, "replaced": 0}
+        self._inline: Optional[_Executor] = None
+
+    def start(self) -> None:
+        """Start all workers now rather than on first use."""
+        with self._lock:
+            if self._started:
+                return
+            workers = [_Worker(self.modules, self.memory_mb) for _ in range(self.size)]
+            self._started = True
+            self._closed = False
+        for worker in workers:
+            self._idle.put(worker)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats_counters[name] += 1
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        self._count("replaced")
+        if not self._closed:
+            self._idle.put(_Worker(self.modules, self.memory_mb))
+
+    def run(self, code: str, context_vars: Optional[Dict[str, Any]] = None,
+            capture_output: bool = True, timeout: float = 30) -> Dict[str, Any]:
+        """Run a snippet in a worker and return its result dict."""
+        if self.size <= 0:
+            if self._inline is None:
+                self._inline = _Executor(self.modules)
+            return self._inline.run(code, context_vars, capture_output)
+
+        job = {"code": code, "context_vars": context_vars, "capture_output": capture_output,
+               "cpu_limit": timeout}
+        # Encoded before taking a worker, so a bad job cannot cost a healthy worker
+        try:
+            payload = json.dumps(job).encode("utf-8") + b"\n"
+        except (TypeError, ValueError) as e:
+            return {"success": False, "error": f"context_vars must be JSON-serializable: {str(e)}",
+                    "error_type": type(e).__name__}
+
+        self.start()
+        worker = self._idle.get()
+        try:
+            self._count("jobs")
+            result = worker.request(payload, timeout)
+        except queue.Empty:
+            self._count("timeouts")
+            self._replace(worker)
+            return {"success": False, "error": f"Python code timed out after {timeout} seconds",
+                    "error_type": "TimeoutError", "timeout_seconds": timeout}
+        except (EOFError, OSError) as e:
+            self._count("crashes")
+            self._replace(worker)
+            return {"success": False,
+                    "error": "Sandbox worker exited while running the code "
+                             f"(CPU or memory limit exceeded): {str(e)}",
+                    "error_type": "SandboxWorkerExited"}
+        except BaseException:
+            self._replace(worker)
+            raise
+        if self._closed:
+            worker.stop()
+        else:
+            self._idle.put(worker)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool size, limits and job/timeout/crash counters."""
+        with self._lock:
+            return {"workers": self.size, "memory_mb": self.memory_mb, "modules": self.modules,
+                    **self.stats_counters}
+
+    def close(self) -> None:
+        """Stop all workers; busy ones are stopped when their current job returns."""
+        with self._lock:
+            self._closed = True
+            self._started = False
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+
+# Global instance used by the python_code tool
+sandbox_pool = SandboxPool(
+    size=int(os.getenv("BRAID_SANDBOX_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    memory_mb=int(os.getenv("BRAID_SANDBOX_MEMORY_MB", "512")),
+)
+
+atexit.register(sandbox_pool.close)
+
+
+if __name__ == "__main__":
+    _options = json.loads(sys.argv[1])
+    _worker_main(_options["modules"], _options["memory_mb"])
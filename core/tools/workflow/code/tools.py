@@ -7,23 +7,23 @@ Tools:
 
 For sub-workflow execution, see workflow/execution/tools.py
 """
-import json
-import subprocess
-import tempfile
 import sys
-from pathlib import Path
 from typing import Optional, Dict, Any
 from datetime import datetime
 
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from ...utilities.output import to_json
+from .node_runner import node_pool, node_version
+from .sandbox import sandbox_pool
+
 # --- Input Schemas ---
 
 class PythonCodeInput(BaseModel):
     code: str = Field(description="Python code to execute")
     context_vars: Optional[Dict[str, Any]] = Field(default=None, description="Variables to make available in execution context")
-    timeout_seconds: int = Field(default=30, description="Maximum execution time")
+    timeout_seconds: int = Field(default=30, description="Maximum execution time in seconds (wall-clock and CPU)")
     capture_output: bool = Field(default=True, description="Whether to capture stdout/stderr")
 
 class JavaScriptCodeInput(BaseModel):
@@ -41,16 +41,17 @@ def python_code(code: str, context_vars: Optional[Dict[str, Any]] = None,
     Execute Python code with safety restrictions and context variables.
     
     Features:
-    - Isolated execution environment
+    - Isolated execution in a pool of warm sandbox worker processes
     - Context variable injection
     - Stdout/stderr capture
-    - Timeout protection
+    - Timeout protection (wall-clock and CPU) and a memory limit
     - Error handling and traceback capture
     
     Safety restrictions:
     - No file system access outside current directory
     - No network access (imports restricted)
-    - Limited execution time
+    - Limited execution time and memory
+    - Only json, math and datetime are available (no import statement)
     - No dangerous imports (os.system, subprocess, etc.)
     
     Returns JSON with execution results, output, and timing information.
@@ -67,89 +68,39 @@ def python_code(code: str, context_vars: Optional[Dict[str, Any]] = None,
         code_lower = code.lower()
         for dangerous in dangerous_imports:
             if dangerous in code_lower:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": f"Blocked dangerous operation: {dangerous}",
                     "safety_restriction": True,
                     "code_preview": code[:100] + "..." if len(code) > 100 else code
-                }, indent=2)
-        
-        # Create execution environment
-        exec_globals = {
-            '__builtins__': {
-                # Allow safe builtins only
-                'len', 'str', 'int', 'float', 'bool', 'list', 'dict', 'tuple', 'set',
-                'min', 'max', 'sum', 'abs', 'round', 'sorted', 'reversed',
-                'enumerate', 'zip', 'range', 'print', 'type', 'isinstance',
-                'hasattr', 'getattr', 'setattr', 'delattr'
-            },
-            'json': json,
-            'datetime': datetime,
-            'math': None,  # Will import if needed
-        }
+                })
         
-        # Add context variables if provided
-        if context_vars:
-            exec_globals.update(context_vars)
-        
-        # Import math if used
-        if 'math.' in code:
-            import math
-            exec_globals['math'] = math
-        
-        exec_locals = {}
-        
-        # Capture output if requested
-        if capture_output:
-            from io import StringIO
-            import contextlib
-            
-            stdout_capture = StringIO()
-            stderr_capture = StringIO()
-            
-            with contextlib.redirect_stdout(stdout_capture), contextlib.redirect_stderr(stderr_capture):
-                # Execute the code
-                exec(code, exec_globals, exec_locals)
-            
-            stdout_output = stdout_capture.getvalue()
-            stderr_output = stderr_capture.getvalue()
-        else:
-            # Execute without capture
-            exec(code, exec_globals, exec_locals)
-            stdout_output = ""
-            stderr_output = ""
+        # Run in a warm sandbox worker (timeout, CPU and memory limits enforced there)
+        result = sandbox_pool.run(code, context_vars, capture_output, timeout_seconds)
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
-        # Extract return value if any
-        return_value = exec_locals.get('__return__', None)
-        
-        result = {
-            "success": True,
-            "code_executed": True,
-            "stdout": stdout_output,
-            "stderr": stderr_output,
-            "return_value": return_value,
-            "local_variables": {k: v for k, v in exec_locals.items() if not k.startswith('__')},
-            "duration_seconds": duration,
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat()
-        }
+        result["duration_seconds"] = duration
+        if result["success"]:
+            result["start_time"] = start_time.isoformat()
+            result["end_time"] = end_time.isoformat()
+        else:
+            result["code_preview"] = code[:200] + "..." if len(code) > 200 else code
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Python code execution failed: {str(e)}",
             "error_type": type(e).__name__,
             "duration_seconds": duration,
             "code_preview": code[:200] + "..." if len(code) > 200 else code
-        }, indent=2)
+        })
 
 @tool("javascript_code", args_schema=JavaScriptCodeInput)
 def javascript_code(code: str, context_vars: Optional[Dict[str, Any]] = None,
@@ -158,7 +109,8 @@ def javascript_code(code: str, context_vars: Optional[Dict[str, Any]] = None,
     Execute JavaScript code via Node.js with context variables and module support.
     
     Features:
-    - Node.js execution environment
+    - Node.js execution environment on warm, recycled workers (see node_runner.py)
+    - Fresh vm context per call, so globals never leak between calls
     - Context variable injection as global variables
     - NPM module imports
     - Stdout/stderr capture
@@ -174,105 +126,69 @@ def javascript_code(code: str, context_vars: Optional[Dict[str, Any]] = None,
     start_time = datetime.now()
     
     try:
-        # Check if Node.js is available
-        try:
-            node_version = subprocess.run(['node', '--version'], capture_output=True, text=True, timeout=5)
-            if node_version.returncode != 0:
-                return json.dumps({
-                    "success": False,
-                    "error": "Node.js is not available. Please install Node.js to use JavaScript execution.",
-                    "requirement": "Node.js"
-                }, indent=2)
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return json.dumps({
+        # Check if Node.js is available (cached for the life of the process)
+        version = node_version()
+        if version is None:
+            return to_json({
                 "success": False,
                 "error": "Node.js is not available. Please install Node.js to use JavaScript execution.",
                 "requirement": "Node.js"
-            }, indent=2)
-        
-        # Build the JavaScript code with context and modules
-        js_code_parts = []
+            })
         
-        # Add context variables as globals
-        if context_vars:
-            for key, value in context_vars.items():
-                js_value = json.dumps(value, default=str)
-                js_code_parts.append(f"global.{key} = {js_value};")
-        
-        # Add module requires
         if node_modules:
             for module in node_modules:
                 # Sanitize module name
                 if not module.replace('-', '').replace('_', '').isalnum():
-                    return json.dumps({
+                    return to_json({
                         "success": False,
                         "error": f"Invalid module name: {module}",
                         "safety_restriction": True
-                    }, indent=2)
-                js_code_parts.append(f"const {module.replace('-', '_')} = require('{module}');")
-        
-        # Add the user code
-        js_code_parts.append(code)
+                    })
         
-        full_js_code = '\\n'.join(js_code_parts)
+        # Run on a warm Node.js worker; context vars and modules become globals
+        result = node_pool.run(code, context_vars, node_modules, timeout_seconds)
         
-        # Create a temporary file for the JavaScript code
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-            temp_file.write(full_js_code)
-            temp_file_path = temp_file.name
+        end_time = datetime.now()
+        duration = (end_time - start_time).total_seconds()
         
-        try:
-            # Execute the JavaScript code
-            result = subprocess.run([
-                'node', temp_file_path
-            ], capture_output=True, text=True, timeout=timeout_seconds)
-            
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
-            # Clean up temp file
-            Path(temp_file_path).unlink()
-            
-            # Parse the result
-            execution_result = {
-                "success": result.returncode == 0,
-                "return_code": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "duration_seconds": duration,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "node_version": node_version.stdout.strip(),
-                "context_vars_provided": list(context_vars.keys()) if context_vars else [],
-                "modules_required": node_modules or []
-            }
-            
-            if result.returncode != 0:
-                execution_result["error"] = f"JavaScript execution failed with exit code {result.returncode}"
-            
-            return json.dumps(execution_result, indent=2, default=str)
-            
-        except subprocess.TimeoutExpired:
-            # Clean up temp file
-            Path(temp_file_path).unlink()
-            
-            return json.dumps({
+        if result.get("timed_out"):
+            return to_json({
                 "success": False,
                 "error": f"JavaScript execution timed out after {timeout_seconds} seconds",
                 "timeout_seconds": timeout_seconds,
-                "duration_seconds": timeout_seconds
-            }, indent=2)
+                "duration_seconds": duration,
+                "stdout": result["stdout"],
+                "stderr": result["stderr"]
+            })
+        
+        execution_result = {
+            "success": result["exit_code"] == 0,
+            "return_code": result["exit_code"],
+            "stdout": result["stdout"],
+            "stderr": result["stderr"],
+            "duration_seconds": duration,
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+            "node_version": version,
+            "context_vars_provided": list(context_vars.keys()) if context_vars else [],
+            "modules_required": node_modules or []
+        }
+        
+        if result["exit_code"] != 0:
+            execution_result["error"] = f"JavaScript execution failed with exit code {result['exit_code']}"
+        
+        return to_json(execution_result)
             
     except Exception as e:
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"JavaScript code execution failed: {str(e)}",
             "duration_seconds": duration,
             "code_preview": code[:200] + "..." if len(code) > 200 else code
-        }, indent=2)
+        })
 
 # --- Tool Aggregator ---
 
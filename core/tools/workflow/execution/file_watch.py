@@ -0,0 +1,222 @@
+"""
+Event-driven waiting for files to appear, used by workflow_wait.
+
+These are non-tool helper functions that an agent's own Python code can import
+and use directly. They are NOT exposed to the LLM as tools.
+
+On Linux the nearest existing directory on the way to the file is watched with
+inotify (through libc, no extra dependency), so a wait finishes within
+milliseconds of the file being created or moved into place instead of up to
+`check_interval` seconds late. If the directory leading to the file does not
+exist yet, the closest existing ancestor is watched and the watch moves down
+as directories are created.
+
+Where inotify is unavailable (other platforms, or the watch limit is reached)
+the wait falls back to polling. Even with inotify, the file is re-checked every
+`poll_interval` seconds, because network filesystems do not report remote
+changes.
+
+async_wait_for_file() does the same without blocking a thread: the inotify
+descriptor is registered with the running asyncio event loop.
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# inotify event masks (linux/inotify.h)
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = IN_CREATE | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+
+_libc: Optional[ctypes.CDLL] = None
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _libc.inotify_init1  # noqa: B018 - raises AttributeError on libcs without inotify
+    except (OSError, AttributeError):
+        _libc = None
+
+
+def inotify_available() -> bool:
+    """True if this platform supports inotify."""
+    return _libc is not None
+
+
+class _Inotify:
+    """A non-blocking inotify descriptor with at most one directory watch."""
+
+    def __init__(self):
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = fd
+        self._wd: Optional[int] = None
+
+    def watch(self, directory: Path) -> None:
+        """Watch `directory` for new entries, replacing the previous watch."""
+        if self._wd is not None:
+            _libc.inotify_rm_watch(self.fd, self._wd)
+            self._wd = None
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, f"inotify_add_watch failed: {os.strerror(code)}")
+        self._wd = wd
+
+    def drain(self) -> int:
+        """Discard pending events and return how many bytes were read."""
+        total = 0
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return total
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            if not data:
+                return total
+            total += len(data)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _nearest_directory(path: Path) -> Path:
+    """The closest existing directory on the way to `path`."""
+    directory = path.parent
+    while not directory.is_dir() and directory != directory.parent:
+        directory = directory.parent
+    return directory
+
+
+class FileWatch:
+    """
+    Waits for a path to exist. Use as a context manager, then call wait() or
+    await async_wait().
+
+    `method` is "inotify" or "polling"; `checks` counts existence checks.
+    """
+
+    def __init__(self, path: Union[str, Path], poll_interval: float = 5.0):
+        self.path = Path(path)
+        self.poll_interval = max(poll_interval, 0.01)
+        self.checks = 0
+        self._watched: Optional[Path] = None
+        self._inotify: Optional[_Inotify] = None
+        if inotify_available():
+            try:
+                self._inotify = _Inotify()
+            except OSError:
+                self._inotify = None
+
+    @property
+    def method(self) -> str:
+        return "inotify" if self._inotify is not None else "polling"
+
+    def _fall_back_to_polling(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def check(self) -> bool:
+        """Re-arm the watch if needed, then check whether the file exists."""
+        self.checks += 1
+        if self._inotify is not None:
+            # Arm before checking so a file created in between is not missed
+            self._inotify.drain()
+            directory = _nearest_directory(self.path)
+            if directory != self._watched:
+                try:
+                    self._inotify.watch(directory)
+                    self._watched = directory
+                except OSError:
+                    # e.g. ENOSPC when fs.inotify.max_user_watches is exhausted
+                    self._fall_back_to_polling()
+        return self.path.exists()
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the file exists or `timeout` seconds pass. Returns whether it was found."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.check():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            delay = min(remaining, self.poll_interval)
+            if self._inotify is not None:
+                select.select([self._inotify.fd], [], [], delay)
+            else:
+                time.sleep(delay)
+
+    async def async_wait(self, timeout: float) -> bool:
+        """Like wait(), but suspends the coroutine instead of blocking a thread."""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        reader_fd = None
+        if self._inotify is not None:
+            reader_fd = self._inotify.fd
+            loop.add_reader(reader_fd, ready.set)
+        try:
+            deadline = loop.time() + timeout
+            while True:
+                ready.clear()
+                if self.check():
+                    return True
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                if self._inotify is None and reader_fd is not None:
+                    # Switched to polling: stop watching the closed descriptor
+                    loop.remove_reader(reader_fd)
+                    reader_fd = None
+                try:
+                    await asyncio.wait_for(ready.wait(), min(remaining, self.poll_interval))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if reader_fd is not None:
+                loop.remove_reader(reader_fd)
+
+    def close(self) -> None:
+        self._fall_back_to_polling()
+
+    def __enter__(self) -> "FileWatch":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def wait_for_file(path: Union[str, Path], timeout: float, poll_interval: float = 5.0) -> Dict[str, Any]:
+    """
+    Block until `path` exists or `timeout` seconds pass.
+
+    Returns:
+        Dict with "found", "method" ("inotify" or "polling") and "checks"
+    """
+    with FileWatch(path, poll_interval) as watch:
+        found = watch.wait(timeout)
+        return {"found": found, "method": watch.method, "checks": watch.checks}
+
+
+async def async_wait_for_file(path: Union[str, Path], timeout: float,
+                              poll_interval: float = 5.0) -> Dict[str, Any]:
+    """Asyncio version of wait_for_file()."""
+    with FileWatch(path, poll_interval) as watch:
+        found = await watch.async_wait(timeout)
+        return {"found": found, "method": watch.method, "checks": watch.checks}
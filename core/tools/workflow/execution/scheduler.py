@@ -0,0 +1,394 @@
+"""
+Durable scheduled resumes for long workflow_wait delays.
+
+These are non-tool helpers. A graph that has to wait a long time should not
+hold a thread (or even a coroutine) for the whole delay. Instead workflow_wait
+records a wake-up time here and interrupts the graph, which checkpoints its
+state with the graph's checkpointer. When the time comes, the scheduler
+resumes the graph thread with Command(resume=...).
+
+- Pending wake-ups are stored in SQLite (BRAID_SCHEDULE_PATH, default
+  ~/.cache/braid/schedule.sqlite3), so they survive restarts.
+- Several processes (server workers, tool processes) may share the file.
+  Each due wake-up is claimed with one conditional UPDATE before it fires,
+  so exactly one process resumes the graph. A claim left by a process that
+  died mid-resume is given up after CLAIM_TIMEOUT_SECONDS.
+- One daemon thread drives a hashed timer wheel for every pending wake-up,
+  so the cost of a wait does not depend on its length.
+- Graphs are resumed on a small thread pool, so one slow resume does not
+  delay the others.
+
+The application registers its compiled graphs at startup:
+
+    from core.tools.workflow.execution.scheduler import resume_scheduler
+    resume_scheduler.register_graph(graph)            # graph_id "default"
+    resume_scheduler.register_graph(other, "billing")
+
+The graph must be compiled with a checkpointer (see core/memory.py) and run
+with a thread_id. Requires langgraph>=0.2.57 for interrupt() and Command.
+"""
+import asyncio
+import atexit
+import json
+import logging
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from .subgraphs import has_async_nodes
+
+try:
+    from langgraph.types import Command
+except ImportError:
+    Command = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds between resume attempts when resuming a graph fails
+RETRY_DELAY_SECONDS = 60
+MAX_ATTEMPTS = 5
+# A claimed wake-up whose resume has not finished by then can be claimed again
+CLAIM_TIMEOUT_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled_resumes (
+    key TEXT PRIMARY KEY,
+    graph_id TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    resume_at REAL NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    claimed_at REAL
+);
+"""
+
+_COLUMNS = "key, graph_id, thread_id, checkpoint_ns, resume_at, payload, attempts"
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel.
+
+    Insert and cancel are O(1); each tick scans one slot. Entries further
+    away than one revolution stay in their slot until their tick comes round.
+    Not thread-safe; the owner serialises access.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self._slots: List[Dict[Hashable, Tuple[int, Any]]] = [{} for _ in range(slots)]
+        self._where: Dict[Hashable, int] = {}
+        self._last_tick = math.floor(time.time() / tick)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def add(self, key: Hashable, due: float, item: Any) -> None:
+        """Schedule `item` for wall-clock time `due`, replacing any entry with the same key."""
+        self.cancel(key)
+        # Overdue entries fire on the next tick
+        due_tick = max(math.ceil(due / self.tick), self._last_tick + 1)
+        slot = due_tick % len(self._slots)
+        self._slots[slot][key] = (due_tick, item)
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        self._slots[slot].pop(key, None)
+        return True
+
+    def advance(self, now: float) -> List[Tuple[Hashable, Any]]:
+        """Move the wheel to `now` and return the (key, item) pairs that became due."""
+        now_tick = math.floor(now / self.tick)
+        if now_tick <= self._last_tick:
+            return []
+        # After a long stall every slot is visited at most once
+        ticks = range(self._last_tick + 1, now_tick + 1)
+        slots = range(len(self._slots)) if len(ticks) >= len(self._slots) else (t % len(self._slots) for t in ticks)
+        due: List[Tuple[Hashable, Any]] = []
+        for slot in slots:
+            bucket = self._slots[slot]
+            for key in [k for k, (t, _) in bucket.items() if t <= now_tick]:
+                due.append((key, bucket.pop(key)[1]))
+                del self._where[key]
+        self._last_tick = now_tick
+        return due
+
+
+class ResumeScheduler:
+    """Persists wake-up times and resumes interrupted graph threads when they are due."""
+
+    def __init__(self, path: Path, tick: float = 1.0, workers: int = 4):
+        self.path = path
+        self.tick = tick
+        self.workers = workers
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wheel = TimerWheel(tick)
+        self._graphs: Dict[str, Any] = {}
+        self._handler: Optional[Callable[[Dict[str, Any]], Any]] = None
+        self._listeners: List[Callable[[Dict[str, Any], Any, Optional[BaseException]], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stop = threading.Event()
+        # Identifies this process's claims in the shared database
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Keys whose wake-up is being delivered and not yet picked up by the interrupted node
+        self._resuming: Set[str] = set()
+        self.resumed = 0
+        self.failures = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database on first use. Caller holds the lock."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(scheduled_resumes)")}
+            if "owner" not in columns:
+                # Schedule files written before wake-ups were claimed
+                conn.execute("ALTER TABLE scheduled_resumes ADD COLUMN owner TEXT")
+                conn.execute("ALTER TABLE scheduled_resumes ADD COLUMN claimed_at REAL")
+                conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def register_graph(self, graph: Any, graph_id: str = "default") -> None:
+        """Make `graph` resumable under `graph_id` and start the scheduler."""
+        with self._lock:
+            self._graphs[graph_id] = graph
+        self.start()
+
+    def set_resume_handler(self, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """Replace the default resume (graph.invoke(Command(resume=payload))) with `handler(entry)`."""
+        self._handler = handler
+
+    def add_listener(self, listener: Callable[[Dict[str, Any], Any, Optional[BaseException]], None]) -> None:
+        """
+        Call `listener(entry, result, error)` on the resume thread once a wake-up is done.
+
+        `result` is what the resume returned; the default resume returns
+        {"values": final state, "interrupted": whether the graph stopped at
+        another interrupt}. `error` is set instead when the last attempt failed.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any], Any, Optional[BaseException]], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def can_resume(self, graph_id: str = "default") -> bool:
+        """True if a wake-up for `graph_id` would be delivered by this process."""
+        return self._handler is not None or (Command is not None and graph_id in self._graphs)
+
+    def start(self) -> None:
+        """Load pending wake-ups from disk and start the timer thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            for row in self._db().execute(f"SELECT {_COLUMNS}, claimed_at FROM scheduled_resumes"):
+                entry = self._entry(row[:-1])
+                # Claimed wake-ups are looked at again once the claim times out
+                due = entry["resume_at"] if row[-1] is None else max(entry["resume_at"],
+                                                                      row[-1] + CLAIM_TIMEOUT_SECONDS)
+                self._wheel.add(entry["key"], due, entry)
+            self._stop.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="braid-resume")
+            self._thread = threading.Thread(target=self._run, name="braid-resume-scheduler", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _entry(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        key, graph_id, thread_id, checkpoint_ns, resume_at, payload, attempts = row
+        return {"key": key, "graph_id": graph_id, "thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                "resume_at": resume_at, "payload": json.loads(payload), "attempts": attempts}
+
+    @staticmethod
+    def key(thread_id: str, graph_id: str = "default", checkpoint_ns: str = "") -> str:
+        """The key of the wake-up for a graph thread and namespace."""
+        return f"{graph_id}:{thread_id}:{checkpoint_ns}"
+
+    def schedule(self, thread_id: str, resume_at: float, payload: Dict[str, Any],
+                 graph_id: str = "default", checkpoint_ns: str = "") -> str:
+        """
+        Resume `thread_id` at wall-clock time `resume_at` with `payload`.
+
+        Scheduling the same thread and namespace again replaces the earlier
+        wake-up, so re-running an interrupted node is harmless.
+        """
+        entry = {"key": self.key(thread_id, graph_id, checkpoint_ns), "graph_id": graph_id,
+                 "thread_id": str(thread_id), "checkpoint_ns": checkpoint_ns,
+                 "resume_at": resume_at, "payload": payload, "attempts": 0}
+        self._store(entry)
+        self.start()
+        return entry["key"]
+
+    def _store(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                f"INSERT OR REPLACE INTO scheduled_resumes ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry["key"], entry["graph_id"], entry["thread_id"], entry["checkpoint_ns"],
+                 entry["resume_at"], json.dumps(entry["payload"], default=str), entry["attempts"])
+            )
+            db.commit()
+            self._wheel.add(entry["key"], entry["resume_at"], entry)
+
+    def cancel(self, key: str) -> bool:
+        """Drop a pending wake-up. Returns whether one existed."""
+        with self._lock:
+            db = self._db()
+            deleted = db.execute("DELETE FROM scheduled_resumes WHERE key = ?", (key,)).rowcount
+            db.commit()
+            self._wheel.cancel(key)
+        return bool(deleted)
+
+    def take_resuming(self, key: str) -> bool:
+        """
+        True once per delivered wake-up, when asked for the key being resumed.
+
+        The interrupted node runs again on resume; this tells it apart from a
+        later wait in the same node, which has to schedule a new wake-up.
+        """
+        with self._lock:
+            if key in self._resuming:
+                self._resuming.discard(key)
+                return True
+        return False
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """All wake-ups that have not fired yet, soonest first."""
+        with self._lock:
+            rows = self._db().execute(f"SELECT {_COLUMNS} FROM scheduled_resumes ORDER BY resume_at").fetchall()
+        return [self._entry(row) for row in rows]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.tick):
+            with self._lock:
+                due = self._wheel.advance(time.time())
+            for _, entry in due:
+                # Wake-ups for graphs registered in another process are left to that process
+                if self.can_resume(entry["graph_id"]) and self._claim(entry):
+                    self._executor.submit(self._fire, entry)
+
+    def _claim(self, entry: Dict[str, Any]) -> bool:
+        """
+        Mark a due wake-up as taken by this process. False if another process
+        has it, or it was cancelled or rescheduled since it was loaded.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            claimed = db.execute(
+                "UPDATE scheduled_resumes SET owner = ?, claimed_at = ? "
+                "WHERE key = ? AND resume_at = ? AND (owner IS NULL OR claimed_at < ?)",
+                (self.owner, now, entry["key"], entry["resume_at"], now - CLAIM_TIMEOUT_SECONDS)
+            ).rowcount
+            db.commit()
+        return bool(claimed)
+
+    def _resume_graph(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        if Command is None:
+            raise RuntimeError("Durable waits require langgraph>=0.2.57")
+        graph = self._graphs.get(entry["graph_id"])
+        if graph is None:
+            raise LookupError(f"No graph registered as {entry['graph_id']!r}; call register_graph()")
+        # Resuming from the root of the thread also resumes interrupted subgraphs
+        command = Command(resume=entry["payload"])
+        # graph_id is passed on so the resumed workflow_wait finds this graph again
+        config = {"configurable": {"thread_id": entry["thread_id"], "graph_id": entry["graph_id"]}}
+        if has_async_nodes(graph):
+            async def resume() -> Any:
+                await graph.ainvoke(command, config)
+                return await graph.aget_state(config)
+
+            state = asyncio.run(resume())
+        else:
+            graph.invoke(command, config)
+            state = graph.get_state(config)
+        # Pending nodes mean the graph stopped at another interrupt
+        return {"values": state.values, "interrupted": bool(state.next)}
+
+    def _fire(self, entry: Dict[str, Any]) -> None:
+        handler = self._handler or self._resume_graph
+        payload = dict(entry["payload"], resumed_at=time.time())
+        result, error = None, None
+        with self._lock:
+            self._resuming.add(entry["key"])
+        try:
+            result = handler(dict(entry, payload=payload))
+        except Exception as e:
+            self.failures += 1
+            attempts = entry["attempts"] + 1
+            logger.exception("Resuming thread %s failed (attempt %d)", entry["thread_id"], attempts)
+            if attempts < MAX_ATTEMPTS and not self._stop.is_set():
+                self._store(dict(entry, resume_at=time.time() + RETRY_DELAY_SECONDS, attempts=attempts))
+                return
+            error = e
+        else:
+            self.resumed += 1
+        finally:
+            with self._lock:
+                self._resuming.discard(entry["key"])
+        # The row stays until the resume is done, so a crash mid-resume retries on restart.
+        # Only this wake-up is removed; the resumed graph may already have scheduled another.
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM scheduled_resumes WHERE key = ? AND resume_at = ? AND owner = ?",
+                       (entry["key"], entry["resume_at"], self.owner))
+            db.commit()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(entry, result, error)
+            except Exception:
+                logger.exception("Resume listener failed for thread %s", entry["thread_id"])
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pending wake-ups, registered graphs and resume counters."""
+        with self._lock:
+            return {
+                "pending": len(self._wheel),
+                "graphs": sorted(self._graphs),
+                "running": self._thread is not None,
+                "resumed": self.resumed,
+                "failures": self.failures
+            }
+
+    def close(self) -> None:
+        """Stop the timer thread. Pending wake-ups stay on disk for the next start()."""
+        self._stop.set()
+        with self._lock:
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        if thread is not None:
+            thread.join(self.tick * 2)
+        if executor is not None:
+            executor.shutdown(wait=False)
+        with self._lock:
+            self._wheel = TimerWheel(self.tick)
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global instance used by workflow_wait
+resume_scheduler = ResumeScheduler(
+    Path(os.getenv("BRAID_SCHEDULE_PATH", Path.home() / ".cache" / "braid" / "schedule.sqlite3"))
+)
+
+atexit.register(resume_scheduler.close)
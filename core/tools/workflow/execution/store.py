@@ -0,0 +1,385 @@
+"""
+Storage backends for the execution_data tools.
+
+These are non-tool helpers. execution_data used to keep every entry in a
+module-level dict that grew without limit and was lost on restart. Entries now
+go to one of:
+
+- "memory": a ring buffer capped at BRAID_EXECUTION_STORE_MAX_ENTRIES entries
+  (default 10000); the oldest entries are dropped first.
+- "sqlite": a SQLite database in WAL mode at BRAID_EXECUTION_STORE_PATH
+  (default ~/.cache/braid/execution_data.sqlite3).
+- "postgres": the database at BRAID_EXECUTION_STORE_DSN (or DATABASE_URL);
+  requires psycopg (pip install ".[postgres]").
+
+Select one with BRAID_EXECUTION_STORE (default "memory").
+
+The database backends write in batches from a background thread, so storing an
+entry never waits on disk or network: a batch is written when it reaches
+`batch_size` entries or after `flush_interval` seconds. Queries flush pending
+writes first. Entries are keyed by (data_type, key); storing the same key again
+replaces the entry. data_type, tags and timestamp are indexed for queries.
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 0.5
+MAX_QUERY_LIMIT = 1000
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS execution_data (
+    data_type TEXT NOT NULL,
+    key TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    description TEXT,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (data_type, key)
+);
+CREATE INDEX IF NOT EXISTS execution_data_timestamp ON execution_data (timestamp);
+CREATE TABLE IF NOT EXISTS execution_data_tags (
+    data_type TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (data_type, key, tag)
+);
+CREATE INDEX IF NOT EXISTS execution_data_tags_tag ON execution_data_tags (tag);
+"""
+
+_POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS execution_data (
+    data_type TEXT NOT NULL,
+    key TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    value JSONB NOT NULL,
+    tags TEXT[] NOT NULL DEFAULT '{}',
+    description TEXT,
+    timestamp TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (data_type, key)
+);
+CREATE INDEX IF NOT EXISTS execution_data_timestamp ON execution_data (timestamp);
+CREATE INDEX IF NOT EXISTS execution_data_tags ON execution_data USING GIN (tags);
+"""
+
+
+def _matches(entry: Dict[str, Any], data_type: Optional[str], key: Optional[str], tag: Optional[str],
+             since: Optional[float], until: Optional[float]) -> bool:
+    return ((data_type is None or entry["data_type"] == data_type)
+            and (key is None or entry["key"] == key)
+            and (tag is None or tag in entry["tags"])
+            and (since is None or entry["timestamp"] >= since)
+            and (until is None or entry["timestamp"] <= until))
+
+
+class MemoryStore:
+    """Bounded in-process store; the least recently written entries are evicted first."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def put(self, entry: Dict[str, Any]) -> None:
+        """Store an entry (see execution_data for its fields)."""
+        ident = (entry["data_type"], entry["key"])
+        with self._lock:
+            if self._entries.pop(ident, None) is None:
+                self._counts[entry["data_type"]] = self._counts.get(entry["data_type"], 0) + 1
+            self._entries[ident] = entry
+            while len(self._entries) > self.max_entries:
+                (old_type, _), _ = self._entries.popitem(last=False)
+                self._counts[old_type] -= 1
+                self.evicted += 1
+
+    def count(self, data_type: str) -> int:
+        with self._lock:
+            return self._counts.get(data_type, 0)
+
+    def query(self, data_type: Optional[str] = None, key: Optional[str] = None, tag: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              limit: int = 100) -> List[Dict[str, Any]]:
+        """Entries matching every given filter, newest first."""
+        with self._lock:
+            entries = list(self._entries.values())
+        matched = [e for e in entries if _matches(e, data_type, key, tag, since, until)]
+        matched.sort(key=lambda e: e["timestamp"], reverse=True)
+        return [dict(e) for e in matched[:limit]]
+
+    def flush(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": self.backend, "entries": len(self._entries), "max_entries": self.max_entries,
+                    "evicted": self.evicted}
+
+    def close(self) -> None:
+        pass
+
+
+class _BatchedStore:
+    """
+    Base for database backends: put() queues the entry and a writer thread
+    stores queued entries in batches. Subclasses implement _connect(),
+    _write(conn, entries), _count(conn, data_type) and _query(conn, ...).
+    """
+
+    backend = ""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self._pending: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._counts: Dict[str, int] = {}
+        self._conn: Any = None
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+
+    def _db(self) -> Any:
+        """Open the connection on first use. Caller holds _db_lock."""
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _start(self) -> None:
+        """Start the writer thread. Caller holds _lock."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name=f"braid-{self.backend}-writer", daemon=True)
+            self._thread.start()
+
+    def put(self, entry: Dict[str, Any]) -> None:
+        """Queue an entry for the next batch."""
+        with self._lock:
+            self._pending[(entry["data_type"], entry["key"])] = entry
+            self._start()
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def _writer(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # The batch was put back; it is retried on the next interval
+                logger.exception("Writing execution data to %s failed", self.backend)
+
+    def flush(self) -> None:
+        """Write every queued entry now."""
+        with self._db_lock:
+            with self._lock:
+                batch = list(self._pending.values())
+                self._pending.clear()
+            if not batch:
+                return
+            try:
+                conn = self._db()
+                self._write(conn, batch)
+                for data_type in {entry["data_type"] for entry in batch}:
+                    self._counts[data_type] = self._count(conn, data_type)
+            except Exception:
+                self.write_errors += 1
+                with self._lock:
+                    # Keep newer entries written while this batch was in flight
+                    for entry in batch:
+                        self._pending.setdefault((entry["data_type"], entry["key"]), entry)
+                raise
+            self.written += len(batch)
+            self.batches += 1
+
+    def count(self, data_type: str) -> int:
+        """Stored entries of `data_type`; queued entries count until written, so this may overcount."""
+        with self._lock:
+            pending = sum(1 for dt, _ in self._pending if dt == data_type)
+        if data_type not in self._counts:
+            # Entries from earlier runs; counted once, then kept current by flush()
+            with self._db_lock:
+                self._counts[data_type] = self._count(self._db(), data_type)
+        return self._counts[data_type] + pending
+
+    def query(self, data_type: Optional[str] = None, key: Optional[str] = None, tag: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              limit: int = 100) -> List[Dict[str, Any]]:
+        """Entries matching every given filter, newest first."""
+        self.flush()
+        with self._db_lock:
+            return self._query(self._db(), data_type, key, tag, since, until, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {"backend": self.backend, "pending": pending, "written": self.written,
+                "batches": self.batches, "write_errors": self.write_errors}
+
+    def close(self) -> None:
+        """Write queued entries and close the connection."""
+        self._closed = True
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Writing execution data to %s on close failed", self.backend)
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SQLiteStore(_BatchedStore):
+    """Entries in a local SQLite database (WAL mode)."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: Path, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SQLITE_SCHEMA)
+        return conn
+
+    def _write(self, conn: sqlite3.Connection, entries: List[Dict[str, Any]]) -> None:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO execution_data VALUES (?, ?, ?, ?, ?, ?)",
+                [(e["data_type"], e["key"], e["entry_id"], json.dumps(e["value"], default=str),
+                  e["description"], e["timestamp"]) for e in entries]
+            )
+            conn.executemany("DELETE FROM execution_data_tags WHERE data_type = ? AND key = ?",
+                             [(e["data_type"], e["key"]) for e in entries])
+            conn.executemany("INSERT OR IGNORE INTO execution_data_tags VALUES (?, ?, ?)",
+                             [(e["data_type"], e["key"], tag) for e in entries for tag in e["tags"]])
+
+    def _count(self, conn: sqlite3.Connection, data_type: str) -> int:
+        return conn.execute("SELECT COUNT(*) FROM execution_data WHERE data_type = ?", (data_type,)).fetchone()[0]
+
+    def _query(self, conn: sqlite3.Connection, data_type: Optional[str], key: Optional[str], tag: Optional[str],
+               since: Optional[float], until: Optional[float], limit: int) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        for column, value in (("d.data_type = ?", data_type), ("d.key = ?", key),
+                              ("d.timestamp >= ?", since), ("d.timestamp <= ?", until)):
+            if value is not None:
+                clauses.append(column)
+                params.append(value)
+        if tag is not None:
+            clauses.append("EXISTS (SELECT 1 FROM execution_data_tags t "
+                           "WHERE t.data_type = d.data_type AND t.key = d.key AND t.tag = ?)")
+            params.append(tag)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = conn.execute(
+            "SELECT d.data_type, d.key, d.entry_id, d.value, d.description, d.timestamp, "
+            "(SELECT json_group_array(tag) FROM execution_data_tags t WHERE t.data_type = d.data_type AND t.key = d.key) "
+            f"FROM execution_data d {where} ORDER BY d.timestamp DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [{"data_type": r[0], "key": r[1], "entry_id": r[2], "value": json.loads(r[3]),
+                 "description": r[4], "timestamp": r[5], "tags": json.loads(r[6])} for r in rows]
+
+
+class PostgresStore(_BatchedStore):
+    """Entries in a PostgreSQL table, with a GIN index on tags."""
+
+    backend = "postgres"
+
+    def __init__(self, dsn: str, **kwargs: Any):
+        if psycopg is None:
+            raise ImportError('psycopg is not installed. Install with: pip install ".[postgres]"')
+        super().__init__(**kwargs)
+        self.dsn = dsn
+
+    def _connect(self) -> Any:
+        conn = psycopg.connect(self.dsn, autocommit=True)
+        with conn.transaction():
+            conn.execute(_POSTGRES_SCHEMA)
+        return conn
+
+    def _write(self, conn: Any, entries: List[Dict[str, Any]]) -> None:
+        try:
+            with conn.transaction(), conn.cursor() as cursor:
+                cursor.executemany(
+                    "INSERT INTO execution_data (data_type, key, entry_id, value, tags, description, timestamp) "
+                    "VALUES (%s, %s, %s, %s::jsonb, %s, %s, to_timestamp(%s)) "
+                    "ON CONFLICT (data_type, key) DO UPDATE SET entry_id = EXCLUDED.entry_id, "
+                    "value = EXCLUDED.value, tags = EXCLUDED.tags, description = EXCLUDED.description, "
+                    "timestamp = EXCLUDED.timestamp",
+                    [(e["data_type"], e["key"], e["entry_id"], json.dumps(e["value"], default=str),
+                      list(e["tags"]), e["description"], e["timestamp"]) for e in entries]
+                )
+        except psycopg.OperationalError:
+            # Reconnect on the next attempt
+            self._conn = None
+            raise
+
+    def _count(self, conn: Any, data_type: str) -> int:
+        return conn.execute("SELECT COUNT(*) FROM execution_data WHERE data_type = %s", (data_type,)).fetchone()[0]
+
+    def _query(self, conn: Any, data_type: Optional[str], key: Optional[str], tag: Optional[str],
+               since: Optional[float], until: Optional[float], limit: int) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        for column, value in (("data_type = %s", data_type), ("key = %s", key), ("tags @> ARRAY[%s]", tag),
+                              ("timestamp >= to_timestamp(%s)", since), ("timestamp <= to_timestamp(%s)", until)):
+            if value is not None:
+                clauses.append(column)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = conn.execute(
+            "SELECT data_type, key, entry_id, value, tags, description, extract(epoch FROM timestamp) "
+            f"FROM execution_data {where} ORDER BY timestamp DESC LIMIT %s",
+            params + [limit]
+        ).fetchall()
+        return [{"data_type": r[0], "key": r[1], "entry_id": r[2], "value": r[3], "tags": list(r[4]),
+                 "description": r[5], "timestamp": float(r[6])} for r in rows]
+
+
+def create_store(backend: Optional[str] = None) -> Any:
+    """Build the store selected by `backend` (or BRAID_EXECUTION_STORE)."""
+    backend = (backend or os.getenv("BRAID_EXECUTION_STORE", "memory")).lower()
+    if backend == "memory":
+        return MemoryStore(int(os.getenv("BRAID_EXECUTION_STORE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))))
+    if backend == "sqlite":
+        return SQLiteStore(Path(os.getenv(
+            "BRAID_EXECUTION_STORE_PATH", Path.home() / ".cache" / "braid" / "execution_data.sqlite3"
+        )))
+    if backend in ("postgres", "postgresql"):
+        dsn = os.getenv("BRAID_EXECUTION_STORE_DSN") or os.getenv("DATABASE_URL")
+        if not dsn:
+            raise ValueError("BRAID_EXECUTION_STORE_DSN or DATABASE_URL is required for the postgres store")
+        return PostgresStore(dsn)
+    raise ValueError(f"Unknown execution store: {backend}. Available: memory, sqlite, postgres")
+
+
+# Global instance used by the execution_data tools
+execution_store = create_store()
+
+atexit.register(execution_store.close)
@@ -0,0 +1,362 @@
+"""
+Run LangGraph graphs as sub-workflows without starting a new interpreter.
+
+These are non-tool helpers. sub_workflow's 'file' mode starts a fresh `python`
+process per call, which spends seconds re-importing langchain and langgraph.
+Graphs can instead be run:
+
+- in-process: the graph is loaded once (reloaded when its file changes) and
+  streamed step by step in the calling thread;
+- isolated: on a persistent ProcessPoolExecutor whose workers import the heavy
+  libraries once at startup. On Linux the pool uses a forkserver that imports
+  them before forking, so new workers start warm. Each step's output is
+  streamed back to the caller over a shared queue as it is produced.
+
+Graphs are named "path/to/file.py:attr" or "package.module:attr" (attr
+defaults to "graph"). The attribute may be a compiled graph, an uncompiled
+StateGraph, or a zero-argument factory returning either.
+
+Configuration:
+- BRAID_SUBGRAPH_WORKERS: isolated worker processes (default 2)
+- BRAID_SUBGRAPH_PRELOAD: extra modules to import in workers, e.g.
+  "langchain_openai,pandas"
+"""
+import asyncio
+import atexit
+import hashlib
+import importlib
+import importlib.util
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# Imported once by every isolated worker
+HEAVY_MODULES = ("langchain_core.runnables", "langchain_core.messages", "langgraph.graph")
+
+_graphs: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_graphs_lock = threading.RLock()
+
+
+def _preload_modules() -> List[str]:
+    extra = [m.strip() for m in os.getenv("BRAID_SUBGRAPH_PRELOAD", "").split(",") if m.strip()]
+    return list(HEAVY_MODULES) + [m for m in extra if m not in HEAVY_MODULES]
+
+
+def _load_file(path: Path) -> Any:
+    name = f"braid_subgraph_{hashlib.sha256(str(path).encode()).hexdigest()[:12]}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"Cannot load graph file: {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_graph(spec: str) -> Any:
+    """
+    Return the compiled graph named by `spec`, loading it on first use.
+
+    Graphs from files are reloaded when the file's modification time changes.
+
+    Raises:
+        ValueError: if the spec cannot be resolved
+        TypeError: if the object is not a LangGraph graph
+    """
+    target, sep, attr = spec.rpartition(":")
+    if not sep or not target:
+        target, attr = spec, "graph"
+    if target.endswith(".py"):
+        path = Path(target).resolve()
+        if not path.is_file():
+            raise ValueError(f"Graph file not found: {target}")
+        key, version = (str(path), attr), path.stat().st_mtime
+    else:
+        path, key, version = None, (target, attr), 0.0
+
+    with _graphs_lock:
+        cached = _graphs.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        module = _load_file(path) if path is not None else importlib.import_module(target)
+        if not hasattr(module, attr):
+            raise ValueError(f"'{attr}' not found in {target}")
+        graph = getattr(module, attr)
+        if callable(graph) and not hasattr(graph, "invoke") and not hasattr(graph, "compile"):
+            graph = graph()
+        if hasattr(graph, "compile") and not hasattr(graph, "invoke"):
+            graph = graph.compile()
+        if not (hasattr(graph, "invoke") and hasattr(graph, "stream")):
+            raise TypeError(f"{spec} is not a LangGraph graph (got {type(graph).__name__})")
+        _graphs[key] = (version, graph)
+        return graph
+
+
+def has_async_nodes(graph: Any) -> bool:
+    """True if any node (including nodes of nested graphs) only has an async implementation."""
+    for node in getattr(graph, "nodes", {}).values():
+        bound = getattr(node, "bound", node)
+        if getattr(bound, "afunc", None) is not None and getattr(bound, "func", True) is None:
+            return True
+        if bound is not graph and hasattr(bound, "nodes") and has_async_nodes(bound):
+            return True
+    return False
+
+
+def _stream_async(graph: Any, input_data: Dict[str, Any],
+                  config: Optional[Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterate graph.astream() from sync code.
+
+    The event loop lives on a helper thread, so this also works when the
+    caller's thread is already running a loop.
+    """
+    loop = asyncio.new_event_loop()
+    stepper = ThreadPoolExecutor(max_workers=1, thread_name_prefix="braid-subgraph-async")
+    chunks = graph.astream(input_data, config, stream_mode=["updates", "values"])
+    try:
+        while True:
+            try:
+                yield stepper.submit(loop.run_until_complete, chunks.__anext__()).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        stepper.submit(loop.run_until_complete, chunks.aclose()).result()
+        stepper.submit(loop.close).result()
+        stepper.shutdown()
+
+
+def stream_graph(spec: str, input_data: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Run a graph in-process, yielding ("updates", {node: update}) after each
+    step and ("values", state) for the latest full state.
+
+    Graphs with async nodes are run through the async API. The timeout is
+    checked between steps; a single step is never interrupted.
+    """
+    graph = load_graph(spec)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    chunks = _stream_async(graph, input_data, config) if has_async_nodes(graph) else \
+        graph.stream(input_data, config, stream_mode=["updates", "values"])
+    for mode, chunk in chunks:
+        yield mode, chunk
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Sub-workflow timed out after {timeout} seconds")
+
+
+# --- Isolated execution ---
+
+_worker_results: Any = None
+
+
+def _init_worker(results: Any, modules: List[str]) -> None:
+    global _worker_results
+    _worker_results = results
+    # Lets the parent kill this worker without reaching into the executor
+    results.put((None, "worker", os.getpid()))
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def _portable(chunk: Any) -> bytes:
+    """Pickle a chunk for the parent, falling back to its JSON form."""
+    try:
+        return pickle.dumps(chunk)
+    except Exception:
+        return pickle.dumps(json.loads(json.dumps(chunk, default=str)))
+
+
+async def _astream_in_worker(job_id: int, spec: str, input_data: Dict[str, Any],
+                             config: Optional[Dict[str, Any]]) -> None:
+    graph = load_graph(spec)
+    async for mode, chunk in graph.astream(input_data, config, stream_mode=["updates", "values"]):
+        _worker_results.put((job_id, mode, _portable(chunk)))
+
+
+def _run_in_worker(job_id: int, spec: str, input_data: Dict[str, Any], config: Optional[Dict[str, Any]]) -> None:
+    # The async API runs both sync and async nodes; workers have no loop of their own
+    try:
+        asyncio.run(_astream_in_worker(job_id, spec, input_data, config))
+        _worker_results.put((job_id, "end", None))
+    except BaseException as e:
+        _worker_results.put((job_id, "error", f"{type(e).__name__}: {e}"))
+
+
+class SubgraphPool:
+    """
+    Persistent process pool for isolated graph runs.
+
+    The pool starts on first use. A run that times out restarts the pool,
+    since a worker cannot be stopped in the middle of a step; other runs in
+    flight at that moment fail and can be retried.
+    """
+
+    def __init__(self, workers: int = 2, preload: Optional[List[str]] = None):
+        self.workers = max(workers, 1)
+        self.preload = preload if preload is not None else _preload_modules()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._results: Any = None
+        self._pids: Set[int] = set()
+        self._jobs: Dict[int, "queue.Queue[Tuple[str, Any]]"] = {}
+        self._ids = itertools.count(1)
+        self.stats_counters = {"jobs": 0, "timeouts": 0, "restarts": 0}
+
+    def _start(self) -> ProcessPoolExecutor:
+        """Create the executor and its result dispatcher. Caller holds the lock."""
+        if self._executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            if context.get_start_method() == "forkserver":
+                context.set_forkserver_preload(self.preload)
+            results = context.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context,
+                initializer=_init_worker, initargs=(results, self.preload)
+            )
+            self._results = results
+            self._pids = set()
+            threading.Thread(target=self._dispatch, args=(results, self._pids), name="braid-subgraph-results",
+                             daemon=True).start()
+        return self._executor
+
+    def _dispatch(self, results: Any, pids: Set[int]) -> None:
+        """Route streamed chunks from workers to the waiting callers, and note worker pids."""
+        while True:
+            try:
+                message = results.get()
+            except (EOFError, OSError, ValueError):
+                return
+            if message is None:
+                return
+            job_id, kind, payload = message
+            if kind == "worker":
+                pids.add(payload)
+                continue
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.put((kind, payload))
+
+    def stream(self, spec: str, input_data: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+               timeout: float = 600) -> Iterator[Tuple[str, Any]]:
+        """Run a graph on a worker, yielding the same (mode, chunk) pairs as stream_graph()."""
+        job_id = next(self._ids)
+        job: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        with self._lock:
+            executor = self._start()
+            self._jobs[job_id] = job
+            self.stats_counters["jobs"] += 1
+        deadline = time.monotonic() + timeout
+        try:
+            try:
+                future = executor.submit(_run_in_worker, job_id, spec, input_data, config)
+            except BrokenProcessPool:
+                # A worker died since the last run; the job has not started, so retry on a fresh pool
+                self.restart(executor)
+                with self._lock:
+                    executor = self._start()
+                future = executor.submit(_run_in_worker, job_id, spec, input_data, config)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._lock:
+                        self.stats_counters["timeouts"] += 1
+                    self.restart(executor)
+                    raise TimeoutError(f"Sub-workflow timed out after {timeout} seconds")
+                try:
+                    kind, payload = job.get(timeout=min(remaining, 0.5))
+                except queue.Empty:
+                    if future.done() and future.exception() is not None:
+                        # The worker process died (e.g. killed or out of memory), which breaks the pool
+                        self.restart(executor)
+                        raise RuntimeError(f"Sub-workflow worker failed: {future.exception()}")
+                    continue
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise RuntimeError(payload)
+                yield kind, pickle.loads(payload)
+        finally:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+
+    def restart(self, executor: Optional[ProcessPoolExecutor] = None) -> None:
+        """
+        Kill all workers; the pool starts again on next use.
+
+        If `executor` is given, only restart while it is still the current
+        one, so a pool another caller already replaced is left alone.
+        """
+        with self._lock:
+            if executor is not None and executor is not self._executor:
+                return
+            executor, results, pids = self._executor, self._results, self._pids
+            self._executor = self._results = None
+            self._pids = set()
+            if executor is not None:
+                self.stats_counters["restarts"] += 1
+        if executor is not None:
+            # A busy worker cannot be stopped any other way; the executor then sees it die
+            for pid in list(pids):
+                try:
+                    os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+                except OSError:
+                    pass
+            executor.shutdown(wait=False, cancel_futures=True)
+        if results is not None:
+            results.put(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool size, preloaded modules and job counters."""
+        with self._lock:
+            return {"workers": self.workers, "preload": self.preload, "running": self._executor is not None,
+                    **self.stats_counters}
+
+    def close(self) -> None:
+        """Shut the workers down."""
+        with self._lock:
+            executor, results = self._executor, self._results
+            self._executor = self._results = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if results is not None:
+            results.put(None)
+
+
+def run_graph(spec: str, input_data: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+              timeout: float = 600, isolated: bool = False) -> Dict[str, Any]:
+    """
+    Run a graph to completion and return {"output": final state, "steps": node names in order}.
+
+    With isolated=True the graph runs on subgraph_pool instead of in this process.
+    """
+    chunks = subgraph_pool.stream(spec, input_data, config, timeout) if isolated else \
+        stream_graph(spec, input_data, config, timeout)
+    output: Any = None
+    steps: List[str] = []
+    for mode, chunk in chunks:
+        if mode == "values":
+            output = chunk
+        elif isinstance(chunk, dict):
+            steps.extend(chunk)
+    return {"output": output, "steps": steps}
+
+
+# Global instance used by the sub_workflow tool
+subgraph_pool = SubgraphPool(workers=int(os.getenv("BRAID_SUBGRAPH_WORKERS", "2")))
+
+atexit.register(subgraph_pool.close)
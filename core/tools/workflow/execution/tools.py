@@ -4,6 +4,7 @@ Workflow Execution Tools - Control flow and orchestration for complex workflows.
 Tools:
 - workflow_wait: Pause execution for time delays or external events
 - execution_data: Store execution metadata and debugging information
+- execution_data_query: Query stored execution data by type, key, tag and time
 - sub_workflow: Execute sub-workflows for modular agent architectures
 
 For webhook tools, see network/webhooks/tools.py
@@ -12,6 +13,7 @@ For code execution, see workflow/code/tools.py
 import json
 import time
 import asyncio
+import os
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from pathlib import Path
@@ -19,6 +21,23 @@ from pathlib import Path
 from langchain_core.tools import tool
 from pydantic.v1 import BaseModel, Field
 
+from ...utilities.output import to_json
+from .file_watch import async_wait_for_file, wait_for_file
+from .scheduler import resume_scheduler
+from .store import MAX_QUERY_LIMIT, execution_store
+from .subgraphs import run_graph
+
+try:
+    from langgraph.config import get_config
+    from langgraph.errors import GraphBubbleUp
+    from langgraph.types import interrupt
+except ImportError:
+    get_config = interrupt = None
+    GraphBubbleUp = ()
+
+# Time waits at least this long checkpoint and resume from the scheduler by default
+DURABLE_WAIT_SECONDS = int(os.getenv("BRAID_DURABLE_WAIT_SECONDS", "300"))
+
 # --- Input Schemas ---
 
 class WorkflowWaitInput(BaseModel):
@@ -27,6 +46,7 @@ class WorkflowWaitInput(BaseModel):
     file_path: Optional[str] = Field(default=None, description="File path to wait for (for file wait)")
     timeout_seconds: int = Field(default=300, description="Maximum time to wait before timeout")
     check_interval: int = Field(default=5, description="Seconds between checks (for file wait)")
+    durable: Optional[bool] = Field(default=None, description="For time waits inside a graph: checkpoint and resume later instead of holding a thread (default: automatic for long waits)")
 
 class ExecutionDataInput(BaseModel):
     data_type: str = Field(description="Type of data: 'metadata', 'debug', 'metric', 'checkpoint'")
@@ -35,21 +55,121 @@ class ExecutionDataInput(BaseModel):
     tags: Optional[list] = Field(default=None, description="Optional tags for filtering/searching")
     description: Optional[str] = Field(default=None, description="Human-readable description")
 
+class ExecutionDataQueryInput(BaseModel):
+    data_type: Optional[str] = Field(default=None, description="Only entries of this type: 'metadata', 'debug', 'metric', 'checkpoint'")
+    key: Optional[str] = Field(default=None, description="Only the entry with this key")
+    tag: Optional[str] = Field(default=None, description="Only entries with this tag")
+    since: Optional[str] = Field(default=None, description="Only entries stored at or after this ISO timestamp")
+    until: Optional[str] = Field(default=None, description="Only entries stored at or before this ISO timestamp")
+    limit: int = Field(default=100, description="Maximum entries to return, newest first (max 1000)")
+
 class SubWorkflowInput(BaseModel):
-    workflow_type: str = Field(description="Type of sub-workflow: 'file' (Python file) or 'function' (imported function)")
-    workflow_path: str = Field(description="Path to workflow file or function name")
+    workflow_type: str = Field(description="Type of sub-workflow: 'file' (Python file), 'function' (imported function) or 'graph' (LangGraph graph)")
+    workflow_path: str = Field(description="Path to workflow file or function name; for graphs 'path/to/graph.py:graph' or 'package.module:graph'")
     input_data: Dict[str, Any] = Field(description="Input data to pass to the sub-workflow")
     timeout_seconds: int = Field(default=600, description="Maximum execution time before timeout")
+    isolated: bool = Field(default=False, description="For graphs: run in a warm worker process instead of in-process")
+
+# --- Helper Functions ---
+
+def _time_wait_result(duration_seconds: int, start_time: datetime) -> Dict[str, Any]:
+    """Build the workflow_wait result for a completed time wait."""
+    end_time = datetime.now()
+    return {
+        "success": True,
+        "wait_type": "time",
+        "requested_duration": duration_seconds,
+        "actual_duration": (end_time - start_time).total_seconds(),
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat()
+    }
+
+def _durable_target(durable: Optional[bool], duration_seconds: int) -> Optional[Dict[str, str]]:
+    """
+    Return the running graph thread to resume later, or None to wait in-process.
+    
+    Durable waits need a LangGraph run with a thread_id (so a checkpointer) and
+    a graph registered with resume_scheduler in this process.
+    """
+    if durable is False or (durable is None and duration_seconds < DURABLE_WAIT_SECONDS):
+        return None
+    if get_config is None or interrupt is None:
+        return None
+    try:
+        configurable = get_config().get("configurable", {})
+    except RuntimeError:
+        # Not called from inside a graph run
+        return None
+    graph_id = configurable.get("graph_id", "default")
+    if configurable.get("thread_id") is None or not resume_scheduler.can_resume(graph_id):
+        return None
+    return {
+        "thread_id": str(configurable["thread_id"]),
+        "graph_id": graph_id,
+        "checkpoint_ns": configurable.get("checkpoint_ns", "")
+    }
 
-# --- Global execution data store ---
-_execution_store = {}
+def _durable_time_wait(target: Dict[str, str], duration_seconds: int, start_time: datetime) -> Dict[str, Any]:
+    """
+    Schedule a wake-up and interrupt the graph; the scheduler resumes it later.
+    
+    On the first pass interrupt() raises and the graph checkpoints. When the
+    scheduler resumes the thread the node runs again and interrupt() returns
+    the wake-up payload instead; that re-run finds its wake-up being
+    delivered and does not schedule another. A thread resumed some other
+    way drops its pending wake-up.
+    """
+    resume_at = time.time() + duration_seconds
+    key = resume_scheduler.key(target["thread_id"], target["graph_id"], target["checkpoint_ns"])
+    delivered = resume_scheduler.take_resuming(key)
+    if not delivered:
+        resume_scheduler.schedule(
+            target["thread_id"], resume_at, {"start_time": start_time.isoformat()},
+            graph_id=target["graph_id"], checkpoint_ns=target["checkpoint_ns"]
+        )
+    resumed = interrupt({
+        "type": "workflow_wait",
+        "wait_type": "time",
+        "duration_seconds": duration_seconds,
+        "resume_at": datetime.fromtimestamp(resume_at).isoformat()
+    })
+    if not delivered:
+        # Resumed by something other than the scheduler (e.g. Command(resume=...) by hand);
+        # the wake-up scheduled above, which replaced the original one, is no longer wanted
+        resume_scheduler.cancel(key)
+    if isinstance(resumed, dict) and resumed.get("start_time"):
+        start_time = datetime.fromisoformat(resumed["start_time"])
+    result = _time_wait_result(duration_seconds, start_time)
+    result["durable"] = True
+    return result
+
+def _file_wait_result(file_path: str, outcome: Dict[str, Any], start_time: datetime,
+                      timeout_seconds: int) -> Dict[str, Any]:
+    """Build the workflow_wait result for a file wait."""
+    end_time = datetime.now()
+    result = {
+        "success": outcome["found"],
+        "wait_type": "file",
+        "file_path": str(Path(file_path)),
+        "file_found": outcome["found"],
+        "watch_method": outcome["method"],
+        "checks_performed": outcome["checks"],
+        "actual_duration": (end_time - start_time).total_seconds()
+    }
+    if outcome["found"]:
+        result["start_time"] = start_time.isoformat()
+        result["end_time"] = end_time.isoformat()
+    else:
+        result["timeout_reached"] = True
+        result["error"] = f"File not found within {timeout_seconds}s timeout"
+    return result
 
 # --- Workflow Execution Tools ---
 
 @tool("workflow_wait", args_schema=WorkflowWaitInput)
 def workflow_wait(wait_type: str, duration_seconds: Optional[int] = None, 
                  file_path: Optional[str] = None, timeout_seconds: int = 300,
-                 check_interval: int = 5) -> str:
+                 check_interval: int = 5, durable: Optional[bool] = None) -> str:
     """
     Pause workflow execution until a time delay passes or an external event occurs.
     
@@ -60,7 +180,11 @@ def workflow_wait(wait_type: str, duration_seconds: Optional[int] = None,
     Features:
     - Configurable timeout to prevent infinite waits
     - Regular status reporting during long waits
-    - File existence monitoring with configurable check intervals
+    - File waits react to inotify events as soon as the file appears, with
+      check_interval as a fallback polling interval
+    - Awaitable when invoked asynchronously (ainvoke); waits then hold no thread
+    - Durable time waits: inside a checkpointed graph, long waits (or durable=True)
+      interrupt the graph and are resumed by the scheduler when the time is up
     
     Returns JSON with wait status and timing information.
     """
@@ -69,98 +193,92 @@ def workflow_wait(wait_type: str, duration_seconds: Optional[int] = None,
     try:
         if wait_type == "time":
             if duration_seconds is None:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": "duration_seconds is required for time wait",
                     "wait_type": wait_type
-                }, indent=2)
+                })
             
             if duration_seconds > timeout_seconds:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": f"Duration ({duration_seconds}s) exceeds timeout ({timeout_seconds}s)",
                     "wait_type": wait_type
-                }, indent=2)
+                })
+            
+            target = _durable_target(durable, duration_seconds)
+            if target is not None:
+                return to_json(_durable_time_wait(target, duration_seconds, start_time))
             
             # Simple time wait
             time.sleep(duration_seconds)
             
-            end_time = datetime.now()
-            actual_duration = (end_time - start_time).total_seconds()
-            
-            return json.dumps({
-                "success": True,
-                "wait_type": wait_type,
-                "requested_duration": duration_seconds,
-                "actual_duration": actual_duration,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat()
-            }, indent=2)
+            return to_json(_time_wait_result(duration_seconds, start_time))
             
         elif wait_type == "file":
             if file_path is None:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": "file_path is required for file wait",
                     "wait_type": wait_type
-                }, indent=2)
-            
-            file_path_obj = Path(file_path)
-            elapsed = 0
-            checks = 0
-            
-            while elapsed < timeout_seconds:
-                if file_path_obj.exists():
-                    end_time = datetime.now()
-                    actual_duration = (end_time - start_time).total_seconds()
-                    
-                    return json.dumps({
-                        "success": True,
-                        "wait_type": wait_type,
-                        "file_path": str(file_path_obj),
-                        "file_found": True,
-                        "checks_performed": checks,
-                        "actual_duration": actual_duration,
-                        "start_time": start_time.isoformat(),
-                        "end_time": end_time.isoformat()
-                    }, indent=2)
-                
-                time.sleep(check_interval)
-                elapsed += check_interval
-                checks += 1
+                })
             
-            # Timeout reached
-            end_time = datetime.now()
-            actual_duration = (end_time - start_time).total_seconds()
-            
-            return json.dumps({
-                "success": False,
-                "wait_type": wait_type,
-                "file_path": str(file_path_obj),
-                "file_found": False,
-                "timeout_reached": True,
-                "checks_performed": checks,
-                "actual_duration": actual_duration,
-                "error": f"File not found within {timeout_seconds}s timeout"
-            }, indent=2)
+            # Event-driven (inotify) where available, polling otherwise
+            outcome = wait_for_file(file_path, timeout_seconds, poll_interval=check_interval)
+            return to_json(_file_wait_result(file_path, outcome, start_time, timeout_seconds))
             
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"Unknown wait_type: {wait_type}. Available: 'time', 'file'",
                 "wait_type": wait_type
-            }, indent=2)
+            })
             
+    except GraphBubbleUp:
+        # interrupt() from a durable wait; LangGraph checkpoints the run
+        raise
     except Exception as e:
         end_time = datetime.now()
         actual_duration = (end_time - start_time).total_seconds()
         
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Wait operation failed: {str(e)}",
             "wait_type": wait_type,
             "actual_duration": actual_duration
-        }, indent=2)
+        })
+
+async def _workflow_wait_async(wait_type: str, duration_seconds: Optional[int] = None,
+                               file_path: Optional[str] = None, timeout_seconds: int = 300,
+                               check_interval: int = 5, durable: Optional[bool] = None) -> str:
+    """Async implementation of workflow_wait, used by ainvoke."""
+    start_time = datetime.now()
+    try:
+        if wait_type == "time" and duration_seconds is not None and duration_seconds <= timeout_seconds:
+            target = _durable_target(durable, duration_seconds)
+            if target is not None:
+                return to_json(_durable_time_wait(target, duration_seconds, start_time))
+            await asyncio.sleep(duration_seconds)
+            return to_json(_time_wait_result(duration_seconds, start_time))
+        
+        if wait_type == "file" and file_path is not None:
+            outcome = await async_wait_for_file(file_path, timeout_seconds, poll_interval=check_interval)
+            return to_json(_file_wait_result(file_path, outcome, start_time, timeout_seconds))
+    except GraphBubbleUp:
+        raise
+    except Exception as e:
+        return to_json({
+            "success": False,
+            "error": f"Wait operation failed: {str(e)}",
+            "wait_type": wait_type,
+            "actual_duration": (datetime.now() - start_time).total_seconds()
+        })
+    
+    # Invalid arguments: the sync tool returns the error without waiting
+    return _workflow_wait_sync(wait_type, duration_seconds, file_path, timeout_seconds, check_interval, durable)
+
+_workflow_wait_sync = getattr(workflow_wait, "func", workflow_wait)
+workflow_wait.coroutine = _workflow_wait_async
 
 @tool("execution_data", args_schema=ExecutionDataInput)
 def execution_data(data_type: str, key: str, value: Any, tags: Optional[list] = None,
@@ -175,7 +293,8 @@ def execution_data(data_type: str, key: str, value: Any, tags: Optional[list] =
     - 'checkpoint': Workflow state checkpoints
     
     Features:
-    - Persistent storage during workflow execution
+    - Bounded in-memory, SQLite or Postgres storage (BRAID_EXECUTION_STORE)
+    - Query entries back with execution_data_query
     - Tagging system for organization and filtering
     - Timestamped entries for chronological analysis
     - JSON serialization for complex data structures
@@ -183,7 +302,8 @@ def execution_data(data_type: str, key: str, value: Any, tags: Optional[list] =
     Returns JSON with storage confirmation and entry details.
     """
     try:
-        timestamp = datetime.now().isoformat()
+        now = datetime.now()
+        timestamp = now.isoformat()
         
         # Create the data entry
         entry = {
@@ -192,15 +312,12 @@ def execution_data(data_type: str, key: str, value: Any, tags: Optional[list] =
             "value": value,
             "tags": tags or [],
             "description": description,
-            "timestamp": timestamp,
+            "timestamp": now.timestamp(),
             "entry_id": f"{data_type}_{key}_{int(time.time())}"
         }
         
-        # Store in global execution store
-        if data_type not in _execution_store:
-            _execution_store[data_type] = {}
-        
-        _execution_store[data_type][key] = entry
+        # Bounded in memory, or queued for a batched database write
+        execution_store.put(entry)
         
         result = {
             "success": True,
@@ -210,29 +327,76 @@ def execution_data(data_type: str, key: str, value: Any, tags: Optional[list] =
             "timestamp": timestamp,
             "tags": tags or [],
             "description": description,
-            "storage_location": f"_execution_store['{data_type}']['{key}']",
-            "total_entries": len(_execution_store.get(data_type, {}))
+            "storage_location": f"{execution_store.backend}:{data_type}/{key}",
+            "total_entries": execution_store.count(data_type)
         }
         
-        return json.dumps(result, indent=2, default=str)
+        return to_json(result)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Failed to store execution data: {str(e)}",
             "data_type": data_type,
             "key": key
-        }, indent=2)
+        })
+
+@tool("execution_data_query", args_schema=ExecutionDataQueryInput)
+def execution_data_query(data_type: Optional[str] = None, key: Optional[str] = None,
+                         tag: Optional[str] = None, since: Optional[str] = None,
+                         until: Optional[str] = None, limit: int = 100) -> str:
+    """
+    Query execution data stored with execution_data.
+    
+    Filters (all optional, combined with AND):
+    - data_type: 'metadata', 'debug', 'metric' or 'checkpoint'
+    - key: a specific entry key
+    - tag: entries carrying this tag
+    - since / until: ISO timestamps bounding when entries were stored
+    
+    Returns JSON with matching entries, newest first.
+    """
+    try:
+        since_ts = datetime.fromisoformat(since).timestamp() if since else None
+        until_ts = datetime.fromisoformat(until).timestamp() if until else None
+        limit = max(1, min(limit, MAX_QUERY_LIMIT))
+        
+        entries = execution_store.query(data_type=data_type, key=key, tag=tag,
+                                        since=since_ts, until=until_ts, limit=limit)
+        for entry in entries:
+            entry["timestamp"] = datetime.fromtimestamp(entry["timestamp"]).isoformat()
+        
+        return to_json({
+            "success": True,
+            "backend": execution_store.backend,
+            "filters": {"data_type": data_type, "key": key, "tag": tag, "since": since, "until": until},
+            "count": len(entries),
+            "limit": limit,
+            "entries": entries
+        })
+        
+    except ValueError as e:
+        return to_json({
+            "success": False,
+            "error": f"Invalid query: {str(e)}"
+        })
+    except Exception as e:
+        return to_json({
+            "success": False,
+            "error": f"Failed to query execution data: {str(e)}"
+        })
 
 @tool("sub_workflow", args_schema=SubWorkflowInput)
 def sub_workflow(workflow_type: str, workflow_path: str, input_data: Dict[str, Any],
-                timeout_seconds: int = 600) -> str:
+                timeout_seconds: int = 600, isolated: bool = False) -> str:
     """
     Execute sub-workflows for modular agent architectures and code reuse.
     
     Workflow types:
     - 'file': Execute a Python file as a subprocess
     - 'function': Import and call a Python function
+    - 'graph': Run a LangGraph graph in-process (loaded once, no interpreter
+      startup), or with isolated=True on a persistent pool of warm worker processes
     
     Features:
     - Isolated execution environment
@@ -273,7 +437,7 @@ def sub_workflow(workflow_type: str, workflow_path: str, input_data: Dict[str, A
                     except json.JSONDecodeError:
                         output_data = result.stdout
                     
-                    return json.dumps({
+                    return to_json({
                         "success": True,
                         "workflow_type": workflow_type,
                         "workflow_path": workflow_path,
@@ -283,9 +447,9 @@ def sub_workflow(workflow_type: str, workflow_path: str, input_data: Dict[str, A
                         "duration_seconds": duration,
                         "start_time": start_time.isoformat(),
                         "end_time": end_time.isoformat()
-                    }, indent=2, default=str)
+                    })
                 else:
-                    return json.dumps({
+                    return to_json({
                         "success": False,
                         "workflow_type": workflow_type,
                         "workflow_path": workflow_path,
@@ -294,19 +458,57 @@ def sub_workflow(workflow_type: str, workflow_path: str, input_data: Dict[str, A
                         "stderr": result.stderr,
                         "duration_seconds": duration,
                         "error": f"Sub-workflow exited with code {result.returncode}"
-                    }, indent=2)
+                    })
                     
             except subprocess.TimeoutExpired:
                 # Clean up temp file
                 Path(input_file.name).unlink()
                 
-                return json.dumps({
+                return to_json({
+                    "success": False,
+                    "workflow_type": workflow_type,
+                    "workflow_path": workflow_path,
+                    "error": f"Sub-workflow timed out after {timeout_seconds} seconds",
+                    "timeout_seconds": timeout_seconds
+                })
+                
+        elif workflow_type == "graph":
+            mode = "process_pool" if isolated else "in_process"
+            try:
+                run = run_graph(workflow_path, input_data, timeout=timeout_seconds, isolated=isolated)
+            except TimeoutError:
+                return to_json({
                     "success": False,
                     "workflow_type": workflow_type,
                     "workflow_path": workflow_path,
+                    "execution_mode": mode,
                     "error": f"Sub-workflow timed out after {timeout_seconds} seconds",
                     "timeout_seconds": timeout_seconds
-                }, indent=2)
+                })
+            except Exception as graph_error:
+                return to_json({
+                    "success": False,
+                    "workflow_type": workflow_type,
+                    "workflow_path": workflow_path,
+                    "execution_mode": mode,
+                    "error": f"Graph execution failed: {str(graph_error)}",
+                    "duration_seconds": (datetime.now() - start_time).total_seconds()
+                })
+            
+            end_time = datetime.now()
+            duration = (end_time - start_time).total_seconds()
+            
+            return to_json({
+                "success": True,
+                "workflow_type": workflow_type,
+                "workflow_path": workflow_path,
+                "execution_mode": mode,
+                "output_data": run["output"],
+                "steps": run["steps"],
+                "duration_seconds": duration,
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat()
+            })
                 
         elif workflow_type == "function":
             import importlib.util
@@ -316,11 +518,11 @@ def sub_workflow(workflow_type: str, workflow_path: str, input_data: Dict[str, A
             if '.' in workflow_path:
                 module_name, function_name = workflow_path.rsplit('.', 1)
             else:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": "Function path must be in format 'module.function'",
                     "workflow_path": workflow_path
-                }, indent=2)
+                })
             
             try:
                 # Import the module
@@ -328,11 +530,11 @@ def sub_workflow(workflow_type: str, workflow_path: str, input_data: Dict[str, A
                 
                 # Get the function
                 if not hasattr(module, function_name):
-                    return json.dumps({
+                    return to_json({
                         "success": False,
                         "error": f"Function '{function_name}' not found in module '{module_name}'",
                         "workflow_path": workflow_path
-                    }, indent=2)
+                    })
                 
                 func = getattr(module, function_name)
                 
@@ -342,7 +544,7 @@ def sub_workflow(workflow_type: str, workflow_path: str, input_data: Dict[str, A
                 end_time = datetime.now()
                 duration = (end_time - start_time).total_seconds()
                 
-                return json.dumps({
+                return to_json({
                     "success": True,
                     "workflow_type": workflow_type,
                     "workflow_path": workflow_path,
@@ -350,41 +552,41 @@ def sub_workflow(workflow_type: str, workflow_path: str, input_data: Dict[str, A
                     "duration_seconds": duration,
                     "start_time": start_time.isoformat(),
                     "end_time": end_time.isoformat()
-                }, indent=2, default=str)
+                })
                 
             except Exception as func_error:
                 end_time = datetime.now()
                 duration = (end_time - start_time).total_seconds()
                 
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "workflow_type": workflow_type,
                     "workflow_path": workflow_path,
                     "error": f"Function execution failed: {str(func_error)}",
                     "duration_seconds": duration
-                }, indent=2)
+                })
                 
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
-                "error": f"Unknown workflow_type: {workflow_type}. Available: 'file', 'function'",
+                "error": f"Unknown workflow_type: {workflow_type}. Available: 'file', 'function', 'graph'",
                 "workflow_type": workflow_type
-            }, indent=2)
+            })
             
     except Exception as e:
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Sub-workflow execution failed: {str(e)}",
             "workflow_type": workflow_type,
             "workflow_path": workflow_path,
             "duration_seconds": duration
-        }, indent=2)
+        })
 
 # --- Tool Aggregator ---
 
 def get_execution_tools():
     """Returns a list of all workflow execution tools."""
-    return [workflow_wait, execution_data, sub_workflow]
\ No newline at end of file
+    return [workflow_wait, execution_data, execution_data_query, sub_workflow]
\ No newline at end of file
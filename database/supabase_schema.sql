@@ -77,6 +77,7 @@ CREATE INDEX idx_agent_memory_agent_id ON agent_memory(agent_id);
 CREATE INDEX idx_agent_memory_type ON agent_memory(memory_type);
 CREATE INDEX idx_agent_logs_agent_id ON agent_logs(agent_id);
 CREATE INDEX idx_agent_logs_timestamp ON agent_logs(timestamp);
+CREATE INDEX idx_agents_name ON agents(name);
 CREATE INDEX idx_workflow_executions_agent_id ON workflow_executions(agent_id);
 CREATE INDEX idx_workflow_executions_status ON workflow_executions(status);
 
@@ -0,0 +1,25 @@
+"""Tests for the LibreChat chat graph model mapping."""
+import pytest
+
+pytest.importorskip("langgraph")
+
+from braid import chat_graph
+
+
+def test_default_models_map_to_anthropic_names():
+    models = chat_graph._load_models("")
+    assert models == chat_graph.DEFAULT_CHAT_MODELS
+    assert all(name.startswith("claude-") and name not in models for name in models.values())
+
+
+def test_env_mapping_replaces_defaults():
+    assert chat_graph._load_models("braid-fast = claude-3-5-haiku-20241022") == {
+        "braid-fast": "claude-3-5-haiku-20241022"
+    }
+    with pytest.raises(ValueError):
+        chat_graph._load_models("braid-fast")
+
+
+def test_unknown_model_is_rejected():
+    with pytest.raises(KeyError):
+        chat_graph.chat_model("gpt-4", [{"role": "user", "content": "hi"}])
@@ -0,0 +1,40 @@
+"""Tests for the NumPy columnar CSV summary."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.tools.data.csv import columnar
+
+
+def _chunks(values, size=1000):
+    rows = [{"x": str(v), "name": f"row{v}"} for v in values]
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def test_summary_is_exact_below_sample_size():
+    numeric, text, total = columnar.summarize_chunks(_chunks(range(1, 101)), ["x", "name"])
+    stats = numeric[0]
+    assert total == 100 and text == ["name"]
+    assert (stats["count"], stats["min"], stats["max"], stats["avg"]) == (100, 1.0, 100.0, 50.5)
+    assert stats["percentiles_exact"] is True
+    assert stats["percentiles"]["p50"] == pytest.approx(50.5)
+
+
+def test_large_column_uses_bounded_sample(monkeypatch):
+    monkeypatch.setattr(columnar, "PERCENTILE_SAMPLE_SIZE", 500)
+    values = range(20000)
+    numeric, _, _ = columnar.summarize_chunks(_chunks(values), ["x"])
+    stats = numeric[0]
+    # Running totals stay exact; only percentiles are estimated
+    assert (stats["count"], stats["min"], stats["max"]) == (20000, 0.0, 19999.0)
+    assert stats["avg"] == pytest.approx(9999.5)
+    assert stats["percentiles_exact"] is False
+    assert stats["percentiles"]["p50"] == pytest.approx(10000, rel=0.1)
+
+
+def test_exact_percentiles_opt_in(monkeypatch):
+    monkeypatch.setattr(columnar, "PERCENTILE_SAMPLE_SIZE", 500)
+    numeric, _, _ = columnar.summarize_chunks(_chunks(range(20000)), ["x"], exact=True)
+    assert numeric[0]["percentiles_exact"] is True
+    assert numeric[0]["percentiles"]["p50"] == pytest.approx(9999.5)
@@ -0,0 +1,64 @@
+"""Tests for directory listing pattern matching."""
+import pytest
+
+from core.tools.data.files.utils import DirectoryIndex, iter_directory
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for rel in ("top.py", "notes.txt", "a/x.py", "a/b/y.py", "a/b/c/z.txt", "d/w.py"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+    return tmp_path
+
+
+def _expected(root, pattern, recursive):
+    paths = root.rglob(pattern) if recursive else root.glob(pattern)
+    return sorted(path.relative_to(root).as_posix() for path in paths)
+
+
+def _listed(entries):
+    return sorted(info["relative_path"] for info in entries)
+
+
+@pytest.mark.parametrize("pattern", ["*.py", "**/*.py", "a/**/*.py", "a/*.py", "*/*", "**/b/*"])
+@pytest.mark.parametrize("recursive", [False, True])
+def test_iter_directory_matches_pathlib_glob(tree, pattern, recursive):
+    assert _listed(iter_directory(tree, pattern, recursive)) == _expected(tree, pattern, recursive)
+
+
+def test_double_star_matches_zero_directories(tree):
+    assert _listed(iter_directory(tree, "**/*.py")) == ["a/b/y.py", "a/x.py", "d/w.py", "top.py"]
+
+
+def test_parallel_walk_matches_sequential(tree):
+    assert _listed(iter_directory(tree, "**/*.py", workers=2)) == _listed(iter_directory(tree, "**/*.py"))
+
+
+def test_index_matches_walk(tree, tmp_path_factory):
+    index = DirectoryIndex(tree, index_dir=tmp_path_factory.mktemp("index"))
+    dirs, _ = index.refresh()
+    for pattern in ("**/*.py", "a/*.py", "*.txt"):
+        assert _listed(index.iter_entries(dirs, pattern)) == _listed(iter_directory(tree, pattern))
+
+
+def test_index_scan_walks_only_as_deep_as_the_listing(tree, tmp_path_factory):
+    index = DirectoryIndex(tree, index_dir=tmp_path_factory.mktemp("index"))
+    stats = {}
+    assert _listed(index.scan("*.py", stats=stats)) == ["top.py"]
+    assert stats == {"dirs_scanned": 1, "dirs_reused": 0}
+    # The root's record is reused by a later full refresh
+    _, refreshed = index.refresh()
+    assert refreshed == {"dirs_scanned": 4, "dirs_reused": 1}
+
+
+def test_index_scan_stops_when_the_caller_stops(tree, tmp_path_factory):
+    index = DirectoryIndex(tree, index_dir=tmp_path_factory.mktemp("index"))
+    stats = {}
+    entries = index.scan("**/*.py", stats=stats)
+    assert next(entries)["relative_path"] == "top.py"
+    entries.close()
+    assert stats["dirs_scanned"] == 1
+    for pattern in ("**/*.py", "a/*.py", "*.txt"):
+        assert _listed(index.scan(pattern)) == _listed(iter_directory(tree, pattern))
@@ -0,0 +1,44 @@
+"""Tests for ranged file_read decoding."""
+import json
+
+import pytest
+
+from core.tools.data.files.tools import file_read
+from core.tools.data.files.utils import decode_bytes, is_line_splittable
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-16-le", "UTF-16BE", "utf-32", "utf_32_le", "utf-32-be"])
+def test_wide_encodings_are_not_line_splittable(encoding):
+    assert not is_line_splittable(encoding)
+
+
+def test_utf8_is_line_splittable():
+    assert is_line_splittable("utf-8") and is_line_splittable("latin-1")
+
+
+def test_characters_split_by_a_cut_are_dropped():
+    data = "żółw".encode("utf-8")
+    assert decode_bytes(data[1:-1], "utf-8", cut_start=True, cut_end=True) == ("ół", "utf-8")
+    # Bytes that are not in the encoding still fall back to latin-1
+    assert decode_bytes(b"caf\xe9 ok", "utf-8")[1] == "latin-1"
+
+
+@pytest.fixture
+def read(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def read(text, **options):
+        (tmp_path / "text.txt").write_text(text, encoding="utf-8")
+        return json.loads(file_read.invoke({"file_path": "text.txt", **options}))
+    return read
+
+
+def test_byte_range_inside_a_character(read):
+    result = read("żółw", mode="bytes", byte_start=1, byte_end=5)
+    assert (result["content"], result["encoding"]) == ("ó", "utf-8")
+
+
+def test_truncation_inside_a_character(read):
+    result = read("a" + "é" * 600000, mode="head", num_lines=1, max_size_mb=1)
+    assert result["truncated"] and result["encoding"] == "utf-8"
+    assert result["content"] == "a" + "é" * 524287
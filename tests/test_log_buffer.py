@@ -0,0 +1,116 @@
+"""Tests for the buffered agent_logs writer."""
+import asyncio
+import os
+import subprocess
+import sys
+
+from braid.database.log_buffer import LogBuffer
+
+
+class FakeTable:
+    def __init__(self):
+        self.rows = []
+        self.failing = False
+        self.gate = None
+
+    async def write(self, rows):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.failing:
+            raise ConnectionError("database unavailable")
+        self.rows.extend(rows)
+
+
+def _rows(count, start=0):
+    return [{"id": str(i)} for i in range(start, start + count)]
+
+
+def test_spilled_rows_are_replayed_once_writes_succeed(tmp_path):
+    async def run():
+        table = FakeTable()
+        buffer = LogBuffer(table.write, batch_size=2, max_pending=2, spill_path=tmp_path / "logs.jsonl")
+        table.failing = True
+        for row in _rows(5):
+            buffer.add(row)
+        assert await buffer.flush() == 0
+        assert buffer.spill_file().name == f"logs.{os.getpid()}.jsonl"
+        assert buffer.stats()["spilled"] == 3
+        table.failing = False
+        assert await buffer.flush() == 5
+        assert sorted(row["id"] for row in table.rows) == [str(i) for i in range(5)]
+        assert buffer.stats()["replayed"] == 3
+        assert list(tmp_path.iterdir()) == []
+        await buffer.close()
+
+    asyncio.run(run())
+
+
+def test_spill_files_of_dead_processes_are_adopted(tmp_path):
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True)
+    orphan = tmp_path / f"logs.{finished.stdout.strip()}.jsonl"
+    orphan.write_text('{"id": "orphan"}\n', encoding="utf-8")
+    # A live process's file is left to that process
+    live = tmp_path / f"logs.{os.getppid()}.jsonl"
+    live.write_text('{"id": "live"}\n', encoding="utf-8")
+
+    async def run():
+        table = FakeTable()
+        buffer = LogBuffer(table.write, spill_path=tmp_path / "logs.jsonl")
+        await buffer.flush()
+        assert table.rows == [{"id": "orphan"}]
+        assert not orphan.exists() and live.exists()
+        await buffer.close()
+
+    asyncio.run(run())
+
+
+def test_block_policy_waits_for_room():
+    async def run():
+        table = FakeTable()
+        table.gate = asyncio.Event()
+        buffer = LogBuffer(table.write, batch_size=2, max_pending=2, flush_interval=60, overflow="block")
+        for row in _rows(2):
+            await buffer.put(row)
+        waiting = asyncio.ensure_future(buffer.put({"id": "2"}))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        table.gate.set()
+        assert await asyncio.wait_for(waiting, 1) is True
+        await buffer.close()
+        assert [row["id"] for row in table.rows] == ["0", "1", "2"]
+
+    asyncio.run(run())
+
+
+def test_drop_policy_discards_rows_beyond_max_pending():
+    async def run():
+        table = FakeTable()
+        table.failing = True
+        buffer = LogBuffer(table.write, batch_size=2, max_pending=2, flush_interval=60, overflow="drop")
+        assert [buffer.add(row) for row in _rows(3)] == [True, True, False]
+        await buffer.close()
+        assert buffer.stats()["dropped"] == 3
+        assert table.rows == []
+
+    asyncio.run(run())
+
+
+def test_close_writes_pending_rows_or_spills_them(tmp_path):
+    async def run():
+        table = FakeTable()
+        buffer = LogBuffer(table.write, batch_size=10, flush_interval=60, spill_path=tmp_path / "logs.jsonl")
+        for row in _rows(3):
+            buffer.add(row)
+        await buffer.close()
+        assert len(table.rows) == 3 and len(buffer) == 0
+
+        table.failing = True
+        buffer = LogBuffer(table.write, batch_size=10, flush_interval=60, spill_path=tmp_path / "logs.jsonl")
+        for row in _rows(2, start=3):
+            buffer.add(row)
+        await buffer.close()
+        assert buffer.stats()["spilled"] == 2
+        assert buffer.spill_file().read_text(encoding="utf-8").count("\n") == 2
+
+    asyncio.run(run())
@@ -0,0 +1,27 @@
+"""Tests for the warm Node.js worker pool."""
+import pytest
+
+from core.tools.workflow.code.node_runner import NodePool, node_version
+
+pytestmark = pytest.mark.skipif(node_version() is None, reason="Node.js is not installed")
+
+
+@pytest.fixture
+def pool():
+    pool = NodePool(size=1)
+    yield pool
+    pool.close()
+
+
+def test_commonjs_globals(pool):
+    reply = pool.run("exports.a = 1; console.log(typeof __dirname, typeof __filename, module.exports.a)")
+    assert reply["stdout"] == "string string 1\n"
+    # Each job gets its own module object
+    assert pool.run("console.log(JSON.stringify(module.exports))")["stdout"] == "{}\n"
+
+
+def test_unserializable_context_keeps_worker(pool):
+    reply = pool.run("1", {"x": object()})
+    assert reply["exit_code"] == 1 and "JSON-serializable" in reply["stderr"]
+    assert pool.run("console.log(x)", {"x": 2})["stdout"] == "2\n"
+    assert pool.stats()["crashes"] == 0
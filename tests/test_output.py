@@ -0,0 +1,51 @@
+"""Tests for tool result encoding."""
+import json
+from datetime import date, datetime
+
+import pytest
+
+from core.tools.utilities.output import configure_output, output_stats, to_json
+
+RESULT = {"name": "Zoë 🚀", "count": 3, "items": [1, 2]}
+
+
+@pytest.fixture
+def settings():
+    saved = configure_output()
+    yield
+    configure_output(**saved)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_compact_encoders_agree(settings, use_orjson, ensure_ascii):
+    configure_output(use_orjson=use_orjson)
+    expected = json.dumps(RESULT, separators=(",", ":"), ensure_ascii=ensure_ascii)
+    assert to_json(RESULT, ensure_ascii=ensure_ascii, compact=True) == expected
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_compact_encoders_agree_on_dates(settings, use_orjson):
+    configure_output(use_orjson=use_orjson)
+    result = {"at": datetime(2024, 1, 2, 3, 4, 5), "on": date(2024, 1, 2)}
+    assert to_json(result, compact=True) == '{"at":"2024-01-02 03:04:05","on":"2024-01-02"}'
+
+
+def test_stats_count_bytes(settings):
+    output_stats(reset=True)
+    encoded = to_json(RESULT, ensure_ascii=False, compact=True)
+    assert output_stats()["bytes"] == len(encoded.encode("utf-8")) > len(encoded)
+
+
+def test_compact_override(settings):
+    configure_output(compact=False)
+    assert to_json(RESULT, compact=True) == json.dumps(RESULT, separators=(",", ":"))
+    configure_output(compact=True)
+    assert to_json(RESULT, compact=False) == json.dumps(RESULT, indent=2)
+
+
+def test_truncation_keeps_requested_mode(settings):
+    configure_output(max_bytes=200)
+    encoded = to_json({"success": True, "data": list(range(100))}, compact=True)
+    assert len(encoded) <= 200 and "\n" not in encoded
+    assert json.loads(encoded)["_truncated"]["fields"]["data"]["original_length"] == 100
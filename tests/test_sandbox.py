@@ -0,0 +1,18 @@
+"""Tests for the Python sandbox worker pool."""
+import pytest
+
+from core.tools.workflow.code.sandbox import SandboxPool
+
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(size=1)
+    yield pool
+    pool.close()
+
+
+def test_unserializable_context_keeps_worker(pool):
+    result = pool.run("print(x)", {"x": object()})
+    assert result["success"] is False and result["error_type"] == "TypeError"
+    assert pool.run("print(x)", {"x": 1})["stdout"] == "1\n"
+    assert pool.stats()["replaced"] == 0
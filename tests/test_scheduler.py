@@ -0,0 +1,70 @@
+"""Tests for the durable resume scheduler behind workflow_wait."""
+import threading
+import time
+
+import pytest
+
+from core.tools.workflow.execution.scheduler import ResumeScheduler
+
+
+@pytest.fixture
+def schedulers(tmp_path):
+    started = []
+
+    def make(handler):
+        scheduler = ResumeScheduler(tmp_path / "schedule.sqlite3", tick=0.05)
+        scheduler.set_resume_handler(handler)
+        started.append(scheduler)
+        return scheduler
+    yield make
+    for scheduler in started:
+        scheduler.close()
+
+
+def _wait_for(condition, seconds=5):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_a_wake_up_shared_by_several_processes_fires_once(schedulers):
+    fired = []
+    lock = threading.Lock()
+
+    def handler(entry):
+        with lock:
+            fired.append(entry["thread_id"])
+
+    first, second = schedulers(handler), schedulers(handler)
+    first.schedule("thread-1", time.time() + 0.2, {})
+    # Loaded by both, as a second worker process would at startup
+    second.start()
+    _wait_for(lambda: not first.pending())
+    time.sleep(0.3)
+    assert fired == ["thread-1"]
+    assert first.resumed + second.resumed == 1
+
+
+def test_the_resumed_wake_up_is_taken_once(schedulers):
+    taken = []
+
+    def handler(entry):
+        taken.append(scheduler.take_resuming(entry["key"]))
+        taken.append(scheduler.take_resuming(entry["key"]))
+
+    scheduler = schedulers(handler)
+    key = scheduler.schedule("thread-1", time.time(), {})
+    _wait_for(lambda: taken)
+    assert taken == [True, False]
+    assert not scheduler.take_resuming(key)
+
+
+def test_a_claimed_wake_up_cannot_be_claimed_again(schedulers):
+    fired = []
+    scheduler = schedulers(fired.append)
+    key = scheduler.schedule("thread-1", time.time() + 60, {})
+    entry = scheduler.pending()[0]
+    assert entry["key"] == key
+    assert scheduler._claim(entry)
+    other = schedulers(fired.append)
+    assert not other._claim(entry)
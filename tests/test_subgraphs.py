@@ -0,0 +1,126 @@
+"""Tests for running LangGraph sub-workflows in-process and on the process pool."""
+import os
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from core.tools.workflow.execution.subgraphs import SubgraphPool, has_async_nodes, load_graph, run_graph
+
+GRAPHS = textwrap.dedent('''
+    import asyncio
+    import os
+    import time
+    from pathlib import Path
+    from typing import TypedDict
+
+    from langgraph.graph import StateGraph, START, END
+
+
+    class State(TypedDict):
+        n: int
+
+
+    async def add_one(state):
+        await asyncio.sleep(0)
+        return {"n": state["n"] + 1}
+
+
+    def double(state):
+        return {"n": state["n"] * 2}
+
+
+    def crash(state):
+        os._exit(1)
+
+
+    def hang(state):
+        Path(__file__).with_name("hang.pid").write_text(str(os.getpid()))
+        time.sleep(60)
+        return state
+
+
+    def build(*nodes):
+        builder = StateGraph(State)
+        previous = START
+        for node in nodes:
+            builder.add_node(node.__name__, node)
+            builder.add_edge(previous, node.__name__)
+            previous = node.__name__
+        builder.add_edge(previous, END)
+        return builder.compile()
+
+
+    mixed = build(add_one, double)
+    sync_only = build(double)
+    crashing = build(crash)
+    hanging = build(hang)
+''')
+
+
+@pytest.fixture
+def graph_file(tmp_path):
+    path = tmp_path / "graphs.py"
+    path.write_text(GRAPHS)
+    return str(path)
+
+
+@pytest.fixture
+def pool():
+    pool = SubgraphPool(workers=1, preload=[])
+    yield pool
+    pool.close()
+
+
+def test_detects_async_nodes(graph_file):
+    assert has_async_nodes(load_graph(f"{graph_file}:mixed"))
+    assert not has_async_nodes(load_graph(f"{graph_file}:sync_only"))
+
+
+def test_in_process_run_supports_async_nodes(graph_file):
+    result = run_graph(f"{graph_file}:mixed", {"n": 1})
+    assert result == {"output": {"n": 4}, "steps": ["add_one", "double"]}
+
+
+def test_isolated_run_supports_async_nodes(graph_file, pool):
+    chunks = list(pool.stream(f"{graph_file}:mixed", {"n": 1}, timeout=60))
+    assert ("values", {"n": 4}) in chunks
+
+
+def test_pool_recovers_after_a_worker_dies(graph_file, pool):
+    with pytest.raises(RuntimeError, match="worker failed"):
+        list(pool.stream(f"{graph_file}:crashing", {"n": 1}, timeout=60))
+    chunks = list(pool.stream(f"{graph_file}:sync_only", {"n": 3}, timeout=60))
+    assert ("values", {"n": 6}) in chunks
+    assert pool.stats()["restarts"] == 1
+
+
+def test_pool_restarts_after_a_timeout(graph_file, pool):
+    with pytest.raises(TimeoutError):
+        list(pool.stream(f"{graph_file}:mixed", {"n": 1}, timeout=0))
+    assert pool.stats()["timeouts"] == 1
+    chunks = list(pool.stream(f"{graph_file}:mixed", {"n": 1}, timeout=60))
+    assert ("values", {"n": 4}) in chunks
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    stat = Path(f"/proc/{pid}/stat")
+    # A killed worker may linger as a zombie until its parent reaps it
+    return not (stat.exists() and stat.read_text().split(")")[-1].split()[0] == "Z")
+
+
+def test_timeout_kills_the_busy_worker(graph_file, pool):
+    with pytest.raises(TimeoutError):
+        list(pool.stream(f"{graph_file}:hanging", {"n": 1}, timeout=5))
+    pid = int(Path(graph_file).with_name("hang.pid").read_text())
+    deadline = time.monotonic() + 10
+    while _alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not _alive(pid)
@@ -0,0 +1,65 @@
+"""Tests for the lazy tool registry."""
+import json
+import sys
+
+import pytest
+
+from core.tool_loader import ToolRegistry
+
+GROUP = "braid.tools.test"
+
+
+@pytest.fixture
+def tools_module(tmp_path, monkeypatch):
+    (tmp_path / "braid_fake_tools.py").write_text("def echo(text):\n    return text\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "braid_fake_tools"
+    sys.modules.pop("braid_fake_tools", None)
+
+
+def _index(tmp_path, tools):
+    path = tmp_path / "tool_index.json"
+    path.write_text(json.dumps({"group": GROUP, "tools": tools}), encoding="utf-8")
+    return str(path)
+
+
+def _no_scan(self):
+    raise AssertionError("entry points were scanned")
+
+
+def test_tools_are_imported_on_first_use(tmp_path, tools_module, monkeypatch):
+    monkeypatch.setattr(ToolRegistry, "_scan_entry_points", _no_scan)
+    registry = ToolRegistry(GROUP, _index(tmp_path, {"echo": f"{tools_module}:echo"}))
+    assert registry.names() == ["echo"]
+    assert tools_module not in sys.modules
+    tool = registry.get("echo")
+    assert tool("hi") == "hi"
+    assert registry.get("echo") is tool
+    with pytest.raises(ValueError):
+        registry.get("unknown")
+
+
+def test_missing_dependencies_are_memoized(tmp_path, monkeypatch):
+    monkeypatch.setattr(ToolRegistry, "_scan_entry_points", _no_scan)
+    registry = ToolRegistry(GROUP, _index(tmp_path, {"slack": "core.contrib.slack.not_installed_xyz:tool"}))
+    with pytest.raises(ImportError, match=r"pip install '\.\[slack\]'") as first:
+        registry.get("slack")
+    with pytest.raises(ImportError) as second:
+        registry.get("slack")
+    assert second.value is first.value
+
+
+def test_empty_index_is_used_instead_of_scanning(tmp_path, monkeypatch):
+    monkeypatch.setattr(ToolRegistry, "_scan_entry_points", _no_scan)
+    assert ToolRegistry(GROUP, _index(tmp_path, {})).names() == []
+
+
+def test_written_index_is_read_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(ToolRegistry, "_scan_entry_points", lambda self: {"echo": "braid_fake_tools:echo"})
+    path = str(tmp_path / "tool_index.json")
+    assert ToolRegistry(GROUP).write_index(path) == 1
+    monkeypatch.setattr(ToolRegistry, "_scan_entry_points", _no_scan)
+    assert ToolRegistry(GROUP, path).targets() == {"echo": "braid_fake_tools:echo"}
+    # An index written for another group is ignored
+    with pytest.raises(AssertionError, match="scanned"):
+        ToolRegistry("braid.tools.other", path).targets()
@@ -0,0 +1,54 @@
+"""Tests for filter condition parsing."""
+import pytest
+
+from core.tools.data.transform.utils import compile_condition
+
+
+def _describe(condition):
+    return [c.describe() for c in compile_condition(condition).comparisons]
+
+
+@pytest.mark.parametrize("condition, value", [
+    ("name == O'Brien", "O'Brien"),
+    ("name == a=b", "a=b"),
+    ("name == hello world", "hello world"),
+    ("name == \"q and r\"", "q and r"),
+    ("name contains it's", "it's"),
+    ("age >= 25", 25),
+    ("active == true", True),
+])
+def test_bare_values(condition, value):
+    assert _describe(condition)[0]["value"] == value
+
+
+def test_bare_value_stops_at_boolean_keywords_and_parens():
+    assert _describe("(name == O'Brien and role != a<b) or age > 3") == [
+        {"field": "name", "operator": "==", "value": "O'Brien"},
+        {"field": "role", "operator": "!=", "value": "a<b"},
+        {"field": "age", "operator": ">", "value": 3},
+    ]
+
+
+def test_filters_with_bare_values():
+    items = [{"name": "O'Brien", "age": 40}, {"name": "Smith", "age": 50}]
+    assert compile_condition("name == O'Brien").filter(items) == items[:1]
+    assert compile_condition("status in [a, b] or name startswith Sm").filter(items) == items[1:]
+
+
+def test_unquoted_list_items_run_to_the_next_comma():
+    assert _describe("city in [New York, Boston]") == [
+        {"field": "city", "operator": "in", "value": ["New York", "Boston"]}
+    ]
+    matches = compile_condition("city in [New York, Boston]")
+    assert matches({"city": "New York"})
+    assert not matches({"city": "York"})
+
+
+def test_keyword_operator_names_are_fields_outside_operator_position():
+    assert _describe("contains == 3") == [{"field": "contains", "operator": "==", "value": 3}]
+
+
+@pytest.mark.parametrize("condition", ["", "name", "name ~ x", "(name == x"])
+def test_malformed_conditions(condition):
+    with pytest.raises(ValueError):
+        compile_condition(condition)
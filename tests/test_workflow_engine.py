@@ -0,0 +1,219 @@
+"""Tests for the bounded workflow execution engine."""
+import asyncio
+import json
+import time
+from typing import TypedDict
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command
+
+from braid import workflow_engine
+from braid.workflow_engine import UnknownWorkflow, WorkflowEngine, WorkflowQueueFull, WorkflowRegistry
+from core.tools.workflow.execution import tools as execution_tools
+from core.tools.workflow.execution.scheduler import ResumeScheduler
+from core.tools.workflow.execution.tools import workflow_wait
+
+
+class State(TypedDict, total=False):
+    value: int
+    waited: bool
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = {}
+        self.logs = []
+
+    async def create_workflow_execution(self, data):
+        execution_id = str(len(self.rows) + 1)
+        self.rows[execution_id] = dict(data)
+        return {"id": execution_id, **data}
+
+    async def update_workflow_execution(self, execution_id, updates):
+        self.rows[execution_id].update(updates)
+        return True
+
+    async def log_agent_action(self, agent_id, action, details):
+        self.logs.append(action)
+
+
+def _graph(node):
+    builder = StateGraph(State)
+    builder.add_node("step", node)
+    builder.add_edge(START, "step")
+    builder.add_edge("step", END)
+    return builder.compile()
+
+
+def _durable_wait(state):
+    result = json.loads(workflow_wait.invoke({"wait_type": "time", "duration_seconds": 1, "durable": True}))
+    return {"waited": result.get("durable", False)}
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    scheduler = ResumeScheduler(tmp_path / "schedule.sqlite3", tick=0.1)
+    monkeypatch.setattr(workflow_engine, "resume_scheduler", scheduler)
+    monkeypatch.setattr(execution_tools, "resume_scheduler", scheduler)
+    yield scheduler
+    scheduler.close()
+
+
+def test_register_adds_checkpointer_and_resume_target(scheduler):
+    registry = WorkflowRegistry(checkpointer=MemorySaver())
+    registry.register("wait", _graph(_durable_wait))
+    assert registry.get("wait").checkpointer is registry.checkpointer
+    assert scheduler.can_resume("wait")
+    assert not scheduler.can_resume("default")
+
+
+def test_durable_wait_checkpoints_and_resumes(scheduler):
+    registry = WorkflowRegistry(checkpointer=MemorySaver())
+    registry.register("wait", _graph(_durable_wait))
+    db = FakeDB()
+    engine = WorkflowEngine(db, registry)
+
+    async def run():
+        execution_id = await engine.submit("agent", "wait", {})
+        await asyncio.gather(*engine._tasks.values())
+        # The run ends at the interrupt instead of holding the wait open
+        row = db.rows[execution_id]
+        assert row["status"] == "waiting" and "completed_at" not in row
+        assert row["output_data"]["interrupted"] is True
+        assert db.logs == ["workflow_waiting"]
+        deadline = time.monotonic() + 10
+        while row["status"] == "waiting" and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        await engine.close()
+        return execution_id
+
+    started = time.monotonic()
+    execution_id = asyncio.run(run())
+    assert scheduler.resumed == 1 and time.monotonic() - started >= 1
+    state = registry.get("wait").get_state({"configurable": {"thread_id": execution_id}})
+    assert state.values == {"waited": True}
+    # The resume records the final output on the same row
+    row = db.rows[execution_id]
+    assert row["status"] == "completed" and "completed_at" in row
+    assert row["output_data"] == {"result": {"waited": True}, "steps": []}
+    assert db.logs == ["workflow_waiting", "workflow_completed"]
+    assert scheduler.pending() == []
+
+
+def test_a_manual_resume_drops_the_pending_wake_up(scheduler):
+    def long_wait(state):
+        result = json.loads(workflow_wait.invoke({"wait_type": "time", "duration_seconds": 60,
+                                                  "timeout_seconds": 600, "durable": True}))
+        return {"waited": result.get("durable", False)}
+
+    registry = WorkflowRegistry(checkpointer=MemorySaver())
+    registry.register("wait", _graph(long_wait))
+    graph = registry.get("wait")
+    config = {"configurable": {"thread_id": "manual", "graph_id": "wait"}}
+    graph.invoke({}, config)
+    assert [entry["thread_id"] for entry in scheduler.pending()] == ["manual"]
+    assert graph.invoke(Command(resume={"start_time": "2024-01-02T03:04:05"}), config) == {"waited": True}
+    assert scheduler.pending() == []
+    assert scheduler.stats()["pending"] == 0
+
+
+def test_a_node_that_waits_again_schedules_a_new_wake_up(scheduler):
+    def wait_twice(state):
+        _durable_wait(state)
+        return {"value": state.get("value", 0) + 1}
+
+    builder = StateGraph(State)
+    builder.add_node("step", wait_twice)
+    builder.add_edge(START, "step")
+    builder.add_conditional_edges("step", lambda state: END if state["value"] >= 2 else "step")
+    registry = WorkflowRegistry(checkpointer=MemorySaver())
+    registry.register("loop", builder.compile())
+    db = FakeDB()
+    engine = WorkflowEngine(db, registry)
+
+    async def run():
+        execution_id = await engine.submit("agent", "loop", {})
+        await asyncio.gather(*engine._tasks.values())
+        deadline = time.monotonic() + 10
+        while db.rows[execution_id]["status"] == "waiting" and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        await engine.close()
+        return execution_id
+
+    execution_id = asyncio.run(run())
+    assert scheduler.resumed == 2
+    assert db.rows[execution_id]["output_data"]["result"] == {"value": 2}
+    assert db.logs == ["workflow_waiting", "workflow_waiting", "workflow_completed"]
+
+
+def _blocking_engine(gate, **options):
+    async def step(state):
+        await gate.wait()
+        return {"value": state.get("value", 0) + 1}
+
+    registry = WorkflowRegistry()
+    registry.register("block", _graph(step))
+    return WorkflowEngine(FakeDB(), registry, **options)
+
+
+def test_queue_limit_rejects_beyond_capacity():
+    async def run():
+        gate = asyncio.Event()
+        engine = _blocking_engine(gate, max_concurrency=1, max_queue=1)
+        first = await engine.submit("agent", "block", {"value": 1})
+        second = await engine.submit("agent", "block", {"value": 2})
+        with pytest.raises(WorkflowQueueFull):
+            await engine.submit("agent", "block", {"value": 3})
+        await asyncio.sleep(0.05)
+        stats = engine.stats()
+        assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 1, 1)
+        gate.set()
+        await asyncio.gather(*engine._tasks.values())
+        rows = engine.db.rows
+        assert [rows[first]["status"], rows[second]["status"]] == ["completed", "completed"]
+        assert rows[second]["output_data"]["result"] == {"value": 3}
+        # Finished executions free their slots
+        await engine.submit("agent", "block", {})
+        await engine.close()
+
+    asyncio.run(run())
+
+
+def test_unknown_workflow():
+    async def run():
+        engine = _blocking_engine(asyncio.Event())
+        with pytest.raises(UnknownWorkflow):
+            await engine.submit("agent", "missing", {})
+        assert engine.db.rows == {}
+
+    asyncio.run(run())
+
+
+def test_timeout_marks_execution_failed():
+    async def run():
+        engine = _blocking_engine(asyncio.Event(), timeout=0.1)
+        execution_id = await engine.submit("agent", "block", {})
+        await asyncio.gather(*engine._tasks.values())
+        row = engine.db.rows[execution_id]
+        assert row["status"] == "failed" and "timed out" in row["error_message"]
+        assert engine.stats()["failed"] == 1 and engine.db.logs == ["workflow_failed"]
+
+    asyncio.run(run())
+
+
+def test_close_cancels_running_and_queued():
+    async def run():
+        engine = _blocking_engine(asyncio.Event(), max_concurrency=1)
+        running = await engine.submit("agent", "block", {})
+        queued = await engine.submit("agent", "block", {})
+        await asyncio.sleep(0.05)
+        await engine.close()
+        rows = engine.db.rows
+        assert [rows[running]["status"], rows[queued]["status"]] == ["cancelled", "cancelled"]
+
+    asyncio.run(run())